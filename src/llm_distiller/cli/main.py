@@ -3,14 +3,38 @@
 import asyncio
 import json
 import os
-from typing import Optional
+from typing import Any, Optional
 
 import click
 
-from ..config import Settings
-from ..database import DatabaseManager, InvalidResponse, Question, Response
-from ..exporters import DatasetExporter
-from ..importers import CSVImporter
+# Subsystems are imported inside the commands that use them, so --help and
+# light commands do not pay for pydantic, SQLAlchemy, pandas or provider SDKs.
+
+
+def _get_settings(ctx: click.Context) -> Any:
+    """Load the settings on first use."""
+    if "settings" not in ctx.obj:
+        from ..config import Settings
+
+        ctx.obj["settings"] = Settings.load(ctx.obj.get("config_path"))
+    return ctx.obj["settings"]
+
+
+def _get_db_manager(ctx: click.Context) -> Any:
+    """Create the database manager on first use."""
+    if "db_manager" not in ctx.obj:
+        from ..database import DatabaseManager
+
+        database = _get_settings(ctx).database
+        ctx.obj["db_manager"] = DatabaseManager(
+            database_url=database.url,
+            echo=database.echo,
+            pool_size=database.pool_size,
+            max_overflow=database.max_overflow,
+            pool_pre_ping=database.pool_pre_ping,
+            pool_recycle=database.pool_recycle,
+        )
+    return ctx.obj["db_manager"]
 
 
 @click.group()
@@ -21,22 +45,14 @@ from ..importers import CSVImporter
 def cli(ctx, config: Optional[str]):
     """LLM Distiller - Create high-quality datasets for fine-tuning."""
     ctx.ensure_object(dict)
-    ctx.obj["settings"] = Settings.load(config)
-    ctx.obj["db_manager"] = DatabaseManager(
-        database_url=ctx.obj["settings"].database.url,
-        echo=ctx.obj["settings"].database.echo,
-        pool_size=ctx.obj["settings"].database.pool_size,
-        max_overflow=ctx.obj["settings"].database.max_overflow,
-        pool_pre_ping=ctx.obj["settings"].database.pool_pre_ping,
-        pool_recycle=ctx.obj["settings"].database.pool_recycle,
-    )
+    ctx.obj["config_path"] = config
 
 
 @cli.command()
 @click.pass_context
 def init(ctx):
     """Initialize the database."""
-    db_manager = ctx.obj["db_manager"]
+    db_manager = _get_db_manager(ctx)
     click.echo("Creating database tables...")
     db_manager.create_tables()
     click.echo("Database initialized successfully!")
@@ -55,7 +71,7 @@ def init(ctx):
 @click.pass_context
 def import_data(ctx, file_path: str, type: str, default_correct: Optional[str]):
     """Import data from a file."""
-    db_manager = ctx.obj["db_manager"]
+    db_manager = _get_db_manager(ctx)
 
     # Convert default_correct string to boolean/None
     default_correct_value = None
@@ -68,6 +84,8 @@ def import_data(ctx, file_path: str, type: str, default_correct: Optional[str]):
             default_correct_value = None
 
     if type == "csv":
+        from ..importers import CSVImporter
+
         importer = CSVImporter(db_manager, default_correct=default_correct_value)
     else:
         click.echo(f"Unsupported file type: {type}")
@@ -76,8 +94,11 @@ def import_data(ctx, file_path: str, type: str, default_correct: Optional[str]):
     click.echo(f"Importing data from {file_path}...")
 
     async def run_import():
-        result = await importer.import_data(file_path)
-        return result
+        try:
+            return await importer.import_data(file_path)
+        finally:
+            # Close pooled aiosqlite connections before the event loop goes away
+            await db_manager.dispose()
 
     result = asyncio.run(run_import())
 
@@ -105,11 +126,17 @@ def import_data(ctx, file_path: str, type: str, default_correct: Optional[str]):
     type=click.Choice(["none", "preferred_only", "rate_limit_only", "all"]),
     help="Override failover strategy for this run"
 )
+@click.option(
+    "--mode",
+    type=click.Choice(["interactive", "batch"]),
+    default="interactive",
+    help="Call the provider per question, or submit all questions through its batch API"
+)
 @click.pass_context
-def process(ctx, category: Optional[str], limit: int, provider: Optional[str], system_prompt: Optional[str], failover_strategy: Optional[str]):
+def process(ctx, category: Optional[str], limit: int, provider: Optional[str], system_prompt: Optional[str], failover_strategy: Optional[str], mode: str):
     """Process questions with LLM."""
-    settings = ctx.obj["settings"]
-    db_manager = ctx.obj["db_manager"]
+    settings = _get_settings(ctx)
+    db_manager = _get_db_manager(ctx)
     
     # Use the processing engine
     from processing.engine import ProcessingEngine
@@ -120,9 +147,19 @@ def process(ctx, category: Optional[str], limit: int, provider: Optional[str], s
         click.echo(f"Filtering by category: {category}")
     if provider:
         click.echo(f"Using provider: {provider}")
+    if mode == "batch":
+        click.echo("Submitting questions through the batch API; this may take up to "
+                   f"{settings.processing.batch_completion_window}")
     
     async def run_processing():
-        result = await engine.process_questions(category, limit, provider, system_prompt, failover_strategy)
+        try:
+            if mode == "batch":
+                result = await engine.process_questions_batch(category, limit, provider, system_prompt)
+            else:
+                result = await engine.process_questions(category, limit, provider, system_prompt, failover_strategy)
+        finally:
+            await engine.close()
+            await db_manager.dispose()
         
         # Report results
         click.echo(f"\nProcessing complete!")
@@ -135,6 +172,15 @@ def process(ctx, category: Optional[str], limit: int, provider: Optional[str], s
         if result.stats.total_tokens_used > 0:
             click.echo(f"🔤 Total tokens used: {result.stats.total_tokens_used}")
         
+        if result.stats.cache_hits > 0:
+            click.echo(f"💾 Served from response cache: {result.stats.cache_hits}")
+        
+        if result.stats.deduplicated_responses > 0:
+            click.echo(f"🔁 Shared with identical questions: {result.stats.deduplicated_responses}")
+        
+        if result.stats.total_cached_tokens > 0:
+            click.echo(f"♻️ Cached prompt tokens: {result.stats.total_cached_tokens}")
+        
         if result.stats.processing_time_seconds > 0:
             click.echo(f"⏱️ Processing time: {result.stats.processing_time_seconds:.2f}s")
             click.echo(f"📊 Speed: {result.stats.questions_per_second:.2f} questions/second")
@@ -165,7 +211,7 @@ def process(ctx, category: Optional[str], limit: int, provider: Optional[str], s
 @click.pass_context
 def export(ctx, format: str, output: Optional[str], validated_only: bool):
     """Export processed data."""
-    db_manager = ctx.obj["db_manager"]
+    db_manager = _get_db_manager(ctx)
 
     if not output:
         output = f"export.{format}"
@@ -174,6 +220,8 @@ def export(ctx, format: str, output: Optional[str], validated_only: bool):
     if validated_only:
         click.echo("Exporting only validated responses")
 
+    from ..exporters import DatasetExporter
+
     exporter = DatasetExporter(db_manager)
 
     count = 0
@@ -198,7 +246,7 @@ def export(ctx, format: str, output: Optional[str], validated_only: bool):
 @click.pass_context
 def export_training(ctx, output: Optional[str], validated_only: bool, category: Optional[str]):
     """Export data in training JSONL format with flat structure."""
-    db_manager = ctx.obj["db_manager"]
+    db_manager = _get_db_manager(ctx)
 
     if not output:
         output = "training_data.jsonl"
@@ -209,6 +257,8 @@ def export_training(ctx, output: Optional[str], validated_only: bool, category:
     if category:
         click.echo(f"Filtering by category: {category}")
 
+    from ..exporters import DatasetExporter
+
     exporter = DatasetExporter(db_manager)
 
     try:
@@ -223,10 +273,10 @@ def export_training(ctx, output: Optional[str], validated_only: bool, category:
 @click.pass_context
 def status(ctx):
     """Show system status."""
-    db_manager = ctx.obj["db_manager"]
+    db_manager = _get_db_manager(ctx)
+    from ..database import InvalidResponse, Question, Response
 
     with db_manager.session_scope() as session:
-        # Imports are now top-level
 
         question_count = session.query(Question).count()
         response_count = session.query(Response).count()
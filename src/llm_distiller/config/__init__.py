@@ -1,21 +1,25 @@
 """Configuration package initialization."""
 
 from .settings import (
+    BatchingConfig,
     DatabaseConfig,
     GenerationConfig,
     LoggingConfig,
     ProcessingConfig,
     ProviderConfig,
     RateLimitConfig,
+    ResponseCacheConfig,
     Settings,
 )
 
 __all__ = [
+    "BatchingConfig",
     "DatabaseConfig",
     "GenerationConfig",
     "LoggingConfig",
     "ProcessingConfig",
     "ProviderConfig",
     "RateLimitConfig",
+    "ResponseCacheConfig",
     "Settings",
 ]
@@ -2,9 +2,9 @@
 
 import json
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class DatabaseConfig(BaseModel):
@@ -33,6 +33,16 @@ class RateLimitConfig(BaseModel):
     retry_after_seconds: int = Field(
         default=60, description="Seconds to wait after rate limit"
     )
+    adaptive: bool = Field(
+        default=False,
+        description="Adjust limits from provider rate limit headers and 429 responses",
+    )
+    adaptive_max_scale: float = Field(
+        default=1.0,
+        ge=1.0,
+        description="How far above the configured per-minute limits adaptive limiting may grow "
+        "when the provider reports no limits of its own",
+    )
 
 
 class GenerationConfig(BaseModel):
@@ -55,6 +65,25 @@ class GenerationConfig(BaseModel):
     )
 
 
+class BatchingConfig(BaseModel):
+    """Multi-prompt batching through the /v1/completions endpoint."""
+
+    enabled: bool = Field(
+        default=False, description="Send concurrent requests together in one multi-prompt completion"
+    )
+    max_batch_size: int = Field(default=8, ge=1, description="Maximum prompts per request")
+    max_wait_ms: float = Field(
+        default=20.0, ge=0.0, description="Longest a request waits for others to join its batch"
+    )
+    prompt_template: Optional[str] = Field(
+        default=None,
+        description=(
+            "Template with {system_prompt} and {prompt} placeholders rendering the model's chat format "
+            "(None = system prompt and question separated by a blank line)"
+        ),
+    )
+
+
 class ProviderConfig(BaseModel):
     """Configuration for individual LLM providers."""
 
@@ -70,6 +99,30 @@ class ProviderConfig(BaseModel):
     generation_params: GenerationConfig = Field(
         default_factory=GenerationConfig, description="Generation parameters"
     )
+    max_concurrency: Optional[int] = Field(
+        default=None, ge=1, description="Maximum parallel requests to this provider (None = unlimited)"
+    )
+    http2: bool = Field(
+        default=False, description="Use HTTP/2 for this provider (requires httpx[http2])"
+    )
+    stream: bool = Field(
+        default=False,
+        description="Stream completions and abort responses that are going to fail",
+    )
+    batching: BatchingConfig = Field(
+        default_factory=BatchingConfig, description="Multi-prompt batching settings"
+    )
+    structured_output: Optional[Literal["json_schema", "json_object"]] = Field(
+        default=None,
+        description="Constrain answers to questions with an answer_schema: 'json_schema', 'json_object' or None (unsupported)",
+    )
+
+    @model_validator(mode="after")
+    def check_batching(self) -> "ProviderConfig":
+        """Reject batching combined with streaming; multi-prompt completions are not streamed."""
+        if self.batching.enabled and self.stream:
+            raise ValueError("batching cannot be combined with stream: multi-prompt completions are not streamed")
+        return self
 
     def get_api_key(self) -> str:
         """Get API key from config or environment variable."""
@@ -86,6 +139,26 @@ class ProviderConfig(BaseModel):
         return os.getenv(env_var, "")
 
 
+class ResponseCacheConfig(BaseModel):
+    """Persistent cache of provider responses."""
+
+    enabled: bool = Field(default=False, description="Serve repeated requests from the cache")
+    path: str = Field(
+        default=".llm_distiller_cache.sqlite", description="SQLite file holding cached responses"
+    )
+    ttl_seconds: Optional[float] = Field(
+        default=30 * 24 * 3600, gt=0.0, description="Age after which cached responses expire (None = never)"
+    )
+    max_size_mb: Optional[float] = Field(
+        default=1024.0,
+        gt=0.0,
+        description="Cached response text above which least recently used entries are evicted (None = unbounded)",
+    )
+    cache_nondeterministic: bool = Field(
+        default=False, description="Also cache requests with a temperature above 0"
+    )
+
+
 class ProcessingConfig(BaseModel):
     """Processing configuration."""
 
@@ -96,6 +169,9 @@ class ProcessingConfig(BaseModel):
         default=3, description="Maximum retry attempts for failed requests"
     )
     timeout_seconds: int = Field(default=120, description="Request timeout in seconds")
+    connect_timeout_seconds: float = Field(
+        default=10.0, gt=0.0, description="Timeout for opening a connection to a provider"
+    )
     validate_responses: bool = Field(
         default=True, description="Enable JSON schema validation"
     )
@@ -103,6 +179,11 @@ class ProcessingConfig(BaseModel):
         default="none", 
         description="Failover strategy: 'none', 'preferred_only', 'rate_limit_only', 'all'"
     )
+    concurrency_wait_seconds: Optional[float] = Field(
+        default=5.0,
+        ge=0.0,
+        description="Longest wait for a free concurrency slot before failing over to the next provider; the last candidate always waits (None = no limit)",
+    )
     failover_on_errors: List[str] = Field(
         default_factory=lambda: ["rate_limit", "timeout"], 
         description="Error types that trigger failover"
@@ -110,6 +191,94 @@ class ProcessingConfig(BaseModel):
     generation_params: GenerationConfig = Field(
         default_factory=GenerationConfig, description="Default generation parameters"
     )
+    response_cache: ResponseCacheConfig = Field(
+        default_factory=ResponseCacheConfig, description="Response cache settings"
+    )
+    retry_base_delay_seconds: float = Field(
+        default=1.0, ge=0.0, description="Base delay for exponential retry backoff"
+    )
+    retry_max_delay_seconds: float = Field(
+        default=60.0, ge=0.0, description="Maximum delay for exponential retry backoff"
+    )
+    circuit_breaker_failure_rate: float = Field(
+        default=0.5,
+        gt=0.0,
+        le=1.0,
+        description="Fraction of failed or slow calls that opens a provider's circuit breaker",
+    )
+    circuit_breaker_window: int = Field(
+        default=20, ge=1, description="Number of recent calls the circuit breaker considers"
+    )
+    circuit_breaker_min_calls: int = Field(
+        default=5, ge=1, description="Calls needed before the circuit breaker may open"
+    )
+    circuit_breaker_slow_call_ms: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Calls slower than this count as failures (None = 90% of timeout_seconds)",
+    )
+    circuit_breaker_open_seconds: float = Field(
+        default=30.0, ge=0.0, description="Seconds an open circuit rejects requests before probing"
+    )
+    deduplicate_requests: bool = Field(
+        default=False, description="Let identical requests that are in flight together share one provider call"
+    )
+    prefix_affinity: bool = Field(
+        default=False,
+        description="Group questions sharing a system prompt and route them to the same provider",
+    )
+    hedge_requests: bool = Field(
+        default=False,
+        description="Send a duplicate request when a call runs past the provider's latency percentile",
+    )
+    hedge_percentile: float = Field(
+        default=0.95, gt=0.0, lt=1.0, description="Latency percentile after which a request is hedged"
+    )
+    hedge_budget: float = Field(
+        default=0.05, ge=0.0, le=1.0, description="Maximum hedged requests as a fraction of all requests"
+    )
+    hedge_min_samples: int = Field(
+        default=20, ge=1, description="Successful calls needed before a provider's requests are hedged"
+    )
+    queue_max_size: int = Field(
+        default=1000,
+        ge=0,
+        description="Pending questions held in memory before loading pauses (0 = unbounded)",
+    )
+    flush_batch_size: int = Field(
+        default=100, ge=1, description="Initial number of responses per database commit"
+    )
+    flush_min_batch_size: int = Field(
+        default=10, ge=1, description="Smallest batch size adaptive flushing may use"
+    )
+    flush_max_batch_size: int = Field(
+        default=10000, ge=1, description="Largest batch size adaptive flushing may use"
+    )
+    flush_max_bytes: int = Field(
+        default=4 * 1024 * 1024,
+        ge=1,
+        description="Flush once pending response text reaches this many bytes",
+    )
+    flush_interval_ms: int = Field(
+        default=2000, ge=1, description="Flush responses older than this many milliseconds"
+    )
+    flush_target_commit_ms: int = Field(
+        default=250,
+        ge=1,
+        description="Commit latency the adaptive batch size aims for",
+    )
+    batch_directory: str = Field(
+        default="batches", description="Directory for batch API input files"
+    )
+    batch_poll_interval_seconds: float = Field(
+        default=60.0, gt=0.0, description="Seconds between status checks of submitted batches"
+    )
+    batch_completion_window: str = Field(
+        default="24h", description="Completion window requested for batch jobs"
+    )
+    batch_max_requests_per_file: int = Field(
+        default=50000, ge=1, description="Requests per batch input file"
+    )
 
 
 class LoggingConfig(BaseModel):
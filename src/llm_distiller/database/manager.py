@@ -1,21 +1,91 @@
 """Database connection and session management."""
 
+import asyncio
+import functools
+import logging
+from concurrent.futures import Executor
 from contextlib import asynccontextmanager, contextmanager
-from typing import AsyncGenerator, Generator, Optional
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Optional, TypeVar
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from .base import Base
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Sync driver -> async driver used for the event-loop side of the application
+ASYNC_DRIVERS: Dict[str, str] = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def to_async_url(database_url: str) -> Optional[str]:
+    """Derive the async driver URL for a sync database URL.
+
+    Args:
+        database_url: Sync database connection URL
+
+    Returns:
+        Async database URL, or None if no async driver can serve this database
+    """
+    url = make_url(database_url)
+    if url.get_dialect().is_async:
+        return database_url
+
+    backend = url.get_backend_name()
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        # An in-memory database only exists on the sync engine's connection
+        return None
+
+    async_driver = ASYNC_DRIVERS.get(backend)
+    if not async_driver:
+        return None
+    return url.set(drivername=async_driver).render_as_string(hide_password=False)
+
+
+def _engine_kwargs(
+    database_url: str,
+    echo: bool,
+    pool_size: int,
+    max_overflow: int,
+    pool_pre_ping: bool,
+    pool_recycle: int,
+) -> Dict[str, Any]:
+    """Build engine keyword arguments that are valid for the given database."""
+    url = make_url(database_url)
+    kwargs: Dict[str, Any] = {"echo": echo, "pool_pre_ping": pool_pre_ping}
+
+    if url.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # Share the single in-memory connection with worker threads
+            kwargs["poolclass"] = StaticPool
+            return kwargs
+
+    kwargs.update(
+        pool_size=pool_size, max_overflow=max_overflow, pool_recycle=pool_recycle
+    )
+    return kwargs
+
 
 class DatabaseManager:
     """Central database connection and session management."""
 
-    def __init__(self, database_url: str, echo: bool = False, pool_size: int = 20, 
+    def __init__(self, database_url: str, echo: bool = False, pool_size: int = 20,
                  max_overflow: int = 30, pool_pre_ping: bool = True, pool_recycle: int = 3600):
         """Initialize database manager.
 
+        The sync engine is created immediately and serves the CLI. An async
+        engine for the processing pipeline is created on first use from the
+        matching async driver (aiosqlite, asyncpg, ...).
+
         Args:
             database_url: Database connection URL
             echo: Whether to echo SQL statements
@@ -24,16 +94,67 @@ class DatabaseManager:
             pool_pre_ping: Validate connections before use
             pool_recycle: Connection recycle time in seconds
         """
-        self.engine = create_engine(
-            database_url, 
+        self.database_url = database_url
+        self._engine_options = dict(
             echo=echo,
             pool_size=pool_size,
             max_overflow=max_overflow,
             pool_pre_ping=pool_pre_ping,
-            pool_recycle=pool_recycle
+            pool_recycle=pool_recycle,
+        )
+        self.engine = create_engine(
+            database_url, **_engine_kwargs(database_url, **self._engine_options)
         )
         self.SessionLocal = sessionmaker(bind=self.engine)
 
+        self.async_database_url = to_async_url(database_url)
+        self._async_engine = None
+        self._async_session_factory = None
+        self._async_engine_checked = False
+
+    @property
+    def async_engine(self):
+        """Async engine for this database, or None if no async driver is usable."""
+        if not self._async_engine_checked:
+            self._async_engine_checked = True
+            self._create_async_engine()
+        return self._async_engine
+
+    @property
+    def supports_async(self) -> bool:
+        """Whether sessions can run on a real async driver."""
+        return self.async_engine is not None
+
+    def _create_async_engine(self) -> None:
+        """Create the async engine and session factory if possible."""
+        if not self.async_database_url:
+            logger.debug(f"No async driver for {self.engine.url.get_backend_name()}, using worker threads")
+            return
+
+        try:
+            import greenlet  # noqa: F401  # required by the async ORM bridge
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            self._async_engine = create_async_engine(
+                self.async_database_url,
+                **_engine_kwargs(self.async_database_url, **self._engine_options),
+            )
+        except ImportError as e:
+            logger.warning(
+                f"Async database driver unavailable ({e}), falling back to worker threads"
+            )
+            return
+        except Exception as e:
+            # Bad URL arguments, unsupported pool options, ...: the sync engine still works
+            logger.warning(
+                f"Could not create async engine ({type(e).__name__}: {e}), falling back to worker threads"
+            )
+            return
+
+        self._async_session_factory = async_sessionmaker(
+            bind=self._async_engine, expire_on_commit=False
+        )
+
     def create_tables(self) -> None:
         """Create all database tables."""
         Base.metadata.create_all(bind=self.engine)
@@ -58,28 +179,103 @@ class DatabaseManager:
             raise
         finally:
             session.close()
-    
+
     @asynccontextmanager
-    async def async_session_scope(self) -> AsyncGenerator[Session, None]:
-        """Provide an async transactional scope around a series of operations."""
-        session = self.SessionLocal()
+    async def async_session_scope(self) -> AsyncGenerator[Any, None]:
+        """Provide an async transactional scope on the async engine.
+
+        Yields:
+            AsyncSession bound to the async engine
+
+        Raises:
+            RuntimeError: If no async driver is available for this database
+        """
+        if not self.supports_async:
+            raise RuntimeError(
+                f"No async driver available for database '{self.engine.url.get_backend_name()}'"
+            )
+
+        session = self._async_session_factory()
         try:
             yield session
-            session.commit()
+            await session.commit()
         except Exception:
-            session.rollback()
+            await session.rollback()
             raise
         finally:
-            session.close()
+            await session.close()
+
+    async def run_sync(
+        self,
+        operation: Callable[..., T],
+        *args: Any,
+        executor: Optional[Executor] = None,
+    ) -> T:
+        """Run a sync session operation in a transaction without blocking the event loop.
+
+        On an async driver the operation runs through ``AsyncSession.run_sync``;
+        otherwise it runs on a sync session in a worker thread.
+
+        Args:
+            operation: Callable taking a Session followed by ``args``
+            *args: Extra positional arguments for the operation
+            executor: Executor for the thread fallback (default: the loop's executor)
+
+        Returns:
+            Result of the operation
+        """
+        if self.supports_async:
+            async with self.async_session_scope() as session:
+                return await session.run_sync(operation, *args)
+
+        return await self.run_in_thread(operation, *args, executor=executor)
+
+    async def run_in_thread(
+        self,
+        operation: Callable[..., T],
+        *args: Any,
+        executor: Optional[Executor] = None,
+    ) -> T:
+        """Run a sync session operation in a transaction on a worker thread.
+
+        Unlike ``run_sync`` this always uses the sync engine, so a caller with a
+        dedicated single-thread executor keeps all its work on that thread.
+
+        In-memory SQLite has a single StaticPool connection, which every thread
+        shares (``check_same_thread=False``). The sqlite3 module serializes calls
+        on it, and each operation runs in its own short transaction, so
+        concurrent readers and a writer are safe but do not run in parallel.
+
+        Args:
+            operation: Callable taking a Session followed by ``args``
+            *args: Extra positional arguments for the operation
+            executor: Executor to run in (default: the loop's executor)
+
+        Returns:
+            Result of the operation
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, functools.partial(self._run_in_session_scope, operation, *args)
+        )
+
+    def _run_in_session_scope(self, operation: Callable[..., T], *args: Any) -> T:
+        """Run a sync session operation in its own transaction."""
+        with self.session_scope() as session:
+            return operation(session, *args)
 
     async def execute_with_retry(self, operation, max_retries: int = 3):
         """Execute database operation with retry logic."""
         for attempt in range(max_retries):
             try:
-                async with self.async_session_scope() as session:
-                    return operation(session)
+                return await self.run_sync(operation)
             except Exception as e:
                 if attempt == max_retries - 1:
                     raise
                 # In a real implementation, you might want to add exponential backoff
                 continue
+
+    async def dispose(self) -> None:
+        """Dispose of the async engine's connection pool, if one was created."""
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
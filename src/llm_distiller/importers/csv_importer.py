@@ -97,7 +97,9 @@ class CSVImporter(BaseImporter):
         error_count = 0
         errors = []
 
-        async with self.db_manager.async_session_scope() as session:
+        def store(session) -> None:
+            nonlocal imported_count, error_count
+
             for question_data in data:
                 try:
                     # Check if question already exists
@@ -138,6 +140,8 @@ class CSVImporter(BaseImporter):
                     error_count += 1
                     errors.append(f"Error storing question: {str(e)}")
 
+        await self.db_manager.run_sync(store)
+
         return ImportResult(
             success=error_count == 0,
             imported_count=imported_count,
@@ -1,6 +1,23 @@
 """LLM package initialization."""
 
-from .base import BaseLLMProvider, ParsedResponse, ThinkingExtractor
-from .openai_provider import OpenAIProvider
+from .base import BaseLLMProvider, ParsedResponse, ProviderError, ThinkingExtractor, build_messages
+from .registry import ProviderRegistry, provider_registry
 
-__all__ = ["BaseLLMProvider", "ParsedResponse", "ThinkingExtractor", "OpenAIProvider"]
+__all__ = [
+    "BaseLLMProvider",
+    "ParsedResponse",
+    "ProviderError",
+    "ProviderRegistry",
+    "ThinkingExtractor",
+    "build_messages",
+    "provider_registry",
+    "OpenAIProvider",
+]
+
+
+def __getattr__(name: str):
+    # Provider modules pull in their SDKs, so they are imported on first access
+    if name == "OpenAIProvider":
+        from .openai_provider import OpenAIProvider
+        return OpenAIProvider
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,13 +1,15 @@
 """Base LLM provider interface."""
 
+import json
 import re
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
 from ..config import GenerationConfig, ProviderConfig
 
 if TYPE_CHECKING:
     from ..utils.rate_limiter import RateLimiter
+    from .streaming import StreamGuard
 
 
 class ParsedResponse:
@@ -31,6 +33,102 @@ class ParsedResponse:
         return f"<ParsedResponse(model='{self.model}', tokens={self.tokens_used})>"
 
 
+class ProviderError(Exception):
+    """Error raised by a provider call, carrying the HTTP details when known."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+RATE_LIMIT_HEADERS = (
+    "x-ratelimit-limit-requests",
+    "x-ratelimit-limit-tokens",
+    "x-ratelimit-remaining-requests",
+    "x-ratelimit-remaining-tokens",
+    "retry-after",
+    "retry-after-ms",
+)
+
+
+def extract_rate_limit_headers(headers: Any) -> Dict[str, str]:
+    """Pick the rate limit headers out of an HTTP header mapping.
+
+    Args:
+        headers: Case-insensitive header mapping from the HTTP response
+
+    Returns:
+        Lower-cased rate limit header names mapped to their values
+    """
+    if not headers:
+        return {}
+    return {name: headers[name] for name in RATE_LIMIT_HEADERS if name in headers}
+
+
+# Chat messages as sent to a provider: [{"role": ..., "content": ...}]
+Messages = List[Dict[str, str]]
+
+
+def build_messages(prompt: str, system_prompt: Optional[str] = None) -> Messages:
+    """Build the chat messages for a question.
+
+    The system prompt is sent as its own message, unchanged, so providers
+    can reuse the cached prefix shared by all questions with that prompt.
+
+    Args:
+        prompt: Question text
+        system_prompt: Optional system prompt
+
+    Returns:
+        Message list
+    """
+    messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def as_messages(prompt: Union[str, Messages]) -> Messages:
+    """Normalize a prompt to a message list; a plain string becomes one user message."""
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    return prompt
+
+
+def messages_text(messages: Messages) -> str:
+    """Concatenated content of all messages, e.g. for token estimates."""
+    return "\n\n".join(message["content"] for message in messages)
+
+
+def build_response_format(answer_schema: Optional[str], mode: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Build the ``response_format`` request parameter for a question.
+
+    Args:
+        answer_schema: JSON schema the answer must match, as stored on the question
+        mode: Structured output supported by the provider: "json_schema", "json_object" or None
+
+    Returns:
+        Response format, or None if the question has no schema or the provider has no structured output
+    """
+    if not answer_schema or not mode:
+        return None
+    if mode == "json_schema":
+        try:
+            schema = json.loads(answer_schema)
+        except ValueError:
+            schema = None
+        if isinstance(schema, dict):
+            # Not strict: arbitrary schemas rarely meet the strict-mode restrictions
+            return {"type": "json_schema", "json_schema": {"name": "answer", "schema": schema, "strict": False}}
+    # Unusable schemas still get valid JSON; the validator reports the rest
+    return {"type": "json_object"}
+
+
 class BaseLLMProvider(ABC):
     """Abstract base for all LLM providers."""
 
@@ -44,18 +142,40 @@ class BaseLLMProvider(ABC):
 
     @abstractmethod
     async def generate_response(
-        self, prompt: str, generation_config: GenerationConfig
+        self,
+        prompt: Union[str, Messages],
+        generation_config: GenerationConfig,
+        guard: Optional["StreamGuard"] = None,
+        answer_schema: Optional[str] = None,
     ) -> ParsedResponse:
         """Generate response from LLM.
 
         Args:
-            prompt: Input prompt for the LLM
+            prompt: Chat messages, or a plain string sent as a single user message
             generation_config: Generation parameters
+            guard: Checks a streamed response and may abort it (ignored when not streaming)
+            answer_schema: JSON schema the answer must match (ignored without structured output support)
 
         Returns:
             Parsed response with content and metadata
         """
 
+    async def generate_batch(
+        self,
+        prompts: List[Messages],
+        generation_config: GenerationConfig,
+    ) -> List[ParsedResponse]:
+        """Generate responses for several prompts in one request.
+
+        Args:
+            prompts: Chat messages of each request
+            generation_config: Generation parameters shared by all prompts
+
+        Returns:
+            One parsed response per prompt, in the same order
+        """
+        raise NotImplementedError(f"Provider '{self.provider_name}' does not support batched completions")
+
     @abstractmethod
     def get_rate_limiter(self) -> Optional["RateLimiter"]:
         """Get provider-specific rate limiter."""
@@ -0,0 +1,95 @@
+"""Shared HTTP connection pools for LLM providers."""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Connections kept when the expected concurrency is unknown (httpx defaults)
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 20
+
+
+class HTTPClientPool:
+    """One ``httpx.AsyncClient`` per endpoint, shared by all providers using it.
+
+    Providers pointing at the same ``base_url`` reuse the same keep-alive
+    connections instead of each paying for their own TCP and TLS handshakes.
+    Each client keeps as many idle connections as it may have in flight, so
+    connections are not closed and reopened between requests.
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: float,
+        connect_timeout_seconds: float,
+        keepalive_expiry_seconds: float = 30.0,
+    ):
+        """Initialize an empty pool.
+
+        Args:
+            timeout_seconds: Read, write and pool timeout for requests
+            connect_timeout_seconds: Timeout for establishing a connection
+            keepalive_expiry_seconds: Idle time after which connections are closed
+        """
+        self.timeout = httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds)
+        self.keepalive_expiry_seconds = keepalive_expiry_seconds
+        self._clients: Dict[Tuple[str, bool], httpx.AsyncClient] = {}
+
+    @staticmethod
+    def endpoint_key(base_url: str, http2: bool) -> Tuple[str, bool]:
+        """Key under which providers share a client."""
+        return (base_url or "").rstrip("/"), http2
+
+    def client_for(
+        self, base_url: str, http2: bool = False, max_connections: Optional[int] = None
+    ) -> httpx.AsyncClient:
+        """Get the shared client for an endpoint, creating it on first use.
+
+        Args:
+            base_url: Provider base URL ("" = the SDK's default endpoint)
+            http2: Negotiate HTTP/2 (needs the ``h2`` package)
+            max_connections: Maximum parallel requests to the endpoint (None = defaults)
+
+        Returns:
+            Shared HTTP client
+        """
+        key = self.endpoint_key(base_url, http2)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        if max_connections:
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=self.keepalive_expiry_seconds,
+            )
+        else:
+            limits = httpx.Limits(
+                max_connections=DEFAULT_MAX_CONNECTIONS,
+                max_keepalive_connections=DEFAULT_MAX_KEEPALIVE,
+                keepalive_expiry=self.keepalive_expiry_seconds,
+            )
+
+        try:
+            client = httpx.AsyncClient(limits=limits, timeout=self.timeout, http2=http2)
+        except ImportError:
+            logger.warning(
+                f"HTTP/2 requested for '{base_url or 'default endpoint'}' but the 'h2' package is "
+                "not installed (pip install 'httpx[http2]'); using HTTP/1.1"
+            )
+            client = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+
+        logger.debug(f"[DEBUG] Created HTTP client for '{base_url or 'default endpoint'}' (http2={http2}, limits={limits})")
+        self._clients[key] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close every client and its connections."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
@@ -1,13 +1,24 @@
 """OpenAI LLM provider implementation."""
 
 import time
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
+import httpx
 import openai
 from openai import AsyncOpenAI
 
 from ..config import GenerationConfig, ProviderConfig
-from .base import BaseLLMProvider, ParsedResponse
+from .base import (
+    BaseLLMProvider,
+    Messages,
+    ParsedResponse,
+    ProviderError,
+    ThinkingExtractor,
+    as_messages,
+    build_response_format,
+    extract_rate_limit_headers,
+)
+from .streaming import IncrementalThinkingExtractor, StreamGuard
 
 if TYPE_CHECKING:
     from ..utils.rate_limiter import RateLimiter
@@ -16,11 +27,12 @@ if TYPE_CHECKING:
 class OpenAIProvider(BaseLLMProvider):
     """OpenAI API provider implementation."""
 
-    def __init__(self, config: ProviderConfig):
+    def __init__(self, config: ProviderConfig, http_client: Optional[httpx.AsyncClient] = None):
         """Initialize OpenAI provider.
 
         Args:
             config: Provider configuration
+            http_client: Shared HTTP client (None = the SDK creates its own)
         """
         super().__init__(config)
 
@@ -31,33 +43,56 @@ class OpenAIProvider(BaseLLMProvider):
         client_kwargs = {"api_key": api_key}
         if config.base_url:
             client_kwargs["base_url"] = config.base_url
+        if http_client is not None:
+            client_kwargs["http_client"] = http_client
 
         self.client = AsyncOpenAI(**client_kwargs)
 
     async def generate_response(
-        self, prompt: str, generation_config: GenerationConfig
+        self,
+        prompt: Union[str, Messages],
+        generation_config: GenerationConfig,
+        guard: Optional[StreamGuard] = None,
+        answer_schema: Optional[str] = None,
     ) -> ParsedResponse:
         """Generate response from OpenAI API.
 
         Args:
-            prompt: Input prompt for the LLM
+            prompt: Chat messages, or a plain string sent as a single user message
             generation_config: Generation parameters
+            guard: Checks a streamed response and may abort it (streaming providers only)
+            answer_schema: JSON schema the answer must match; sent as ``response_format``
+                when ``structured_output`` is configured
 
         Returns:
             Parsed response with content and metadata
         """
         start_time = time.time()
+        stream = bool(self.config.stream)
 
         try:
-            response = await self.client.chat.completions.create(
+            request_kwargs: Dict[str, Any] = {}
+            if stream:
+                request_kwargs = {"stream": True, "stream_options": {"include_usage": True}}
+            response_format = build_response_format(answer_schema, self.config.structured_output)
+            if response_format:
+                request_kwargs["response_format"] = response_format
+            raw_response = await self.client.chat.completions.with_raw_response.create(
                 model=self.config.model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=as_messages(prompt),
                 temperature=generation_config.temperature,
                 max_tokens=generation_config.max_tokens,
                 top_p=generation_config.top_p,
                 frequency_penalty=generation_config.frequency_penalty,
                 presence_penalty=generation_config.presence_penalty,
+                **request_kwargs,
             )
+            response = raw_response.parse()
+            if stream:
+                parsed = await self._read_stream(response, guard)
+                parsed.metadata["processing_time_ms"] = int((time.time() - start_time) * 1000)
+                parsed.metadata["rate_limit_headers"] = extract_rate_limit_headers(raw_response.headers)
+                return parsed
 
             processing_time = int((time.time() - start_time) * 1000)
 
@@ -89,17 +124,171 @@ class OpenAIProvider(BaseLLMProvider):
                     "completion_tokens": (
                         response.usage.completion_tokens if response.usage else None
                     ),
+                    "cached_tokens": self._cached_tokens(response.usage),
+                    "rate_limit_headers": extract_rate_limit_headers(raw_response.headers),
                 },
             )
 
+        # Subclasses first: RateLimitError and AuthenticationError are APIErrors
+        except openai.RateLimitError as e:
+            raise self._provider_error(f"OpenAI rate limit exceeded: {e}", e)
+        except openai.AuthenticationError as e:
+            raise self._provider_error(f"OpenAI authentication error: {e}", e)
         except openai.APIError as e:
-            raise Exception(f"OpenAI API error: {e}")
+            raise self._provider_error(f"OpenAI API error: {e}", e)
+        except ProviderError:
+            raise
+        except Exception as e:
+            raise ProviderError(f"Unexpected error generating response: {e}")
+
+    async def generate_batch(
+        self,
+        prompts: List[Messages],
+        generation_config: GenerationConfig,
+    ) -> List[ParsedResponse]:
+        """Generate responses for several prompts in one /v1/completions request.
+
+        The completions endpoint takes plain text, so each prompt is rendered
+        with ``batching.prompt_template``. Usage is only reported for the
+        whole request and is split evenly over the responses.
+
+        Args:
+            prompts: Chat messages of each request
+            generation_config: Generation parameters shared by all prompts
+
+        Returns:
+            One parsed response per prompt, in the same order
+        """
+        start_time = time.time()
+        texts = [self._completion_prompt(as_messages(prompt)) for prompt in prompts]
+
+        try:
+            raw_response = await self.client.completions.with_raw_response.create(
+                model=self.config.model,
+                prompt=texts,
+                temperature=generation_config.temperature,
+                max_tokens=generation_config.max_tokens,
+                top_p=generation_config.top_p,
+                frequency_penalty=generation_config.frequency_penalty,
+                presence_penalty=generation_config.presence_penalty,
+            )
+            response = raw_response.parse()
         except openai.RateLimitError as e:
-            raise Exception(f"OpenAI rate limit exceeded: {e}")
+            raise self._provider_error(f"OpenAI rate limit exceeded: {e}", e)
         except openai.AuthenticationError as e:
-            raise Exception(f"OpenAI authentication error: {e}")
+            raise self._provider_error(f"OpenAI authentication error: {e}", e)
+        except openai.APIError as e:
+            raise self._provider_error(f"OpenAI API error: {e}", e)
         except Exception as e:
-            raise Exception(f"Unexpected error generating response: {e}")
+            raise ProviderError(f"Unexpected error generating batched response: {e}")
+
+        processing_time = int((time.time() - start_time) * 1000)
+        choices = sorted(response.choices, key=lambda choice: choice.index)
+        if len(choices) != len(texts):
+            raise ProviderError(f"Batched completion returned {len(choices)} choices for {len(texts)} prompts")
+
+        total_tokens = response.usage.total_tokens if response.usage else None
+        headers = extract_rate_limit_headers(raw_response.headers)
+        results = []
+        for position, choice in enumerate(choices):
+            tokens_used = None
+            if total_tokens is not None:
+                share, remainder = divmod(total_tokens, len(choices))
+                tokens_used = share + (1 if position < remainder else 0)
+            cleaned_content, thinking = ThinkingExtractor.extract_thinking(choice.text or "")
+            results.append(ParsedResponse(
+                content=cleaned_content,
+                tokens_used=tokens_used,
+                model=response.model,
+                thinking=thinking,
+                metadata={
+                    "processing_time_ms": processing_time,
+                    "finish_reason": choice.finish_reason,
+                    "batch_size": len(choices),
+                    "rate_limit_headers": headers,
+                },
+            ))
+        return results
+
+    def _completion_prompt(self, messages: Messages) -> str:
+        """Render chat messages as the plain-text prompt of a completions request."""
+        system_prompt = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        prompt = "\n\n".join(m["content"] for m in messages if m["role"] != "system")
+        template = self.config.batching.prompt_template
+        if template:
+            return template.format(system_prompt=system_prompt, prompt=prompt)
+        return f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+
+    async def _read_stream(self, stream: Any, guard: Optional[StreamGuard]) -> ParsedResponse:
+        """Collect a streamed completion, aborting it if the guard objects.
+
+        Args:
+            stream: Async iterator of completion chunks
+            guard: Checks the content as it arrives (None = never abort)
+
+        Returns:
+            Parsed response; metadata lacks timing and headers
+        """
+        extractor = guard.extractor if guard else IncrementalThinkingExtractor()
+        reasoning_parts = []
+        model = finish_reason = usage = None
+
+        try:
+            async for chunk in stream:
+                model = chunk.model or model
+                if chunk.usage:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                delta = choice.delta
+                if getattr(delta, "reasoning", None):
+                    reasoning_parts.append(delta.reasoning)
+                if not delta.content:
+                    continue
+                if guard:
+                    reason = guard.feed(delta.content)
+                    if reason:
+                        raise ProviderError(
+                            f"Stream aborted after {len(extractor.raw)} characters: {reason}"
+                        )
+                else:
+                    extractor.feed(delta.content)
+        finally:
+            # Closing the stream stops generation and frees the connection
+            await stream.close()
+
+        cleaned_content, thinking = extractor.finish("".join(reasoning_parts) or None)
+        return ParsedResponse(
+            content=cleaned_content,
+            tokens_used=usage.total_tokens if usage else None,
+            model=model,
+            thinking=thinking,
+            metadata={
+                "finish_reason": finish_reason,
+                "prompt_tokens": usage.prompt_tokens if usage else None,
+                "completion_tokens": usage.completion_tokens if usage else None,
+                "cached_tokens": self._cached_tokens(usage),
+                "streamed": True,
+            },
+        )
+
+    @staticmethod
+    def _cached_tokens(usage: Any) -> Optional[int]:
+        """Prompt tokens served from the provider's prefix cache, if reported."""
+        details = getattr(usage, "prompt_tokens_details", None) if usage else None
+        return getattr(details, "cached_tokens", None) if details else None
+
+    @staticmethod
+    def _provider_error(message: str, error: "openai.APIError") -> ProviderError:
+        """Wrap an OpenAI error, keeping its status code and rate limit headers."""
+        response = getattr(error, "response", None)
+        return ProviderError(
+            message,
+            status_code=getattr(error, "status_code", None),
+            headers=extract_rate_limit_headers(response.headers) if response is not None else None,
+        )
 
     def get_rate_limiter(self) -> Optional["RateLimiter"]:
         """Get OpenAI-specific rate limiter."""
@@ -143,5 +332,6 @@ class OpenAIProvider(BaseLLMProvider):
                 "completion_tokens": (
                     raw_response.usage.completion_tokens if raw_response.usage else None
                 ),
+                "cached_tokens": self._cached_tokens(raw_response.usage),
             },
         )
@@ -0,0 +1,103 @@
+"""Registry of LLM provider implementations."""
+
+import importlib
+import logging
+from importlib import metadata
+from typing import TYPE_CHECKING, Dict, List, Optional, Type, Union
+
+if TYPE_CHECKING:
+    from .base import BaseLLMProvider
+
+logger = logging.getLogger(__name__)
+
+# Entry point group third-party packages register their providers under
+ENTRY_POINT_GROUP = "llm_distiller.providers"
+
+BUILTIN_PROVIDERS = {
+    "openai": "llm_distiller.llm.openai_provider:OpenAIProvider",
+}
+
+
+class ProviderRegistry:
+    """Maps provider types to their implementation classes.
+
+    Implementations are known as ``module:Class`` references, from the
+    built-in providers and the ``llm_distiller.providers`` entry point group.
+    A module is imported only when a provider of its type is first needed, so
+    commands that never call a provider do not load any provider SDK.
+    """
+
+    def __init__(self, builtins: Optional[Dict[str, str]] = None, group: str = ENTRY_POINT_GROUP):
+        """Initialize the registry.
+
+        Args:
+            builtins: Provider types shipped with the package (None = BUILTIN_PROVIDERS)
+            group: Entry point group to discover further providers in
+        """
+        self.group = group
+        self._targets: Dict[str, Union[str, Type["BaseLLMProvider"]]] = dict(
+            BUILTIN_PROVIDERS if builtins is None else builtins
+        )
+        self._discovered = False
+
+    def register(self, provider_type: str, target: Union[str, Type["BaseLLMProvider"]]) -> None:
+        """Register a provider implementation.
+
+        Args:
+            provider_type: Value of ``type`` in the provider configuration
+            target: Provider class, or a ``module:Class`` reference imported on first use
+        """
+        self._targets[provider_type] = target
+
+    def __contains__(self, provider_type: str) -> bool:
+        if provider_type not in self._targets:
+            self._discover()
+        return provider_type in self._targets
+
+    def types(self) -> List[str]:
+        """Get all known provider types."""
+        self._discover()
+        return sorted(self._targets)
+
+    def get(self, provider_type: str) -> Type["BaseLLMProvider"]:
+        """Get the implementation class of a provider type, importing it if needed.
+
+        Args:
+            provider_type: Value of ``type`` in the provider configuration
+
+        Returns:
+            Provider class
+
+        Raises:
+            ValueError: If no implementation is registered for the type
+        """
+        if provider_type not in self:
+            raise ValueError(f"Unknown provider type: {provider_type}")
+
+        target = self._targets[provider_type]
+        if isinstance(target, str):
+            logger.debug(f"[DEBUG] Importing provider '{provider_type}' from {target}")
+            module_name, _, attribute = target.partition(":")
+            provider_class = importlib.import_module(module_name)
+            for name in attribute.split("."):
+                provider_class = getattr(provider_class, name)
+            self._targets[provider_type] = target = provider_class
+        return target
+
+    def _discover(self) -> None:
+        """Read the entry point group once; built-in and registered types take precedence."""
+        if self._discovered:
+            return
+        self._discovered = True
+        entry_points = metadata.entry_points()
+        if hasattr(entry_points, "select"):
+            selected = entry_points.select(group=self.group)
+        else:
+            # Python 3.9 returns a dict of groups
+            selected = entry_points.get(self.group, [])
+        for entry_point in selected:
+            self._targets.setdefault(entry_point.name, entry_point.value)
+
+
+# Registry used by the provider manager
+provider_registry = ProviderRegistry()
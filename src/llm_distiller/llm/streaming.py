@@ -0,0 +1,219 @@
+"""Incremental processing of streamed LLM responses."""
+
+import re
+from typing import List, Optional, Tuple
+
+from .base import ThinkingExtractor
+
+# Tags ThinkingExtractor understands, in lower case
+THINKING_TAGS = ("think", "reason")
+
+
+def _partial_tag_start(text: str, tags: Tuple[str, ...]) -> int:
+    """Index where a possibly incomplete tag starts at the end of ``text``, or len(text)."""
+    start = text.rfind("<")
+    if start == -1:
+        return len(text)
+    tail = text[start:].lower()
+    if any(tag.startswith(tail) for tag in tags):
+        return start
+    return len(text)
+
+
+class IncrementalThinkingExtractor:
+    """Splits a streamed response into answer and thinking text as it arrives.
+
+    Text inside ``<think>`` or ``<reason>`` tags is routed to the thinking
+    side; everything else is answer text. Tags split across chunks are held
+    back until they can be recognised. ``finish`` produces the same result as
+    ``ThinkingExtractor.extract_thinking`` on the complete text, so streamed
+    and non-streamed responses are stored identically.
+    """
+
+    def __init__(self):
+        self._raw: List[str] = []
+        self._buffer = ""
+        self._inside: Optional[str] = None  # tag name while inside a thinking block
+        self.answer = ""
+        self.thinking = ""
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk of streamed text.
+
+        Args:
+            chunk: Newly received text
+
+        Returns:
+            Answer text released by this chunk
+        """
+        self._raw.append(chunk)
+        self._buffer += chunk
+        released: List[str] = []
+
+        while self._buffer:
+            lowered = self._buffer.lower()
+            if self._inside is None:
+                matches = [(lowered.find(f"<{tag}>"), tag) for tag in THINKING_TAGS]
+                matches = [(index, tag) for index, tag in matches if index != -1]
+                if matches:
+                    index, tag = min(matches)
+                    released.append(self._buffer[:index])
+                    self._buffer = self._buffer[index + len(tag) + 2:]
+                    self._inside = tag
+                    continue
+                keep = _partial_tag_start(self._buffer, tuple(f"<{tag}>" for tag in THINKING_TAGS))
+                released.append(self._buffer[:keep])
+                self._buffer = self._buffer[keep:]
+            else:
+                close = f"</{self._inside}>"
+                index = lowered.find(close)
+                if index != -1:
+                    self.thinking += self._buffer[:index]
+                    self._buffer = self._buffer[index + len(close):]
+                    self._inside = None
+                    continue
+                keep = _partial_tag_start(self._buffer, (close,))
+                self.thinking += self._buffer[:keep]
+                self._buffer = self._buffer[keep:]
+            break
+
+        text = "".join(released)
+        self.answer += text
+        return text
+
+    @property
+    def raw(self) -> str:
+        """Complete text received so far."""
+        return "".join(self._raw)
+
+    def finish(self, separate_reasoning: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """Return the final (content, thinking) pair for the complete response."""
+        return ThinkingExtractor.extract_thinking(self.raw, separate_reasoning)
+
+
+class JSONPrefixChecker:
+    """Detects text that can no longer turn into a single valid JSON value.
+
+    This is a cheap structural check, not a parser: it tracks strings and
+    bracket nesting, rejects characters that cannot appear outside strings,
+    mismatched brackets and anything but whitespace after the top-level
+    object or array has closed.
+    """
+
+    _CLOSERS = {"}": "{", "]": "["}
+    _BARE_CHARS = set(" \t\r\n{}[],:\"-+.0123456789eEtrufalsn")
+
+    def __init__(self):
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._closed = False
+
+    def feed(self, text: str) -> Optional[str]:
+        """Check newly received answer text.
+
+        Returns:
+            Reason the text cannot become valid JSON, or None if it still can
+        """
+        for char in text:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char.isspace():
+                continue
+            if self._closed:
+                return "unexpected text after the JSON value"
+            if char not in self._BARE_CHARS:
+                return f"unexpected character {char!r} outside a JSON string"
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._stack.append(char)
+            elif char in self._CLOSERS:
+                if not self._stack or self._stack.pop() != self._CLOSERS[char]:
+                    return f"unbalanced {char!r}"
+                if not self._stack:
+                    self._closed = True
+        return None
+
+
+class RepetitionDetector:
+    """Detects degenerate output that keeps repeating the same short span."""
+
+    def __init__(self, window: int = 400, max_period: int = 100, check_every: int = 64):
+        """Initialize the detector.
+
+        Args:
+            window: Length of the tail that must consist of one repeated span
+            max_period: Longest repeated span considered
+            check_every: Characters received between checks
+        """
+        self.window = window
+        self.max_period = max_period
+        self.check_every = check_every
+        self._tail = ""
+        self._since_check = 0
+
+    def feed(self, text: str) -> Optional[str]:
+        """Check newly received text.
+
+        Returns:
+            Reason the output looks like runaway repetition, or None
+        """
+        self._tail = (self._tail + text)[-self.window:]
+        self._since_check += len(text)
+        if len(self._tail) < self.window or self._since_check < self.check_every:
+            return None
+        self._since_check = 0
+        for period in range(1, self.max_period + 1):
+            if self._tail[period:] == self._tail[:-period]:
+                span = re.sub(r"\s+", " ", self._tail[-period:])[:40]
+                return f"runaway repetition of {span!r}"
+        return None
+
+
+class StreamGuard:
+    """Decides whether a streamed response should be aborted early.
+
+    By default only answer text is checked for repetition: reasoning often
+    restates itself while working through a problem.
+    """
+
+    def __init__(
+        self,
+        expect_json: bool = False,
+        repetition: Optional[RepetitionDetector] = None,
+        check_thinking: bool = False,
+    ):
+        """Initialize the guard.
+
+        Args:
+            expect_json: The answer must be JSON (the question has an answer schema)
+            repetition: Repetition detector (None = default settings)
+            check_thinking: Also check thinking text for repetition
+        """
+        self.extractor = IncrementalThinkingExtractor()
+        self.json_checker = JSONPrefixChecker() if expect_json else None
+        self.repetition = repetition or RepetitionDetector()
+        self.check_thinking = check_thinking
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Consume a chunk of streamed content.
+
+        Returns:
+            Reason to abort the stream, or None to keep going
+        """
+        answer = self.extractor.feed(chunk)
+        if self.json_checker and answer:
+            reason = self.json_checker.feed(answer)
+            if reason:
+                return f"answer cannot become valid JSON ({reason})"
+        if self.check_thinking:
+            return self.repetition.feed(chunk)
+        return self.repetition.feed(answer) if answer else None
@@ -2,14 +2,129 @@
 
 import asyncio
 import time
-from collections import defaultdict, deque
 from typing import Dict, Optional
 
 from ..config import RateLimitConfig
 
+# Rough characters-per-token ratio for English text with GPT-style tokenizers
+CHARS_PER_TOKEN = 4
+
+# AIMD tuning: a 429 halves the per-minute limits, never below 5% of them
+DECREASE_FACTOR = 0.5
+MIN_SCALE = 0.05
+
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    """Parse a numeric header value, returning None if it is missing or malformed."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_retry_after(headers: Optional[Dict[str, str]]) -> Optional[float]:
+    """Read the retry delay from ``retry-after-ms`` or ``retry-after`` headers.
+
+    Args:
+        headers: Lower-cased response headers
+
+    Returns:
+        Delay in seconds, or None if the headers carry no usable delay
+    """
+    if not headers:
+        return None
+    retry_after_ms = _parse_number(headers.get("retry-after-ms"))
+    if retry_after_ms is not None:
+        return max(0.0, retry_after_ms / 1000)
+    # HTTP-date values are not used by LLM APIs and are ignored
+    retry_after = _parse_number(headers.get("retry-after"))
+    if retry_after is not None:
+        return max(0.0, retry_after)
+    return None
+
+
+def estimate_tokens(text: str, max_tokens: int = 0) -> int:
+    """Estimate the token cost of a request before it is sent.
+
+    Args:
+        text: Prompt text sent to the model
+        max_tokens: Completion budget requested from the model
+
+    Returns:
+        Estimated total tokens (prompt + completion)
+    """
+    return len(text) // CHARS_PER_TOKEN + 1 + max_tokens
+
+
+class TokenBucket:
+    """Token bucket that refills continuously up to its capacity."""
+
+    def __init__(self, capacity: float, period_seconds: float):
+        """Initialize a full bucket.
+
+        Args:
+            capacity: Maximum number of tokens in the bucket
+            period_seconds: Time in which an empty bucket refills completely
+        """
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / period_seconds
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update."""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self.updated_at = now
+
+    def resize(self, capacity: float) -> None:
+        """Change the capacity, scaling the refill rate with it."""
+        period_seconds = self.capacity / self.refill_rate
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / period_seconds
+        self.tokens = min(self.tokens, self.capacity)
+
+    def limit_to(self, remaining: float, now: float) -> None:
+        """Lower the balance to a server-reported remaining count."""
+        self._refill(now)
+        self.tokens = min(self.tokens, remaining)
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` tokens are available."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        if self.refill_rate <= 0:
+            return float("inf")
+        return (amount - self.tokens) / self.refill_rate
+
+    def consume(self, amount: float) -> None:
+        """Take tokens; the balance may go negative to record debt."""
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact."""
+        self.tokens = min(self.capacity, self.tokens + delta)
+
 
 class RateLimiter:
-    """Rate limiter that adapts to API feedback."""
+    """Token-bucket rate limiter for requests and tokens.
+
+    Requests are limited per minute and per hour and tokens per minute, each
+    with its own bucket. ``acquire`` waits until every bucket has capacity,
+    charging an estimated token cost that ``reconcile`` corrects once the
+    provider reports actual usage.
+
+    With ``adaptive`` enabled the per-minute limits follow the provider:
+    rate limit headers replace the configured limits and cap the remaining
+    balance, each success grows the limits by one request's share
+    (additive increase) and each 429 halves them (multiplicative decrease)
+    and pauses requests for the advertised ``retry-after``.
+    """
 
     def __init__(self, config: RateLimitConfig, provider_name: str):
         """Initialize rate limiter.
@@ -20,118 +135,150 @@ class RateLimiter:
         """
         self.config = config
         self.provider_name = provider_name
-        self.request_history = defaultdict(deque)
-        self.api_adaptive_limits = {}
+        self.minute_requests = TokenBucket(config.requests_per_minute, 60)
+        self.hour_requests = TokenBucket(config.requests_per_hour, 3600)
+        self.minute_tokens = TokenBucket(config.tokens_per_minute, 60)
+        self.api_adaptive_limits: Dict[str, float] = {}
+        self.base_requests_per_minute = float(config.requests_per_minute)
+        self.base_tokens_per_minute = float(config.tokens_per_minute)
+        self.scale = 1.0
+        self.max_scale = config.adaptive_max_scale
+        self.blocked_until = 0.0
         self._lock = asyncio.Lock()
 
-    async def acquire(self) -> bool:
-        """Acquire permission to make request.
+    def _wait_time(self, tokens: int, now: float) -> float:
+        """Seconds until a request of ``tokens`` fits every bucket."""
+        return max(
+            self.blocked_until - now,
+            self.minute_requests.time_until(1, now),
+            self.hour_requests.time_until(1, now),
+            self.minute_tokens.time_until(tokens, now),
+        )
+
+    async def acquire(self, tokens: int = 0, timeout: Optional[float] = None) -> bool:
+        """Wait for capacity and reserve it for one request.
+
+        Waiters are served in arrival order.
+
+        Args:
+            tokens: Estimated tokens the request will use
+            timeout: Give up instead of waiting longer than this many seconds
 
         Returns:
-            True if request can proceed, False if rate limited
+            True once capacity is reserved, False if it would take longer than timeout
         """
         async with self._lock:
-            now = time.time()
-
-            # Check per-minute limit
-            minute_key = int(now // 60)
-            minute_requests = [
-                req_time
-                for req_time in self.request_history["minute"]
-                if int(req_time // 60) == minute_key
-            ]
-
-            if len(minute_requests) >= self.config.requests_per_minute:
-                wait_time = 60 - (now % 60)
+            wait_time = self._wait_time(tokens, time.monotonic())
+            if timeout is not None and wait_time > timeout:
                 return False
 
-            # Check per-hour limit
-            hour_key = int(now // 3600)
-            hour_requests = [
-                req_time
-                for req_time in self.request_history["hour"]
-                if int(req_time // 3600) == hour_key
-            ]
-
-            if len(hour_requests) >= self.config.requests_per_hour:
-                wait_time = 3600 - (now % 3600)
-                return False
-
-            # Record this request
-            self.request_history["minute"].append(now)
-            self.request_history["hour"].append(now)
-
-            # Clean old requests
-            self._cleanup_old_requests(now)
+            while wait_time > 0:
+                await asyncio.sleep(wait_time)
+                wait_time = self._wait_time(tokens, time.monotonic())
 
+            self.minute_requests.consume(1)
+            self.hour_requests.consume(1)
+            self.minute_tokens.consume(tokens)
             return True
 
-    def _cleanup_old_requests(self, now: float) -> None:
-        """Clean up old request history.
+    def reconcile(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Correct the token bucket once actual usage is known.
 
         Args:
-            now: Current timestamp
+            estimated_tokens: Tokens charged by ``acquire``
+            actual_tokens: Tokens reported by the provider (None = keep the estimate)
         """
-        # Clean requests older than 1 minute
-        minute_cutoff = now - 60
-        while (
-            self.request_history["minute"]
-            and self.request_history["minute"][0] < minute_cutoff
-        ):
-            self.request_history["minute"].popleft()
-
-        # Clean requests older than 1 hour
-        hour_cutoff = now - 3600
-        while (
-            self.request_history["hour"]
-            and self.request_history["hour"][0] < hour_cutoff
-        ):
-            self.request_history["hour"].popleft()
-
-    def update_from_response(self, response_headers: Dict[str, str]) -> None:
-        """Update limits based on API response headers.
+        if actual_tokens is None:
+            return
+        self.minute_tokens.adjust(estimated_tokens - actual_tokens)
+
+    def update_from_response(self, response_headers: Optional[Dict[str, str]]) -> None:
+        """Update limits after a successful response.
 
         Args:
-            response_headers: Response headers from API
+            response_headers: Lower-cased rate limit headers from the response
         """
-        # This would parse rate limit headers from APIs like OpenAI
-        # For now, we'll keep the configured limits
-        pass
+        if not self.config.adaptive:
+            return
+        self._apply_headers(response_headers or {}, time.monotonic())
+        self.scale = min(self.max_scale, self.scale + 1 / max(self.base_requests_per_minute, 1.0))
+        self._apply_scale()
 
-    def calculate_wait_time(self) -> float:
-        """Calculate required wait time based on current limits.
+    def on_rate_limited(self, response_headers: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """Back off after the provider rejected a request with a 429.
+
+        Args:
+            response_headers: Lower-cased rate limit headers from the error response
 
         Returns:
-            Wait time in seconds
+            Seconds the provider asked us to wait, if it said
         """
-        now = time.time()
+        headers = response_headers or {}
+        if not self.config.adaptive:
+            return parse_retry_after(headers)
+        retry_after = self._apply_headers(headers, time.monotonic())
+        self.scale = max(MIN_SCALE, self.scale * DECREASE_FACTOR)
+        self._apply_scale()
+        return retry_after
 
-        # Check minute limit
-        minute_key = int(now // 60)
-        minute_requests = [
-            req_time
-            for req_time in self.request_history["minute"]
-            if int(req_time // 60) == minute_key
-        ]
+    def _apply_headers(self, headers: Dict[str, str], now: float) -> Optional[float]:
+        """Adopt provider-reported limits, remaining balances and retry delay."""
+        limit_requests = _parse_number(headers.get("x-ratelimit-limit-requests"))
+        if limit_requests:
+            self.base_requests_per_minute = limit_requests
+            self.api_adaptive_limits["requests_per_minute"] = limit_requests
+            # The provider's own limit is the ceiling
+            self.max_scale = 1.0
+        limit_tokens = _parse_number(headers.get("x-ratelimit-limit-tokens"))
+        if limit_tokens:
+            self.base_tokens_per_minute = limit_tokens
+            self.api_adaptive_limits["tokens_per_minute"] = limit_tokens
+            self.max_scale = 1.0
+        self.scale = min(self.scale, self.max_scale)
 
-        if len(minute_requests) >= self.config.requests_per_minute:
-            return 60 - (now % 60)
+        remaining_requests = _parse_number(headers.get("x-ratelimit-remaining-requests"))
+        if remaining_requests is not None:
+            self.minute_requests.limit_to(remaining_requests, now)
+        remaining_tokens = _parse_number(headers.get("x-ratelimit-remaining-tokens"))
+        if remaining_tokens is not None:
+            self.minute_tokens.limit_to(remaining_tokens, now)
 
-        # Check hour limit
-        hour_key = int(now // 3600)
-        hour_requests = [
-            req_time
-            for req_time in self.request_history["hour"]
-            if int(req_time // 3600) == hour_key
-        ]
+        retry_after = parse_retry_after(headers)
+        if retry_after is not None:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+        return retry_after
 
-        if len(hour_requests) >= self.config.requests_per_hour:
-            return 3600 - (now % 3600)
+    def _apply_scale(self) -> None:
+        """Resize the per-minute buckets to the current scale."""
+        self.minute_requests.resize(max(1.0, self.base_requests_per_minute * self.scale))
+        self.minute_tokens.resize(max(1.0, self.base_tokens_per_minute * self.scale))
 
-        return 0.0
+    def calculate_wait_time(self, tokens: int = 0) -> float:
+        """Calculate required wait time based on current limits.
+
+        Args:
+            tokens: Estimated tokens for the next request
 
-    async def wait_if_needed(self) -> None:
+        Returns:
+            Wait time in seconds
+        """
+        return self._wait_time(tokens, time.monotonic())
+
+    async def wait_if_needed(self, tokens: int = 0) -> None:
         """Wait if rate limit would be exceeded."""
-        wait_time = self.calculate_wait_time()
+        wait_time = self.calculate_wait_time(tokens)
         if wait_time > 0:
             await asyncio.sleep(wait_time)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get currently available capacity per bucket."""
+        now = time.monotonic()
+        for bucket in (self.minute_requests, self.hour_requests, self.minute_tokens):
+            bucket._refill(now)
+        return {
+            "effective_requests_per_minute": self.minute_requests.capacity,
+            "effective_tokens_per_minute": self.minute_tokens.capacity,
+            "available_requests_minute": self.minute_requests.tokens,
+            "available_requests_hour": self.hour_requests.tokens,
+            "available_tokens_minute": self.minute_tokens.tokens,
+        }
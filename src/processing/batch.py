@@ -0,0 +1,434 @@
+"""Offline processing through provider batch APIs.
+
+Questions are written to JSONL files in the OpenAI ``/v1/batches`` input
+format, submitted through a ``BatchClient`` and polled until the provider
+has finished them. The result files are parsed back into ``WorkerResult``
+objects so they can be validated and stored like interactive responses.
+Submitted batches are recorded in a state file until their results are
+stored, so an interrupted run can be resumed without paying twice.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from llm_distiller.config import GenerationConfig
+from llm_distiller.llm.base import Messages, ThinkingExtractor, build_response_format
+
+from .models import QuestionTask, WorkerResult
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Input file limits of the OpenAI batch API
+MAX_REQUESTS_PER_FILE = 50000
+MAX_FILE_BYTES = 200 * 1024 * 1024
+
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+CUSTOM_ID_PREFIX = "question-"
+
+# State file in the batch directory listing batches whose results are not stored yet
+PENDING_BATCHES_FILE = "pending_batches.json"
+
+
+def build_batch_request(
+    task: QuestionTask,
+    messages: Messages,
+    model: str,
+    generation_config: GenerationConfig,
+    structured_output: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build one line of a batch input file.
+
+    Args:
+        task: Question to ask
+        messages: Chat messages for the question, including any system prompt
+        model: Model name
+        generation_config: Generation parameters
+        structured_output: Structured output mode of the provider, applied to questions with an answer schema
+
+    Returns:
+        Batch request dictionary
+    """
+    request = {
+        "custom_id": f"{CUSTOM_ID_PREFIX}{task.question_id}",
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": model,
+            "messages": messages,
+            "temperature": generation_config.temperature,
+            "max_tokens": generation_config.max_tokens,
+            "top_p": generation_config.top_p,
+            "frequency_penalty": generation_config.frequency_penalty,
+            "presence_penalty": generation_config.presence_penalty,
+        },
+    }
+    response_format = build_response_format(task.answer_schema, structured_output)
+    if response_format:
+        request["body"]["response_format"] = response_format
+    return request
+
+
+def parse_batch_result(line: str, provider_name: str) -> Tuple[Optional[int], WorkerResult]:
+    """Parse one line of a batch output or error file.
+
+    Args:
+        line: JSON line written by the batch API
+        provider_name: Provider the batch was submitted to
+
+    Returns:
+        Tuple of (question id or None if the custom_id is not ours, worker result)
+    """
+    record = json.loads(line)
+    custom_id = record.get("custom_id") or ""
+    question_id = None
+    if custom_id.startswith(CUSTOM_ID_PREFIX) and custom_id[len(CUSTOM_ID_PREFIX):].isdigit():
+        question_id = int(custom_id[len(CUSTOM_ID_PREFIX):])
+
+    response = record.get("response") or {}
+    status_code = response.get("status_code")
+    body = response.get("body") or {}
+    error = record.get("error") or body.get("error")
+
+    if error or status_code != 200:
+        if isinstance(error, dict):
+            message = error.get("message") or error.get("code") or "Unknown batch error"
+        else:
+            message = str(error) if error else f"Batch request failed with status {status_code}"
+        return question_id, WorkerResult(
+            question_id=question_id or 0,
+            provider_name=provider_name,
+            model_name=body.get("model") or "unknown",
+            success=False,
+            error_message=message,
+            error_type="rate_limit" if status_code == 429 else "general",
+        )
+
+    choice = body["choices"][0]
+    message = choice.get("message") or {}
+    content, thinking = ThinkingExtractor.extract_thinking(
+        message.get("content") or "", message.get("reasoning") or None
+    )
+    usage = body.get("usage") or {}
+    prompt_details = usage.get("prompt_tokens_details") or {}
+    return question_id, WorkerResult(
+        question_id=question_id or 0,
+        provider_name=provider_name,
+        model_name=body.get("model") or "unknown",
+        success=True,
+        response_text=content,
+        thinking=thinking,
+        tokens_used=usage.get("total_tokens"),
+        cached_tokens=prompt_details.get("cached_tokens"),
+    )
+
+
+class BatchFileWriter:
+    """Writes batch requests to JSONL files, starting a new file at the API limits."""
+
+    def __init__(
+        self,
+        directory: Path,
+        model: str,
+        generation_config: GenerationConfig,
+        max_requests: int = MAX_REQUESTS_PER_FILE,
+        max_bytes: int = MAX_FILE_BYTES,
+        structured_output: Optional[str] = None,
+    ):
+        """Initialize the writer.
+
+        Args:
+            directory: Directory the input files are written to
+            model: Model name for every request
+            generation_config: Generation parameters for every request
+            max_requests: Requests per file
+            max_bytes: Bytes per file
+            structured_output: Structured output mode of the provider ("json_schema", "json_object" or None)
+        """
+        self.directory = Path(directory)
+        self.model = model
+        self.generation_config = generation_config
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.structured_output = structured_output
+        self.paths: List[Path] = []
+        self.question_ids: Dict[Path, List[int]] = {}
+        # The random part keeps runs started in the same second apart
+        self._prefix = f"batch-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self._file: Optional[IO[bytes]] = None
+        self._requests = 0
+        self._bytes = 0
+
+    def add(self, task: QuestionTask, messages: Messages) -> None:
+        """Append the request for a question.
+
+        Args:
+            task: Question to ask
+            messages: Chat messages for the question, including any system prompt
+        """
+        request = build_batch_request(task, messages, self.model, self.generation_config, self.structured_output)
+        line = (json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8")
+        if self._file is None or self._requests >= self.max_requests or self._bytes + len(line) > self.max_bytes:
+            self._start_file()
+        self._file.write(line)
+        self.question_ids[self.paths[-1]].append(task.question_id)
+        self._requests += 1
+        self._bytes += len(line)
+
+    def _start_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{self._prefix}-{len(self.paths) + 1:03d}.jsonl"
+        self.paths.append(path)
+        self.question_ids[path] = []
+        self._file = path.open("wb")
+        self._requests = 0
+        self._bytes = 0
+
+    def close(self) -> List[Path]:
+        """Close the current file.
+
+        Returns:
+            Paths of all files written
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return self.paths
+
+
+class PendingBatches:
+    """Submitted batches whose results have not been stored yet.
+
+    Kept in a JSON file in the batch directory: a batch is added as soon as it
+    is submitted and removed once its results are stored. A run interrupted
+    while polling leaves its batches in the file, and the next run picks them
+    up instead of submitting the same questions again.
+    """
+
+    def __init__(self, directory: Path):
+        """Load the state file of a batch directory.
+
+        Args:
+            directory: Directory holding the batch input files
+        """
+        self.path = Path(directory) / PENDING_BATCHES_FILE
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            self.batches = json.loads(self.path.read_text(encoding="utf-8"))
+
+    def add(
+        self, batch_id: str, provider_name: str, question_ids: List[int], system_prompt: Optional[str]
+    ) -> None:
+        """Record a submitted batch.
+
+        Args:
+            batch_id: Id returned by the batch client
+            provider_name: Provider the batch was submitted to
+            question_ids: Questions in the batch
+            system_prompt: Default system prompt the batch was written with
+        """
+        self.batches[batch_id] = {
+            "provider": provider_name,
+            "question_ids": question_ids,
+            "system_prompt": system_prompt,
+        }
+        self._save()
+
+    def remove(self, batch_id: str) -> None:
+        """Forget a batch whose results have been stored."""
+        if self.batches.pop(batch_id, None) is not None:
+            self._save()
+
+    def for_provider(self, provider_name: str) -> Dict[str, Dict[str, Any]]:
+        """Pending batches submitted to a provider, by batch id."""
+        return {
+            batch_id: batch for batch_id, batch in self.batches.items() if batch["provider"] == provider_name
+        }
+
+    def question_ids(self) -> Set[int]:
+        """Questions in any pending batch."""
+        return {question_id for batch in self.batches.values() for question_id in batch["question_ids"]}
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.batches), encoding="utf-8")
+        # Replace atomically so an interrupted write never loses the batch list
+        os.replace(temporary, self.path)
+
+
+@dataclass
+class BatchStatus:
+    """State of a submitted batch."""
+    batch_id: str
+    status: str
+    output_file_id: Optional[str] = None
+    error_file_id: Optional[str] = None
+    completed: int = 0
+    failed: int = 0
+    total: int = 0
+
+    @property
+    def finished(self) -> bool:
+        """Whether the batch has reached a final state."""
+        return self.status in TERMINAL_STATUSES
+
+
+class BatchClient(ABC):
+    """Submits batch input files and retrieves their results."""
+
+    @abstractmethod
+    async def submit(self, path: Path, completion_window: str) -> str:
+        """Upload an input file and start a batch.
+
+        Args:
+            path: Batch input file
+            completion_window: Time the provider may take, e.g. "24h"
+
+        Returns:
+            Batch id
+        """
+
+    @abstractmethod
+    async def retrieve(self, batch_id: str) -> BatchStatus:
+        """Get the current state of a batch."""
+
+    @abstractmethod
+    async def read_file(self, file_id: str) -> str:
+        """Download the contents of an output or error file."""
+
+
+class OpenAIBatchClient(BatchClient):
+    """Batch client for the OpenAI files and batches endpoints."""
+
+    def __init__(self, client: Any):
+        """Initialize the client.
+
+        Args:
+            client: AsyncOpenAI client of the provider the batches go to
+        """
+        self.client = client
+
+    async def submit(self, path: Path, completion_window: str) -> str:
+        with Path(path).open("rb") as handle:
+            uploaded = await self.client.files.create(file=handle, purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=completion_window,
+        )
+        return batch.id
+
+    async def retrieve(self, batch_id: str) -> BatchStatus:
+        batch = await self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return BatchStatus(
+            batch_id=batch.id,
+            status=batch.status,
+            output_file_id=batch.output_file_id,
+            error_file_id=batch.error_file_id,
+            completed=counts.completed if counts else 0,
+            failed=counts.failed if counts else 0,
+            total=counts.total if counts else 0,
+        )
+
+    async def read_file(self, file_id: str) -> str:
+        content = await self.client.files.content(file_id)
+        return content.text
+
+
+class LocalBatchClient(BatchClient):
+    """File-based stand-in for a batch API.
+
+    Each request body is answered by ``respond`` when the batch is submitted,
+    and the results are written to output and error files in ``directory``
+    using the same line format as the real API.
+    """
+
+    def __init__(self, directory: Path, respond: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        """Initialize the client.
+
+        Args:
+            directory: Directory for result files
+            respond: Returns a chat completion body for a request body; raising marks the request failed
+        """
+        self.directory = Path(directory)
+        self.respond = respond
+        self.batches: Dict[str, BatchStatus] = {}
+
+    async def submit(self, path: Path, completion_window: str) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        output_path = self.directory / f"{batch_id}_output.jsonl"
+        error_path = self.directory / f"{batch_id}_error.jsonl"
+        status = BatchStatus(batch_id=batch_id, status="completed")
+
+        with Path(path).open(encoding="utf-8") as requests, output_path.open("w", encoding="utf-8") as output, \
+                error_path.open("w", encoding="utf-8") as errors:
+            for line in requests:
+                request = json.loads(line)
+                status.total += 1
+                try:
+                    body = self.respond(request["body"])
+                    result = {"status_code": 200, "body": body}
+                    target = output
+                    status.completed += 1
+                except Exception as e:
+                    result = {"status_code": 500, "body": {"error": {"message": str(e)}}}
+                    target = errors
+                    status.failed += 1
+                target.write(json.dumps({
+                    "id": f"batch_req_{uuid.uuid4().hex}",
+                    "custom_id": request["custom_id"],
+                    "response": result,
+                    "error": None,
+                }) + "\n")
+
+        status.output_file_id = str(output_path) if status.completed else None
+        status.error_file_id = str(error_path) if status.failed else None
+        self.batches[batch_id] = status
+        return batch_id
+
+    async def retrieve(self, batch_id: str) -> BatchStatus:
+        return self.batches[batch_id]
+
+    async def read_file(self, file_id: str) -> str:
+        return Path(file_id).read_text(encoding="utf-8")
+
+
+async def wait_for_batch(
+    client: BatchClient, batch_id: str, poll_interval_seconds: float
+) -> BatchStatus:
+    """Poll a batch until it reaches a final state.
+
+    Args:
+        client: Client the batch was submitted with
+        batch_id: Batch to wait for
+        poll_interval_seconds: Seconds between polls
+
+    Returns:
+        Final batch status
+    """
+    while True:
+        status = await client.retrieve(batch_id)
+        if status.finished:
+            logger.info(
+                f"Batch {batch_id} {status.status}: {status.completed} completed, {status.failed} failed"
+            )
+            return status
+        logger.debug(
+            f"[DEBUG] Batch {batch_id} {status.status} ({status.completed + status.failed}/{status.total})"
+        )
+        await asyncio.sleep(poll_interval_seconds)
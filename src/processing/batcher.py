@@ -2,30 +2,163 @@
 
 import asyncio
 import logging
-from typing import List, Optional, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
 
-from llm_distiller.database.models import InvalidResponse, Question, Response
+from sqlalchemy import Table, insert
+
+from llm_distiller.database.models import InvalidResponse, Response
 
 from .models import QuestionTask, WorkerResult
 
 logger = logging.getLogger(__name__)
 
 
+def _insert_ignoring_duplicates(session, table: Table):
+    """Build an INSERT that skips rows violating ``uq_question_provider``.
+
+    Args:
+        session: Session whose bind determines the SQL dialect
+        table: Table to insert into
+
+    Returns:
+        Insert statement for use with executemany parameters
+    """
+    dialect = session.get_bind().dialect.name
+    conflict_columns = ["question_id", "provider_name"]
+
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        return sqlite_insert(table).on_conflict_do_nothing(index_elements=conflict_columns)
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+
+        return postgresql_insert(table).on_conflict_do_nothing(index_elements=conflict_columns)
+    if dialect in ("mysql", "mariadb"):
+        return insert(table).prefix_with("IGNORE")
+    return insert(table)
+
+
+def _write_valid_responses(session, batch: List[Tuple[QuestionTask, WorkerResult]]) -> None:
+    """Bulk insert valid responses in a single executemany statement.
+
+    A response for a question/provider pair that is already stored is skipped
+    instead of failing the whole batch.
+    """
+    rows = [
+        {
+            "question_id": task.question_id,
+            "provider_name": result.provider_name,
+            "model_name": result.model_name,
+            "response_text": result.response_text,
+            "thinking": result.thinking or None,
+            "tokens_used": result.tokens_used,
+            "processing_time_ms": result.processing_time_ms,
+        }
+        for task, result in batch
+    ]
+    session.execute(_insert_ignoring_duplicates(session, Response.__table__), rows)
+
+
+def _write_invalid_responses(session, batch: List[Tuple[QuestionTask, WorkerResult]]) -> None:
+    """Bulk insert invalid responses in a single executemany statement."""
+    rows = [
+        {
+            "question_id": task.question_id,
+            "provider_name": result.provider_name,
+            "model_name": result.model_name,
+            "response_text": result.response_text or "",
+            "thinking": result.thinking or None,
+            "error_message": result.error_message or "Unknown error",
+            "error_type": result.error_type or "unknown",
+            "tokens_used": result.tokens_used,
+            "processing_time_ms": result.processing_time_ms,
+        }
+        for task, result in batch
+    ]
+    session.execute(insert(InvalidResponse.__table__), rows)
+
+
+def _write_responses(
+    session,
+    valid: List[Tuple[QuestionTask, WorkerResult]],
+    invalid: List[Tuple[QuestionTask, WorkerResult]],
+) -> None:
+    """Write valid and invalid responses in one transaction."""
+    if valid:
+        _write_valid_responses(session, valid)
+    if invalid:
+        _write_invalid_responses(session, invalid)
+
+
+def _response_size(result: WorkerResult) -> int:
+    """Approximate stored size of a result in bytes."""
+    size = len(result.response_text or "")
+    if result.thinking:
+        size += len(result.thinking)
+    return size
+
+
 class ResponseBatcher:
-    """Handles batch database operations for responses to improve performance."""
+    """Handles batch database operations for responses to improve performance.
+
+    Pending responses are flushed on whichever comes first: ``batch_size``
+    rows, ``max_bytes`` of response text, or the oldest response reaching
+    ``flush_interval_ms``. Flushed batches are handed to a single writer
+    through a bounded queue, so database I/O never runs on the event loop or
+    under the batcher lock; producers only wait when the writer falls
+    ``max_pending_batches`` behind. The writer always commits through the
+    sync engine on its own thread, also when an async driver is available,
+    so no batch bypasses it. After each commit the batch size is
+    adapted towards ``target_commit_ms`` within ``[min_batch_size,
+    max_batch_size]``.
+    """
     
-    def __init__(self, db_manager, batch_size: int = 100):
+    def __init__(
+        self,
+        db_manager,
+        batch_size: int = 100,
+        max_pending_batches: int = 4,
+        max_bytes: int = 4 * 1024 * 1024,
+        flush_interval_ms: int = 2000,
+        min_batch_size: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+        target_commit_ms: int = 250,
+    ):
         """Initialize response batcher.
         
         Args:
             db_manager: Database manager instance
-            batch_size: Number of responses to batch before writing to database
+            batch_size: Initial number of responses to batch before writing to database
+            max_pending_batches: Batches that may wait for the writer before producers block
+            max_bytes: Pending response text size that triggers a flush
+            flush_interval_ms: Maximum age of a pending response before it is flushed
+            min_batch_size: Lower bound for the adaptive batch size (default: batch_size)
+            max_batch_size: Upper bound for the adaptive batch size (default: batch_size)
+            target_commit_ms: Commit latency the adaptive batch size aims for
         """
         self.db_manager = db_manager
         self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval_ms / 1000
+        self.min_batch_size = min(min_batch_size or batch_size, batch_size)
+        self.max_batch_size = max(max_batch_size or batch_size, batch_size)
+        self.target_commit_ms = target_commit_ms
         self.pending_valid_responses: List[Tuple[QuestionTask, WorkerResult]] = []
         self.pending_invalid_responses: List[Tuple[QuestionTask, WorkerResult]] = []
+        self.failed_batches = 0
+        self.last_commit_ms: Optional[float] = None
+        self._pending_bytes = 0
+        self._oldest_pending: Optional[float] = None
         self._lock = asyncio.Lock()
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._flusher_task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._write_error: Optional[Exception] = None
     
     async def add_valid_response(self, task: QuestionTask, result: WorkerResult) -> None:
         """Add a valid response to the batch.
@@ -36,9 +169,10 @@ class ResponseBatcher:
         """
         async with self._lock:
             self.pending_valid_responses.append((task, result))
-            
-            if len(self.pending_valid_responses) >= self.batch_size:
-                await self._flush_valid_responses()
+            flush_due = self._track_pending(result)
+        
+        if flush_due:
+            await self._flush_pending()
     
     async def add_invalid_response(self, task: QuestionTask, result: WorkerResult) -> None:
         """Add an invalid response to the batch.
@@ -49,65 +183,134 @@ class ResponseBatcher:
         """
         async with self._lock:
             self.pending_invalid_responses.append((task, result))
-            
-            if len(self.pending_invalid_responses) >= self.batch_size:
-                await self._flush_invalid_responses()
+            flush_due = self._track_pending(result)
+        
+        if flush_due:
+            await self._flush_pending()
     
     async def flush_all(self) -> None:
-        """Flush all pending responses to database."""
+        """Flush all pending responses to database and wait for the writer.
+        
+        Raises:
+            Exception: The first write error since the previous flush, if any
+        """
+        await self._flush_pending()
+        
+        if self._write_queue is not None:
+            await self._write_queue.join()
+        
+        if self._write_error is not None:
+            error, self._write_error = self._write_error, None
+            raise error
+    
+    async def close(self) -> None:
+        """Flush all pending responses and stop the flusher and writer."""
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            await asyncio.gather(self._flusher_task, return_exceptions=True)
+            self._flusher_task = None
+        
+        try:
+            await self.flush_all()
+        finally:
+            if self._writer_task is not None:
+                self._writer_task.cancel()
+                await asyncio.gather(self._writer_task, return_exceptions=True)
+                self._writer_task = None
+                self._write_queue = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+    
+    def _track_pending(self, result: WorkerResult) -> bool:
+        """Account for a newly added response; call with the lock held.
+        
+        Returns:
+            True if a row or size threshold has been reached
+        """
+        if self._oldest_pending is None:
+            self._oldest_pending = time.monotonic()
+        if self._flusher_task is None:
+            self._flusher_task = asyncio.create_task(self._flusher_loop())
+        
+        self._pending_bytes += _response_size(result)
+        pending_rows = len(self.pending_valid_responses) + len(self.pending_invalid_responses)
+        return pending_rows >= self.batch_size or self._pending_bytes >= self.max_bytes
+    
+    async def _flush_pending(self) -> None:
+        """Hand all pending responses to the writer as one batch."""
         async with self._lock:
-            if self.pending_valid_responses:
-                await self._flush_valid_responses()
-            if self.pending_invalid_responses:
-                await self._flush_invalid_responses()
+            valid = self.pending_valid_responses
+            invalid = self.pending_invalid_responses
+            self.pending_valid_responses = []
+            self.pending_invalid_responses = []
+            self._pending_bytes = 0
+            self._oldest_pending = None
+        
+        if valid or invalid:
+            await self._submit(_write_responses, valid, invalid, rows=len(valid) + len(invalid))
     
-    async def _flush_valid_responses(self) -> None:
-        """Flush valid responses to database in a single transaction."""
-        if not self.pending_valid_responses:
-            return
+    async def _flusher_loop(self) -> None:
+        """Flush pending responses once the oldest reaches the flush interval."""
+        while True:
+            oldest = self._oldest_pending
+            delay = self.flush_interval
+            if oldest is not None:
+                delay = max(0.0, oldest + self.flush_interval - time.monotonic())
+            await asyncio.sleep(delay)
+            
+            oldest = self._oldest_pending
+            if oldest is not None and time.monotonic() - oldest >= self.flush_interval:
+                logger.debug("Flushing responses that reached the flush interval")
+                await self._flush_pending()
+    
+    async def _submit(self, write: Callable, *args, rows: int) -> None:
+        """Queue a write for the writer, waiting only if the queue is full."""
+        if self._writer_task is None:
+            self._write_queue = asyncio.Queue(maxsize=self.max_pending_batches)
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-writer")
+            self._writer_task = asyncio.create_task(self._writer_loop())
         
-        logger.debug(f"Flushing {len(self.pending_valid_responses)} valid responses to database")
-        
-        async with self.db_manager.async_session_scope() as session:
-            for task, result in self.pending_valid_responses:
-                response = Response(
-                    question_id=task.question_id,
-                    provider_name=result.provider_name,
-                    model_name=result.model_name,
-                    response_text=result.response_text,
-                    thinking=result.thinking or None,
-                    tokens_used=result.tokens_used,
-                    processing_time_ms=result.processing_time_ms,
-                )
-                session.add(response)
-        
-        logger.debug(f"Successfully flushed {len(self.pending_valid_responses)} valid responses")
-        self.pending_valid_responses.clear()
+        await self._write_queue.put((write, args, rows))
     
-    async def _flush_invalid_responses(self) -> None:
-        """Flush invalid responses to database in a single transaction."""
-        if not self.pending_invalid_responses:
+    async def _writer_loop(self) -> None:
+        """Write queued batches one at a time, each in a single transaction."""
+        while True:
+            write, args, rows = await self._write_queue.get()
+            try:
+                logger.debug(f"Writing batch of {rows} responses to database")
+                start = time.perf_counter()
+                await self.db_manager.run_in_thread(write, *args, executor=self._executor)
+                self._adapt_batch_size((time.perf_counter() - start) * 1000, rows)
+                logger.debug(f"Successfully wrote batch of {rows} responses")
+            except Exception as e:
+                logger.error(f"[ERROR] Failed to write batch of {rows} responses: {e}")
+                self.failed_batches += 1
+                if self._write_error is None:
+                    self._write_error = e
+            finally:
+                self._write_queue.task_done()
+    
+    def _adapt_batch_size(self, commit_ms: float, rows: int) -> None:
+        """Grow the batch size while commits are fast, shrink it when they are slow.
+        
+        Args:
+            commit_ms: Measured commit latency in milliseconds
+            rows: Number of rows in the committed batch
+        """
+        self.last_commit_ms = commit_ms
+        
+        if commit_ms > self.target_commit_ms:
+            new_size = max(self.min_batch_size, self.batch_size // 2)
+        elif commit_ms < self.target_commit_ms / 2 and rows >= self.batch_size:
+            # Only a full batch says anything about how large batches perform
+            new_size = min(self.max_batch_size, self.batch_size * 2)
+        else:
             return
         
-        logger.debug(f"Flushing {len(self.pending_invalid_responses)} invalid responses to database")
-        
-        async with self.db_manager.async_session_scope() as session:
-            for task, result in self.pending_invalid_responses:
-                invalid_response = InvalidResponse(
-                    question_id=task.question_id,
-                    provider_name=result.provider_name,
-                    model_name=result.model_name,
-                    response_text=result.response_text or "",
-                    thinking=result.thinking or None,
-                    error_message=result.error_message or "Unknown error",
-                    error_type=result.error_type or "unknown",
-                    tokens_used=result.tokens_used,
-                    processing_time_ms=result.processing_time_ms,
-                )
-                session.add(invalid_response)
-        
-        logger.debug(f"Successfully flushed {len(self.pending_invalid_responses)} invalid responses")
-        self.pending_invalid_responses.clear()
+        if new_size != self.batch_size:
+            logger.debug(f"Adapting batch size {self.batch_size} -> {new_size} (commit took {commit_ms:.0f}ms)")
+            self.batch_size = new_size
     
     def get_stats(self) -> dict:
         """Get current batch statistics.
@@ -119,5 +322,9 @@ class ResponseBatcher:
             "pending_valid": len(self.pending_valid_responses),
             "pending_invalid": len(self.pending_invalid_responses),
             "batch_size": self.batch_size,
-            "total_pending": len(self.pending_valid_responses) + len(self.pending_invalid_responses)
-        }
\ No newline at end of file
+            "total_pending": len(self.pending_valid_responses) + len(self.pending_invalid_responses),
+            "pending_bytes": self._pending_bytes,
+            "queued_batches": self._write_queue.qsize() if self._write_queue else 0,
+            "failed_batches": self.failed_batches,
+            "last_commit_ms": self.last_commit_ms,
+        }
@@ -0,0 +1,208 @@
+"""Persistent, content-addressed cache of provider responses."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from llm_distiller.config import GenerationConfig
+from llm_distiller.llm.base import Messages, ParsedResponse
+
+logger = logging.getLogger(__name__)
+
+# Eviction frees space down to this fraction of the size limit, so it runs in bursts
+EVICTION_TARGET = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT,
+    content TEXT NOT NULL,
+    thinking TEXT,
+    tokens_used INTEGER,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def cache_key(
+    model: str,
+    messages: Messages,
+    generation_config: GenerationConfig,
+    answer_schema: Optional[str] = None,
+) -> str:
+    """Hash identifying a request.
+
+    Args:
+        model: Model the request is sent to
+        messages: Chat messages of the request
+        generation_config: Generation parameters
+        answer_schema: JSON schema the answer must match (sent as ``response_format``)
+
+    Returns:
+        Hex digest that is equal for identical requests
+    """
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "generation": generation_config.model_dump(),
+            "answer_schema": answer_schema,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with a TTL and size-based LRU eviction.
+
+    Calls are synchronous and thread-safe; async code runs them in a worker
+    thread so disk I/O does not block the event loop.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None, max_bytes: Optional[int] = None):
+        """Open or create the cache file.
+
+        Args:
+            path: SQLite file holding the cache
+            ttl_seconds: Age after which entries expire (None = never)
+            max_bytes: Stored response text above which the least recently used entries are evicted (None = unbounded)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._entries, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+    def get(self, key: str) -> Optional[ParsedResponse]:
+        """Look up a cached response.
+
+        Args:
+            key: Request hash from ``cache_key``
+
+        Returns:
+            Cached response, or None on a miss or an expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT model, content, thinking, tokens_used, size, created_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            model, content, thinking, tokens_used, size, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._entries -= 1
+                self._bytes -= size
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return ParsedResponse(
+            content=content,
+            tokens_used=tokens_used,
+            model=model,
+            thinking=thinking,
+            metadata={"cached_response": True},
+        )
+
+    def put(self, key: str, response: ParsedResponse) -> None:
+        """Store a response, evicting old entries if the cache is too large.
+
+        Args:
+            key: Request hash from ``cache_key``
+            response: Response to store
+        """
+        size = len(response.content.encode("utf-8")) + len((response.thinking or "").encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, content, thinking, tokens_used, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.model, response.content, response.thinking, response.tokens_used, size, now, now),
+            )
+            if previous:
+                self._bytes -= previous[0]
+            else:
+                self._entries += 1
+            self._bytes += size
+            if self.max_bytes is not None and self._bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * EVICTION_TARGET))
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """Remove a cached response, e.g. one that turned out to be invalid.
+
+        Args:
+            key: Request hash from ``cache_key``
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+            self._entries -= 1
+            self._bytes -= row[0]
+
+    def _evict(self, target_bytes: int) -> None:
+        """Delete least recently used entries until the cache holds at most ``target_bytes``."""
+        evicted = []
+        cursor = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+        for key, size in cursor:
+            if self._bytes <= target_bytes:
+                break
+            evicted.append((key,))
+            self._bytes -= size
+        cursor.close()
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self._entries -= len(evicted)
+        self.evictions += len(evicted)
+        logger.debug(f"[DEBUG] Evicted {len(evicted)} cached responses")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._entries,
+            "size_bytes": self._bytes,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        """Close the cache file."""
+        with self._lock:
+            self._conn.close()
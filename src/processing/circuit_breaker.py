@@ -0,0 +1,151 @@
+"""Per-provider circuit breaker."""
+
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Optional, Union
+
+
+class BreakerState(Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops sending requests to a provider that keeps failing or stalling.
+
+    The breaker watches the outcome of the last ``window_size`` calls; a call
+    is bad if it failed or took longer than ``slow_call_ms``. Once at least
+    ``min_calls`` outcomes are known and the bad fraction reaches
+    ``failure_rate_threshold`` the breaker opens and rejects requests for
+    ``open_seconds``. After that a single probe request is let through
+    (half-open): its success closes the breaker, its failure opens it again.
+
+    Each state change starts a new generation. ``allow_request`` hands out the
+    current generation as a ticket, and outcomes carrying a ticket from an
+    earlier generation are ignored, so a slow call admitted before the breaker
+    opened can never be mistaken for the probe.
+    """
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        slow_call_ms: Optional[float] = None,
+        open_seconds: float = 30.0,
+    ):
+        """Initialize a closed breaker.
+
+        Args:
+            failure_rate_threshold: Fraction of bad calls that opens the breaker
+            window_size: Number of recent calls considered
+            min_calls: Calls needed in the window before the breaker may open
+            slow_call_ms: Calls slower than this count as bad (None = latency ignored)
+            open_seconds: Time to reject requests before probing again
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.slow_call_ms = slow_call_ms
+        self.open_seconds = open_seconds
+        self.state = BreakerState.CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)  # True = bad call
+        self._probe_in_flight = False
+        self._generation = 1
+
+    @property
+    def failure_rate(self) -> float:
+        """Fraction of bad calls in the current window."""
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def retry_after(self, now: Optional[float] = None) -> float:
+        """Seconds until an open breaker lets a probe through."""
+        if self.state != BreakerState.OPEN:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.opened_at + self.open_seconds - now)
+
+    def is_open(self, now: Optional[float] = None) -> bool:
+        """Whether requests are rejected outright, without claiming the probe slot."""
+        now = time.monotonic() if now is None else now
+        return self.state == BreakerState.OPEN and now - self.opened_at < self.open_seconds
+
+    def allow_request(self, now: Optional[float] = None) -> Optional[int]:
+        """Check whether a request may be sent, claiming the probe slot if half-open.
+
+        Every allowed request must be followed by ``record`` or ``release``
+        with the ticket returned here.
+
+        Returns:
+            Ticket for the admitted request (always truthy), or None if rejected
+        """
+        now = time.monotonic() if now is None else now
+        if self.state == BreakerState.OPEN:
+            if now - self.opened_at < self.open_seconds:
+                return None
+            self.state = BreakerState.HALF_OPEN
+            self._generation += 1
+        if self.state == BreakerState.HALF_OPEN:
+            if self._probe_in_flight:
+                return None
+            self._probe_in_flight = True
+        return self._generation
+
+    def record(
+        self, success: bool, latency_ms: float, now: Optional[float] = None, ticket: Optional[int] = None
+    ) -> None:
+        """Record the outcome of an allowed request.
+
+        Args:
+            success: Whether the request succeeded
+            latency_ms: How long the request took
+            now: Current monotonic time (defaults to now)
+            ticket: Ticket returned by ``allow_request``; required for the half-open probe
+        """
+        if ticket != self._generation and (ticket is not None or self.state != BreakerState.CLOSED):
+            # Admitted before the last state change, so it is neither the probe nor current
+            return
+        bad = not success or (self.slow_call_ms is not None and latency_ms > self.slow_call_ms)
+        if self.state == BreakerState.HALF_OPEN:
+            self._probe_in_flight = False
+            if bad:
+                self._open(now)
+            else:
+                self.state = BreakerState.CLOSED
+                self._generation += 1
+                self._outcomes.clear()
+        elif self.state == BreakerState.CLOSED:
+            self._outcomes.append(bad)
+            if len(self._outcomes) >= self.min_calls and self.failure_rate >= self.failure_rate_threshold:
+                self._open(now)
+
+    def release(self, ticket: Optional[int] = None) -> None:
+        """Give back an allowed request whose outcome says nothing about health.
+
+        Releasing a ticket whose outcome was already recorded does nothing.
+        """
+        if self.state == BreakerState.HALF_OPEN and ticket == self._generation:
+            self._probe_in_flight = False
+
+    def _open(self, now: Optional[float]) -> None:
+        self.state = BreakerState.OPEN
+        self._generation += 1
+        self.opened_at = time.monotonic() if now is None else now
+        self.times_opened += 1
+        self._outcomes.clear()
+
+    def get_stats(self) -> Dict[str, Union[str, float, int]]:
+        """Get breaker state and recent failure rate."""
+        return {
+            "state": self.state.value,
+            "failure_rate": self.failure_rate,
+            "window_calls": len(self._outcomes),
+            "times_opened": self.times_opened,
+            "retry_after_seconds": self.retry_after(),
+        }
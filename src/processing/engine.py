@@ -4,12 +4,24 @@ import asyncio
 import logging
 import traceback
 from datetime import datetime
-from typing import List, Optional
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import exists, select
 
 from llm_distiller.config import Settings
+from llm_distiller.llm.base import build_messages
 from llm_distiller.database.manager import DatabaseManager
-from llm_distiller.database.models import Question
+from llm_distiller.database.models import Question, Response
 
+from .batch import (
+    BatchClient,
+    BatchFileWriter,
+    OpenAIBatchClient,
+    PendingBatches,
+    parse_batch_result,
+    wait_for_batch,
+)
 from .batcher import ResponseBatcher
 from .manager import LLMProviderManager
 from .models import (
@@ -20,10 +32,23 @@ from .models import (
     WorkerResult,
 )
 from .queue import QuestionQueue
+from .retry import RetryScheduler
 from .worker import QuestionWorker
 
 logger = logging.getLogger(__name__)
 
+QUESTION_COLUMNS = (
+    Question.id,
+    Question.json_id,
+    Question.category,
+    Question.question_text,
+    Question.golden_answer,
+    Question.answer_schema,
+    Question.system_prompt,
+    Question.created_at,
+    Question.updated_at,
+)
+
 
 class ProcessingEngine:
     """Main processing engine that orchestrates question processing."""
@@ -37,13 +62,27 @@ class ProcessingEngine:
         """
         self.db_manager = db_manager
         self.settings = settings
-        self.queue = QuestionQueue()
+        self.queue = QuestionQueue(
+            maxsize=settings.processing.queue_max_size,
+            evict_finished=True,
+        )
         self.provider_manager = LLMProviderManager(settings)
+        self.retry_scheduler = RetryScheduler(
+            self.queue,
+            base_delay=settings.processing.retry_base_delay_seconds,
+            max_delay=settings.processing.retry_max_delay_seconds,
+        )
         
         # Initialize response batcher for performance
+        processing = settings.processing
         self.response_batcher = ResponseBatcher(
             db_manager=db_manager,
-            batch_size=100  # Configurable batch size
+            batch_size=processing.flush_batch_size,
+            max_bytes=processing.flush_max_bytes,
+            flush_interval_ms=processing.flush_interval_ms,
+            min_batch_size=processing.flush_min_batch_size,
+            max_batch_size=processing.flush_max_batch_size,
+            target_commit_ms=processing.flush_target_commit_ms,
         )
         
         self.worker = QuestionWorker(
@@ -81,11 +120,11 @@ class ProcessingEngine:
         )
         
         try:
-            # Load questions from database
-            questions = await self._load_questions(category, limit)
-            result.stats.total_questions = len(questions)
-            
-            if not questions:
+            # Stream questions from the database; only the first page is awaited
+            pages = self._iter_question_pages(category, limit)
+            try:
+                first_page = await pages.__anext__()
+            except StopAsyncIteration:
                 result.add_warning("No questions found to process")
                 return result
             
@@ -99,41 +138,40 @@ class ProcessingEngine:
                 else:
                     logger.warning("No providers configured")
             
-            # Create tasks and add to queue
-            tasks = []
-            for q in questions:
-                # Use question-specific system prompt or default
-                system_prompt = q['system_prompt'] or default_system_prompt
-                
-                task = QuestionTask(
-                    question_id=q['id'],
-                    category=q['category'],
-                    question_text=q['question_text'],
-                    golden_answer=q['golden_answer'],
-                    answer_schema=q['answer_schema'],
-                    system_prompt=system_prompt,
-                    provider_name=provider,
-                    failover_strategy=failover_strategy,
-                    max_retries=self.settings.processing.max_retries
-                )
-                tasks.append(task)
+            def make_tasks(questions: List[dict]) -> List[QuestionTask]:
+                return self._make_tasks(questions, provider, default_system_prompt, failover_strategy)
+            
+            async def feed_queue() -> None:
+                result.stats.total_questions += len(first_page)
+                await self.queue.add_tasks(make_tasks(first_page))
+                async for page in pages:
+                    result.stats.total_questions += len(page)
+                    await self.queue.add_tasks(make_tasks(page))
             
-            await self.queue.add_tasks(tasks)
             result.stats.start_time = datetime.utcnow()
+            loader = asyncio.create_task(feed_queue())
             
-            # Start processing
+            # Start processing while the remaining pages are loaded
             try:
-                await self._run_processing(result)
+                await self._run_processing(result, loader)
             except Exception as e:
                 result.add_error(f"Processing loop failed: {str(e)}")
+            finally:
+                if not loader.done():
+                    loader.cancel()
+                await asyncio.gather(loader, return_exceptions=True)
+                await pages.aclose()
+            
+            if not loader.cancelled() and loader.exception():
+                result.add_error(f"Loading questions failed: {loader.exception()}")
             
             result.stats.end_time = datetime.utcnow()
             result.stats.processing_time_seconds = (
                 result.stats.end_time - result.stats.start_time
             ).total_seconds()
             
-            # Flush any remaining batched responses
-            await self.response_batcher.flush_all()
+            # Flush any remaining batched responses and stop the writer
+            await self.response_batcher.close()
             
             # Final statistics
             await self._update_final_stats(result)
@@ -143,82 +181,272 @@ class ProcessingEngine:
         
         return result
     
-    async def _load_questions(
+    def _make_tasks(
+        self,
+        questions: List[dict],
+        provider: Optional[str],
+        default_system_prompt: Optional[str],
+        failover_strategy: Optional[str]
+    ) -> List[QuestionTask]:
+        """Create processing tasks for loaded questions.
+        
+        With prefix affinity enabled, tasks sharing a system prompt are
+        grouped so they run back-to-back while the provider's prefix cache is
+        warm. Groups keep the order of their first question, and questions
+        keep id order within a group.
+        """
+        tasks = [
+            QuestionTask(
+                question_id=q['id'],
+                category=q['category'],
+                question_text=q['question_text'],
+                golden_answer=q['golden_answer'],
+                answer_schema=q['answer_schema'],
+                # Use question-specific system prompt or default
+                system_prompt=q['system_prompt'] or default_system_prompt,
+                provider_name=provider,
+                failover_strategy=failover_strategy,
+                max_retries=self.settings.processing.max_retries
+            )
+            for q in questions
+        ]
+        if not self.settings.processing.prefix_affinity:
+            return tasks
+        
+        groups: Dict[Optional[str], List[QuestionTask]] = {}
+        for task in tasks:
+            groups.setdefault(task.system_prompt, []).append(task)
+        return [task for group in groups.values() for task in group]
+    
+    async def process_questions_batch(
+        self,
+        category: Optional[str] = None,
+        limit: Optional[int] = None,
+        provider: Optional[str] = None,
+        default_system_prompt: Optional[str] = None,
+        client: Optional[BatchClient] = None
+    ) -> ProcessingResult:
+        """Process questions through the provider's batch API.
+        
+        All selected questions are written to batch input files and submitted
+        at once. Each batch is polled until it finishes, after which its
+        results are validated and stored like interactive responses. Questions
+        without a result (e.g. an expired batch) stay unanswered and are picked
+        up by the next run.
+        
+        Submitted batches are recorded in the batch directory until their
+        results are stored. Batches left over from an interrupted run are
+        polled and ingested again, and their questions are not submitted a
+        second time.
+        
+        Args:
+            category: Filter by category
+            limit: Maximum number of questions to process
+            provider: LLM provider to submit to (None = first configured provider)
+            default_system_prompt: System prompt for questions without one
+            client: Batch client (None = the provider's OpenAI batch endpoints)
+            
+        Returns:
+            ProcessingResult with statistics and any errors
+        """
+        result = ProcessingResult(
+            success=True,
+            stats=ProcessingStats(),
+            errors=[],
+            warnings=[]
+        )
+        processing = self.settings.processing
+        
+        provider_name = provider or next(iter(self.provider_manager.providers), None)
+        llm_provider = self.provider_manager.providers.get(provider_name) if provider_name else None
+        if llm_provider is None:
+            result.add_error(f"Provider not available for batch processing: {provider_name}")
+            return result
+        if client is None:
+            client = OpenAIBatchClient(llm_provider.client)
+        
+        try:
+            pending = PendingBatches(Path(processing.batch_directory))
+            in_pending_batch = pending.question_ids()
+            resumed = pending.for_provider(provider_name)
+            for batch in resumed.values():
+                result.stats.total_questions += len(batch["question_ids"])
+            
+            writer = BatchFileWriter(
+                Path(processing.batch_directory),
+                model=llm_provider.model_name,
+                generation_config=processing.generation_params,
+                max_requests=processing.batch_max_requests_per_file,
+                structured_output=llm_provider.config.structured_output,
+            )
+            try:
+                async for page in self._iter_question_pages(category, limit):
+                    for task in self._make_tasks(page, provider_name, default_system_prompt, None):
+                        if task.question_id in in_pending_batch:
+                            # Already paid for in a batch that has not been ingested yet
+                            continue
+                        writer.add(task, build_messages(task.question_text, task.system_prompt))
+                        result.stats.total_questions += 1
+            finally:
+                paths = writer.close()
+            
+            if not paths and not resumed:
+                result.add_warning("No questions found to process")
+                return result
+            
+            result.stats.start_time = datetime.utcnow()
+            for batch_id in resumed:
+                logger.info(f"Resuming batch {batch_id} submitted by an earlier run")
+            for path in paths:
+                batch_id = await client.submit(path, processing.batch_completion_window)
+                pending.add(batch_id, provider_name, writer.question_ids[path], default_system_prompt)
+                logger.info(f"Submitted batch {batch_id} from {path}")
+            
+            for batch_id, batch in pending.for_provider(provider_name).items():
+                status = await wait_for_batch(client, batch_id, processing.batch_poll_interval_seconds)
+                if status.status != "completed":
+                    result.add_warning(f"Batch {batch_id} ended with status '{status.status}'")
+                for file_id in (status.output_file_id, status.error_file_id):
+                    if file_id:
+                        await self._ingest_batch_results(
+                            result, provider_name, batch["system_prompt"], await client.read_file(file_id)
+                        )
+                pending.remove(batch_id)
+            
+            result.stats.end_time = datetime.utcnow()
+            result.stats.processing_time_seconds = (
+                result.stats.end_time - result.stats.start_time
+            ).total_seconds()
+            
+            await self.response_batcher.close()
+            
+            missing = result.stats.total_questions - result.stats.processed_questions
+            if missing > 0:
+                result.add_warning(f"{missing} questions received no batch result and remain unanswered")
+            
+        except Exception as e:
+            logger.error(f"[ERROR] Batch processing failed: {e}")
+            logger.error(f"[ERROR] Traceback: {traceback.format_exc()}")
+            result.add_error(f"Batch processing failed: {str(e)}")
+        
+        return result
+    
+    async def _ingest_batch_results(
+        self,
+        result: ProcessingResult,
+        provider_name: str,
+        default_system_prompt: Optional[str],
+        content: str,
+        chunk_size: int = 1000
+    ) -> None:
+        """Validate and store the results in a batch output or error file.
+        
+        Args:
+            result: Processing result to update
+            provider_name: Provider the batch was submitted to
+            default_system_prompt: System prompt used for questions without one
+            content: Contents of the result file
+            chunk_size: Results whose questions are loaded per query
+        """
+        lines = [line for line in content.splitlines() if line.strip()]
+        for start in range(0, len(lines), chunk_size):
+            parsed = []
+            for line in lines[start:start + chunk_size]:
+                try:
+                    parsed.append(parse_batch_result(line, provider_name))
+                except (ValueError, KeyError, IndexError, TypeError) as e:
+                    result.add_error(f"Unreadable batch result: {e}")
+            
+            question_ids = [question_id for question_id, _ in parsed if question_id is not None]
+            tasks = {
+                task.question_id: task
+                for task in self._make_tasks(
+                    await self._load_questions(question_ids), provider_name, default_system_prompt, None
+                )
+            }
+            for question_id, worker_result in parsed:
+                task = tasks.get(question_id)
+                if task is None:
+                    result.add_warning(f"Batch result for unknown question: {question_id}")
+                    continue
+                worker_result = await self.worker.handle_result(task, worker_result)
+                await self._update_stats(result, worker_result)
+    
+    async def _load_questions(self, question_ids: List[int]) -> List[dict]:
+        """Load questions by id.
+        
+        Args:
+            question_ids: Ids of the questions to load
+            
+        Returns:
+            List of question dictionaries
+        """
+        if not question_ids:
+            return []
+        
+        def load(session) -> List[dict]:
+            query = select(*QUESTION_COLUMNS).where(Question.id.in_(question_ids))
+            return [dict(row._mapping) for row in session.execute(query)]
+        
+        return await self.db_manager.run_sync(load)
+    
+    async def _iter_question_pages(
         self, 
         category: Optional[str], 
-        limit: Optional[int]
-    ) -> List[dict]:
-        """Load questions from database with pagination to prevent memory spikes.
+        limit: Optional[int],
+        page_size: int = 1000
+    ) -> AsyncIterator[List[dict]]:
+        """Stream unanswered questions from the database in id order.
+        
+        Pages are fetched with keyset pagination (``id > last_id``) and a
+        ``NOT EXISTS`` filter on responses, so each page costs the same
+        regardless of how far into the table it is.
         
         Args:
             category: Filter by category
             limit: Maximum number of questions
+            page_size: Number of questions fetched per query
             
-        Returns:
-            List of question dictionaries to process
+        Yields:
+            Lists of question dictionaries to process
         """
-        all_questions = []
-        batch_size = 1000  # Load questions in batches to prevent memory issues
-        offset = 0
+        has_response = exists().where(Response.question_id == Question.id)
         
-        while True:
-            async with self.db_manager.async_session_scope() as session:
-                query = session.query(Question)
-                
-                # Filter out questions that already have responses
-                from llm_distiller.database.models import Response
-                query = query.outerjoin(Response).filter(Response.id.is_(None))
-                
-                if category:
-                    query = query.filter(Question.category == category)
-                
-                # Apply pagination
-                batch_query = query.offset(offset).limit(batch_size)
-                if limit:
-                    batch_query = batch_query.limit(min(batch_size, limit - len(all_questions)))
-                
-                questions = batch_query.all()
-                
-                if not questions:
-                    break
-                
-                # Convert to dictionaries to avoid session binding issues
-                batch_dicts = [
-                    {
-                        'id': q.id,
-                        'json_id': q.json_id,
-                        'category': q.category,
-                        'question_text': q.question_text,
-                        'golden_answer': q.golden_answer,
-                        'answer_schema': q.answer_schema,
-                        'system_prompt': q.system_prompt,
-                        'created_at': q.created_at,
-                        'updated_at': q.updated_at
-                    }
-                    for q in questions
-                ]
-                
-                all_questions.extend(batch_dicts)
-                
-                # Stop if we've reached the limit
-                if limit and len(all_questions) >= limit:
-                    all_questions = all_questions[:limit]
-                    break
-                
-                # Move to next batch
-                offset += batch_size
-                
-                # If we got fewer questions than batch_size, we're done
-                if len(questions) < batch_size:
-                    break
+        def load_page(session, after_id: int, size: int) -> List[dict]:
+            query = (
+                select(*QUESTION_COLUMNS)
+                .where(Question.id > after_id, ~has_response)
+                .order_by(Question.id)
+                .limit(size)
+            )
+            if category:
+                query = query.where(Question.category == category)
+            return [dict(row._mapping) for row in session.execute(query)]
         
-        return all_questions
+        last_id = 0
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            page = await self.db_manager.run_sync(load_page, last_id, size)
+            if not page:
+                break
+            
+            yield page
+            
+            last_id = page[-1]['id']
+            if remaining is not None:
+                remaining -= len(page)
+            if len(page) < size:
+                break
     
-    async def _run_processing(self, result: ProcessingResult) -> None:
+    async def _run_processing(
+        self, result: ProcessingResult, loader: Optional["asyncio.Task[None]"] = None
+    ) -> None:
         """Run the main processing loop.
         
         Args:
             result: Processing result to update
+            loader: Task still feeding the queue; processing ends only after it finishes
         """
         logger.info(f"[DEBUG] Starting main processing loop")
         self._running = True
@@ -227,6 +455,7 @@ class ProcessingEngine:
         
         # Create worker tasks
         worker_tasks = []
+        finished = False
         for i in range(batch_size):
             # Create a separate worker for each thread with shared batcher
             worker = QuestionWorker(
@@ -242,22 +471,20 @@ class ProcessingEngine:
         try:
             # Wait for all tasks to be processed with timeout
             timeout = 900  # 15 minutes timeout (900 seconds)
-            start_time = asyncio.get_event_loop().time()
-            logger.debug(f"[DEBUG] Processing with {timeout}s timeout (15 minutes), started at {start_time}")
+            logger.debug(f"[DEBUG] Processing with {timeout}s timeout (15 minutes)")
             
-            while not await self.queue.is_empty():
-                await asyncio.sleep(0.1)
-                
-                # Check for timeout
-                elapsed = asyncio.get_event_loop().time() - start_time
-                if elapsed > timeout:
-                    logger.error(f"[ERROR] Processing timeout reached after {elapsed:.2f}s")
-                    result.add_warning("Processing timeout reached")
-                    break
-                
-                # Check for failed tasks that can be retried
-                logger.debug(f"[DEBUG] Checking for failed tasks to retry")
-                await self._retry_failed_tasks()
+            async def all_tasks_finished() -> None:
+                if loader is not None:
+                    # Every task has been added once the loader is done
+                    await asyncio.wait({loader})
+                await self.queue.join()
+            
+            try:
+                await asyncio.wait_for(all_tasks_finished(), timeout=timeout)
+                finished = True
+            except asyncio.TimeoutError:
+                logger.error(f"[ERROR] Processing timeout reached after {timeout}s")
+                result.add_warning("Processing timeout reached")
         
         except Exception as e:
             logger.error(f"[ERROR] Main processing loop failed")
@@ -267,15 +494,19 @@ class ProcessingEngine:
             result.add_error(f"Processing loop failed: {str(e)}")
         
         finally:
-            logger.debug(f"[DEBUG] Cancelling {len(worker_tasks)} worker tasks")
-            # Cancel worker tasks
-            for i, task in enumerate(worker_tasks):
-                logger.debug(f"[DEBUG] Cancelling worker task {i}")
-                task.cancel()
+            if finished:
+                # Idle workers are blocked on the queue; wake them so they exit
+                logger.debug(f"[DEBUG] Stopping {len(worker_tasks)} worker tasks")
+                await self.queue.shutdown(len(worker_tasks))
+            else:
+                logger.debug(f"[DEBUG] Cancelling {len(worker_tasks)} worker tasks")
+                for task in worker_tasks:
+                    task.cancel()
             
             # Wait for tasks to finish
             logger.debug(f"[DEBUG] Waiting for worker tasks to finish")
             await asyncio.gather(*worker_tasks, return_exceptions=True)
+            await self.retry_scheduler.stop()
             self._running = False
             logger.info(f"[DEBUG] Main processing loop completed")
     
@@ -285,17 +516,18 @@ class ProcessingEngine:
         Args:
             result: Processing result to update
         """
-        worker_id = id(self)  # Unique identifier for this worker
+        worker_id = id(worker)  # Unique identifier for this worker
         logger.debug(f"[DEBUG] Starting worker loop for worker {worker_id}")
         
         while self._running:
+            task = None
             try:
                 # Get next task from queue
                 logger.debug(f"[DEBUG] Worker {worker_id} getting next task from queue")
                 task = await self.queue.get_next_task()
                 if not task:
-                    logger.debug(f"[DEBUG] Worker {worker_id} no tasks available, continuing")
-                    continue
+                    logger.debug(f"[DEBUG] Worker {worker_id} queue shut down, stopping")
+                    break
                 
                 logger.debug(f"[DEBUG] Worker {worker_id} got task {task.question_id}")
                 logger.debug(f"[DEBUG] Task details: {task}")
@@ -311,10 +543,8 @@ class ProcessingEngine:
                 
                 # Mark task as completed
                 logger.debug(f"[DEBUG] Worker {worker_id} marking task {task.question_id} as completed (success: {worker_result.success})")
-                await self.queue.mark_completed(
-                    task.question_id, 
-                    worker_result.success
-                )
+                await self._finish_task(task, worker_result)
+                task = None
                 
             except asyncio.CancelledError:
                 logger.debug(f"[DEBUG] Worker {worker_id} cancelled, breaking loop")
@@ -326,21 +556,41 @@ class ProcessingEngine:
                 logger.error(f"[ERROR] Traceback: {traceback.format_exc()}")
                 logger.error(f"[ERROR] Current result stats: {result.stats}")
                 result.add_error(f"Worker error: {str(e)}")
+                if task is not None:
+                    # Never leave the task outstanding, or the run would not finish
+                    await self._finish_task(task, None)
                 await asyncio.sleep(1)  # Prevent tight error loops
     
-    async def _retry_failed_tasks(self) -> None:
-        """Retry failed tasks that have retries available."""
-        logger.debug(f"[DEBUG] Checking for failed tasks to retry")
-        failed_tasks = await self.queue.get_failed_tasks()
-        logger.debug(f"[DEBUG] Found {len(failed_tasks)} failed tasks")
-        
-        for task in failed_tasks:
-            logger.debug(f"[DEBUG] Considering retry for task {task.question_id}, current retry count: {task.retry_count}")
-            if await self.queue.retry_task(task.question_id):
-                logger.info(f"[DEBUG] Retrying question {task.question_id} (attempt {task.retry_count})")
-                logger.debug(f"[DEBUG] Task details for retry: {task}")
-            else:
-                logger.debug(f"[DEBUG] Not retrying task {task.question_id} - max retries reached or other reason")
+    async def _finish_task(self, task: QuestionTask, worker_result: Optional[WorkerResult]) -> None:
+        """Mark a task as finished and schedule a delayed retry if it failed.
+        
+        Args:
+            task: Task that was processed
+            worker_result: Processing outcome, or None if processing raised
+        """
+        if worker_result is not None and worker_result.error_type == "saturated":
+            # Never sent: costs no retry and goes back in line
+            logger.debug(f"[DEBUG] Requeueing task {task.question_id}: providers saturated")
+            await self.queue.requeue(task.question_id)
+            return
+        
+        success = worker_result is not None and worker_result.success
+        await self.queue.mark_completed(task.question_id, success)
+        if success or task.retry_count >= task.max_retries:
+            if not success:
+                logger.debug(f"[DEBUG] Not retrying task {task.question_id} - max retries reached")
+            return
+        
+        error_type = worker_result.error_type if worker_result else "processing_error"
+        retry_after = worker_result.retry_after_seconds if worker_result else None
+        if error_type == "rate_limit" and retry_after is None:
+            provider_config = self.settings.get_provider_config(worker_result.provider_name)
+            if provider_config:
+                retry_after = provider_config.rate_limit.retry_after_seconds
+        
+        delay = self.retry_scheduler.compute_delay(error_type, task.retry_count, retry_after)
+        logger.debug(f"[DEBUG] Scheduling retry of task {task.question_id} ({error_type}) in {delay:.2f}s")
+        self.retry_scheduler.schedule(task.question_id, delay)
     
     async def _update_stats(self, result: ProcessingResult, worker_result: WorkerResult) -> None:
         """Update processing statistics.
@@ -349,6 +599,10 @@ class ProcessingEngine:
             result: Processing result to update
             worker_result: Result from worker processing
         """
+        if worker_result.error_type == "saturated":
+            # Requeued without being sent; counted once it is actually processed
+            return
+        
         result.stats.processed_questions += 1
         
         if worker_result.success:
@@ -360,9 +614,17 @@ class ProcessingEngine:
             if worker_result.error_type == "schema_validation":
                 result.stats.invalid_responses += 1
         
-        if worker_result.tokens_used:
+        if worker_result.from_cache:
+            # Cached and shared responses cost no tokens
+            result.stats.cache_hits += 1
+        elif worker_result.deduplicated:
+            result.stats.deduplicated_responses += 1
+        elif worker_result.tokens_used:
             result.stats.total_tokens_used += worker_result.tokens_used
         
+        if worker_result.cached_tokens:
+            result.stats.total_cached_tokens += worker_result.cached_tokens
+        
         if worker_result.cost_cents:
             result.stats.total_cost_cents += worker_result.cost_cents
     
@@ -390,9 +652,16 @@ class ProcessingEngine:
             "running": self._running,
             "queue": queue_stats,
             "providers": provider_stats,
+            "hedging": self.provider_manager.get_hedge_stats(),
+            "cache": self.provider_manager.get_cache_stats(),
+            "deduplication": self.provider_manager.get_deduplication_stats(),
             "worker": self.worker.get_worker_stats(),
         }
     
+    async def close(self) -> None:
+        """Release provider connections; call once the engine is no longer used."""
+        await self.provider_manager.close()
+    
     async def stop_processing(self) -> None:
         """Stop the current processing operation."""
         self._running = False
\ No newline at end of file
@@ -1,64 +1,189 @@
 """LLM Provider Manager for coordinating multiple LLM providers."""
 
 import asyncio
+import dataclasses
+import functools
+import hashlib
+import json
 import logging
-import random
+import time
 import traceback
-from typing import Dict, List, Optional, Type
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
 
 from llm_distiller.config import ProviderConfig, Settings
-from llm_distiller.llm.base import BaseLLMProvider
-from llm_distiller.llm.openai_provider import OpenAIProvider
-from llm_distiller.utils.rate_limiter import RateLimiter
+from llm_distiller.llm.base import (
+    BaseLLMProvider,
+    Messages,
+    ParsedResponse,
+    ProviderError,
+    build_messages,
+    messages_text,
+)
+from llm_distiller.llm.http_pool import HTTPClientPool
+from llm_distiller.llm.streaming import StreamGuard
+from llm_distiller.llm.registry import ProviderRegistry, provider_registry
+from llm_distiller.utils.rate_limiter import RateLimiter, estimate_tokens, parse_retry_after
 
+from .cache import ResponseCache, cache_key
+from .circuit_breaker import BreakerState, CircuitBreaker
+from .microbatch import PromptBatcher
 from .models import WorkerResult
+from .routing import ProviderRouter, prefix_key
 
 logger = logging.getLogger(__name__)
 
 
+class ProviderSaturatedError(ProviderError):
+    """No concurrency slot on a provider became free in time; the request was never sent."""
+
+
+@dataclasses.dataclass
+class _Flight:
+    """A provider request shared by every caller asking the same thing."""
+    task: "asyncio.Task[WorkerResult]"
+    waiters: int = 0
+
+
+class _LazyProviders(MutableMapping):
+    """Configured providers by name, each instantiated on first access.
+    
+    Names, configurations and model names are known up front; the provider
+    module, its SDK and its client are only loaded when a request actually
+    goes to that provider. A provider that fails to initialize is dropped
+    and looked up as missing.
+    """
+    
+    def __init__(self, factory: Callable[[str, ProviderConfig], BaseLLMProvider]):
+        self._factory = factory
+        self._configs: Dict[str, Optional[ProviderConfig]] = {}
+        self._instances: Dict[str, BaseLLMProvider] = {}
+    
+    def declare(self, name: str, config: ProviderConfig) -> None:
+        """Add a provider that is created when first used."""
+        self._configs[name] = config
+    
+    def config(self, name: str) -> Optional[ProviderConfig]:
+        """Configuration of a provider, without instantiating it."""
+        return self._configs.get(name)
+    
+    def model_name(self, name: str) -> str:
+        """Model name of a provider, without instantiating it."""
+        if name in self._instances:
+            return self._instances[name].model_name
+        config = self._configs.get(name)
+        return config.model if config else "unknown"
+    
+    def is_loaded(self, name: str) -> bool:
+        """Whether a provider has been instantiated."""
+        return name in self._instances
+    
+    def __getitem__(self, name: str) -> BaseLLMProvider:
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._configs:
+            raise KeyError(name)
+        try:
+            provider = self._factory(name, self._configs[name])
+        except Exception as e:
+            config = self._configs.pop(name)
+            logger.error(f"[ERROR] Failed to initialize provider '{name}': {e}")
+            logger.error(f"[ERROR] Exception type: {type(e).__name__}")
+            logger.error(f"[ERROR] Traceback: {traceback.format_exc()}")
+            logger.error(f"[ERROR] Provider config: {config}")
+            raise KeyError(name) from e
+        self._instances[name] = provider
+        return provider
+    
+    def __setitem__(self, name: str, provider: BaseLLMProvider) -> None:
+        self._configs[name] = provider.config
+        self._instances[name] = provider
+    
+    def __delitem__(self, name: str) -> None:
+        del self._configs[name]
+        self._instances.pop(name, None)
+    
+    def __contains__(self, name: object) -> bool:
+        return name in self._configs
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._configs))
+    
+    def __len__(self) -> int:
+        return len(self._configs)
+
+
 class LLMProviderManager:
     """Manages multiple LLM providers with failover and load balancing."""
     
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, registry: Optional[ProviderRegistry] = None):
         """Initialize the provider manager.
         
         Args:
             settings: Application settings containing provider configurations
+            registry: Provider implementations by type (None = the default registry)
         """
         self.settings = settings
-        self.providers: Dict[str, BaseLLMProvider] = {}
+        self.registry = registry or provider_registry
+        self.providers = _LazyProviders(self._create_provider)
         self.rate_limiters: Dict[str, RateLimiter] = {}
-        self.provider_classes: Dict[str, Type[BaseLLMProvider]] = {
-            "openai": OpenAIProvider,
-            # Add other providers as they're implemented
-        }
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.concurrency_limits: Dict[str, asyncio.Semaphore] = {}
+        self.prompt_batchers: Dict[str, PromptBatcher] = {}
+        self.router = ProviderRouter(self._rate_limit_wait)
+        self.http_pool = HTTPClientPool(
+            timeout_seconds=settings.processing.timeout_seconds,
+            connect_timeout_seconds=settings.processing.connect_timeout_seconds,
+        )
+        self._connection_limits: Dict[tuple, int] = {}
+        self.response_cache = self._open_response_cache()
+        self._flights: Dict[str, _Flight] = {}
+        self.deduplicated_requests = 0
+        self.hedge_eligible_requests = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
         
         self._initialize_providers()
     
     def _initialize_providers(self) -> None:
-        """Initialize all configured providers."""
+        """Register all configured providers; each is instantiated on first use."""
         logger.info(f"[DEBUG] Initializing {len(self.settings.llm_providers)} providers")
         
+        # Size each shared connection pool to the concurrency of the providers using it
+        workers = self.settings.processing.batch_size
+        for config in self.settings.llm_providers.values():
+            key = HTTPClientPool.endpoint_key(config.base_url, config.http2)
+            self._connection_limits[key] = self._connection_limits.get(key, 0) + (config.max_concurrency or workers)
+        # Requests in flight never exceed the number of workers
+        self._connection_limits = {key: min(size, workers) for key, size in self._connection_limits.items()}
+        
         for name, config in self.settings.llm_providers.items():
             try:
-                logger.debug(f"[DEBUG] Initializing provider '{name}' of type '{config.type}'")
+                logger.debug(f"[DEBUG] Registering provider '{name}' of type '{config.type}'")
                 logger.debug(f"[DEBUG] Provider config: {config}")
                 
-                provider_class = self.provider_classes.get(config.type)
-                if not provider_class:
+                if config.type not in self.registry:
                     logger.error(f"[ERROR] Unknown provider type '{config.type}' for provider '{name}'")
                     raise ValueError(f"Unknown provider type: {config.type}")
                 
-                # Initialize provider
-                provider = provider_class(config)
-                self.providers[name] = provider
-                logger.info(f"[DEBUG] Successfully initialized provider '{name}' with model '{provider.model_name}'")
+                if config.batching.enabled:
+                    provider_class = self.registry.get(config.type)
+                    if provider_class.generate_batch is BaseLLMProvider.generate_batch:
+                        raise ValueError(f"Provider type '{config.type}' does not support batched completions")
+                
+                self.providers.declare(name, config)
                 
                 # Initialize rate limiter
                 rate_limiter = RateLimiter(config.rate_limit, name)
                 self.rate_limiters[name] = rate_limiter
                 logger.debug(f"[DEBUG] Initialized rate limiter for provider '{name}': {config.rate_limit}")
                 
+                self.circuit_breakers[name] = self._create_circuit_breaker()
+                if config.max_concurrency:
+                    self.concurrency_limits[name] = asyncio.Semaphore(config.max_concurrency)
+                
             except Exception as e:
                 logger.error(f"[ERROR] Failed to initialize provider '{name}': {e}")
                 logger.error(f"[ERROR] Exception type: {type(e).__name__}")
@@ -66,11 +191,143 @@ class LLMProviderManager:
                 logger.error(f"[ERROR] Provider config: {config}")
                 continue
     
+    def _create_provider(self, name: str, config: ProviderConfig) -> BaseLLMProvider:
+        """Import and instantiate a provider; called on its first use.
+        
+        Args:
+            name: Provider name
+            config: Provider configuration
+            
+        Returns:
+            Initialized provider
+        """
+        provider_class = self.registry.get(config.type)
+        provider = provider_class(config, http_client=self._http_client_for(config))
+        self._create_prompt_batcher(name, provider)
+        logger.info(f"[DEBUG] Successfully initialized provider '{name}' with model '{provider.model_name}'")
+        return provider
+    
+    def _create_prompt_batcher(self, name: str, provider: BaseLLMProvider) -> None:
+        """Coalesce a provider's requests into multi-prompt completions if batching is enabled."""
+        if provider.config is None or not provider.config.batching.enabled:
+            return
+        batching = provider.config.batching
+        if provider.config.max_concurrency and provider.config.max_concurrency < batching.max_batch_size:
+            logger.warning(
+                f"[WARNING] Provider '{name}' max_concurrency ({provider.config.max_concurrency}) is below "
+                f"batching.max_batch_size ({batching.max_batch_size}); batches will never fill"
+            )
+        send = functools.partial(self._send_batch, name)
+        self.prompt_batchers[name] = PromptBatcher(send, batching.max_batch_size, batching.max_wait_ms)
+        logger.debug(f"[DEBUG] Batching up to {batching.max_batch_size} prompts per request for provider '{name}'")
+    
+    def _http_client_for(self, config: ProviderConfig) -> httpx.AsyncClient:
+        """Get the shared HTTP client for a provider's endpoint."""
+        key = HTTPClientPool.endpoint_key(config.base_url, config.http2)
+        max_connections = self._connection_limits.get(key, config.max_concurrency)
+        return self.http_pool.client_for(config.base_url, config.http2, max_connections)
+    
+    def _open_response_cache(self) -> Optional[ResponseCache]:
+        """Open the response cache if it is enabled."""
+        cache_config = self.settings.processing.response_cache
+        if not cache_config.enabled:
+            return None
+        max_bytes = int(cache_config.max_size_mb * 1024 * 1024) if cache_config.max_size_mb else None
+        return ResponseCache(cache_config.path, cache_config.ttl_seconds, max_bytes)
+    
+    def _is_cacheable(self) -> bool:
+        """Whether responses to the configured generation parameters may be cached."""
+        if self.response_cache is None:
+            return False
+        deterministic = self.settings.processing.generation_params.temperature == 0
+        return deterministic or self.settings.processing.response_cache.cache_nondeterministic
+    
+    def _cache_key(self, provider_name: str, messages: Messages, answer_schema: Optional[str] = None) -> str:
+        """Cache key of a request to a provider."""
+        model = self.providers.model_name(provider_name)
+        return cache_key(model, messages, self.settings.processing.generation_params, answer_schema)
+    
+    async def _cached_response(
+        self, providers_to_try: List[str], messages: Messages, answer_schema: Optional[str] = None
+    ) -> Optional[Tuple[str, ParsedResponse]]:
+        """Find a cached response from any of the providers' models.
+        
+        Args:
+            providers_to_try: Candidate providers in order of preference
+            messages: Chat messages of the request
+            answer_schema: JSON schema the answer must match, if any
+            
+        Returns:
+            Tuple of (provider name, cached response), or None on a miss
+        """
+        seen = set()
+        for provider_name in providers_to_try:
+            key = self._cache_key(provider_name, messages, answer_schema)
+            if key in seen:
+                continue
+            seen.add(key)
+            try:
+                response = await asyncio.to_thread(self.response_cache.get, key)
+            except Exception as e:
+                logger.warning(f"[WARNING] Response cache lookup failed: {e}")
+                return None
+            if response is not None:
+                return provider_name, response
+        return None
+    
+    async def _store_in_cache(
+        self, provider_name: str, messages: Messages, response: ParsedResponse, answer_schema: Optional[str] = None
+    ) -> None:
+        """Cache a provider response; failures only log a warning."""
+        key = self._cache_key(provider_name, messages, answer_schema)
+        try:
+            await asyncio.to_thread(self.response_cache.put, key, response)
+        except Exception as e:
+            logger.warning(f"[WARNING] Storing response in cache failed: {e}")
+    
+    async def discard_cached_response(
+        self,
+        provider_name: str,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        answer_schema: Optional[str] = None,
+    ) -> None:
+        """Remove the cached response to a request, e.g. after it failed validation.
+        
+        Args:
+            provider_name: Provider that produced the response
+            prompt: Input prompt of the request
+            system_prompt: Optional system prompt of the request
+            answer_schema: JSON schema the answer had to match, if any
+        """
+        if self.response_cache is None:
+            return
+        key = self._cache_key(provider_name, build_messages(prompt, system_prompt), answer_schema)
+        try:
+            await asyncio.to_thread(self.response_cache.delete, key)
+        except Exception as e:
+            logger.warning(f"[WARNING] Removing response from cache failed: {e}")
+    
+    def _create_circuit_breaker(self) -> CircuitBreaker:
+        """Create a circuit breaker from the processing settings."""
+        processing = self.settings.processing
+        slow_call_ms = processing.circuit_breaker_slow_call_ms
+        if slow_call_ms is None:
+            # Calls that nearly time out are as bad as timeouts
+            slow_call_ms = processing.timeout_seconds * 900
+        return CircuitBreaker(
+            failure_rate_threshold=processing.circuit_breaker_failure_rate,
+            window_size=processing.circuit_breaker_window,
+            min_calls=processing.circuit_breaker_min_calls,
+            slow_call_ms=slow_call_ms,
+            open_seconds=processing.circuit_breaker_open_seconds,
+        )
+    
     def get_provider(self, name: Optional[str] = None) -> Optional[BaseLLMProvider]:
-        """Get a provider by name, or a random available provider.
+        """Get a provider by name, or the one expected to respond soonest.
         
         Args:
-            name: Specific provider name, or None for random selection
+            name: Specific provider name, or None for latency-aware selection
             
         Returns:
             Provider instance or None if not available
@@ -81,8 +338,18 @@ class LLMProviderManager:
         if not self.providers:
             return None
         
-        # Return random provider for load balancing
-        return random.choice(list(self.providers.values()))
+        chosen = self.router.choose(list(self.providers.keys()))
+        return self.providers[chosen]
+    
+    def _is_saturated(self, provider_name: str) -> bool:
+        """Check whether every concurrency slot of a provider is taken."""
+        semaphore = self.concurrency_limits.get(provider_name)
+        return semaphore is not None and semaphore.locked()
+    
+    def _rate_limit_wait(self, provider_name: str) -> float:
+        """Seconds the provider's rate limiter needs before admitting a request."""
+        rate_limiter = self.rate_limiters.get(provider_name)
+        return rate_limiter.calculate_wait_time() if rate_limiter else 0.0
     
     def get_rate_limiter(self, provider_name: str) -> Optional[RateLimiter]:
         """Get rate limiter for a specific provider.
@@ -108,23 +375,33 @@ class LLMProviderManager:
         Returns:
             Provider instance or None if not found
         """
-        for provider in self.providers.values():
-            if provider.model_name == model_name:
-                return provider
+        for name in self.providers:
+            if self.providers.model_name(name) == model_name:
+                return self.providers.get(name)
         return None
     
-    def _get_providers_for_strategy(self, strategy: str, preferred_provider: Optional[str]) -> List[str]:
+    def _get_providers_for_strategy(
+        self, strategy: str, preferred_provider: Optional[str], prefix: Optional[str] = None
+    ) -> List[str]:
         """Get list of providers to try based on failover strategy.
         
         Args:
             strategy: Failover strategy
             preferred_provider: Preferred provider name
+            prefix: Prompt prefix key for sticky routing of unpinned requests
             
         Returns:
             List of provider names in order to try
         """
         providers_to_try = []
         
+        # Providers that are not pinned are tried fastest first
+        if preferred_provider and preferred_provider in self.providers:
+            others = [name for name in self.providers if name != preferred_provider]
+            others = sorted(others, key=self.router.expected_ms)
+        else:
+            others = self.router.order(list(self.providers.keys()), prefix)
+        
         if strategy == "none":
             # Only use preferred provider if specified
             if preferred_provider and preferred_provider in self.providers:
@@ -134,25 +411,21 @@ class LLMProviderManager:
             if preferred_provider and preferred_provider in self.providers:
                 providers_to_try.append(preferred_provider)
             else:
-                providers_to_try = list(self.providers.keys())
+                providers_to_try = others
         elif strategy == "rate_limit_only":
             # Try preferred provider first, then others for rate limit errors only
             if preferred_provider and preferred_provider in self.providers:
                 providers_to_try.append(preferred_provider)
             # Add other providers as potential failovers
-            for provider_name in self.providers:
-                if provider_name not in providers_to_try:
-                    providers_to_try.append(provider_name)
+            providers_to_try.extend(others)
         elif strategy == "all":
-            # Current behavior: try preferred first, then all others
+            # Try preferred first, then all others
             if preferred_provider and preferred_provider in self.providers:
                 providers_to_try.append(preferred_provider)
-            for provider_name in self.providers:
-                if provider_name not in providers_to_try:
-                    providers_to_try.append(provider_name)
+            providers_to_try.extend(others)
         else:
             logger.warning(f"[WARNING] Unknown failover strategy '{strategy}', defaulting to 'none'")
-            return self._get_providers_for_strategy("none", preferred_provider)
+            return self._get_providers_for_strategy("none", preferred_provider, prefix)
         
         return providers_to_try
     
@@ -179,8 +452,8 @@ class LLMProviderManager:
             # Never failover from preferred provider
             return False
         elif strategy == "rate_limit_only":
-            # Only failover on rate limit errors
-            return error_type in self.settings.processing.failover_on_errors
+            # Only failover on rate limit errors; a saturated provider never received the request
+            return error_type == "saturated" or error_type in self.settings.processing.failover_on_errors
         elif strategy == "all":
             # Always failover
             return True
@@ -194,11 +467,22 @@ class LLMProviderManager:
             error: Exception to classify
             
         Returns:
-            Error type string: 'rate_limit', 'timeout', 'auth', 'general'
+            Error type string: 'saturated', 'stream_aborted', 'rate_limit', 'timeout', 'auth', 'general'
         """
+        if isinstance(error, ProviderSaturatedError):
+            return "saturated"
+        
         error_msg = str(error).lower()
+        # HTTP status of the provider response, when the error carries one
+        status_code = getattr(error, "status_code", None)
         
-        if "rate limit" in error_msg or "too many requests" in error_msg or "rate_limit" in error_msg:
+        if "stream aborted" in error_msg:
+            return "stream_aborted"
+        elif status_code == 429:
+            return "rate_limit"
+        elif status_code in (401, 403):
+            return "auth"
+        elif "rate limit" in error_msg or "too many requests" in error_msg or "rate_limit" in error_msg:
             return "rate_limit"
         elif "timeout" in error_msg or "connection" in error_msg or "network" in error_msg:
             return "timeout"
@@ -207,20 +491,434 @@ class LLMProviderManager:
         else:
             return "general"
     
+    def _can_fail_over_from(self, strategy: str, attempt: int, providers_to_try: List[str]) -> bool:
+        """Whether a saturated provider at ``attempt`` could hand the request to a later candidate."""
+        if not self._should_failover(strategy, "saturated", attempt, len(providers_to_try)):
+            return False
+        return any(
+            name not in self.circuit_breakers or self.circuit_breakers[name].state != BreakerState.OPEN
+            for name in providers_to_try[attempt + 1:]
+        )
+    
+    async def _acquire_slot(self, provider_name: str, semaphore: asyncio.Semaphore, bounded: bool = False) -> None:
+        """Wait for a concurrency slot.
+        
+        Args:
+            provider_name: Provider the slot belongs to
+            semaphore: Concurrency limit of the provider
+            bounded: Give up after ``concurrency_wait_seconds``; only worth it while
+                another provider is left to try
+        
+        Raises:
+            ProviderSaturatedError: If no slot became free in time
+        """
+        wait_seconds = self.settings.processing.concurrency_wait_seconds
+        if not bounded or wait_seconds is None:
+            await semaphore.acquire()
+            return
+        try:
+            await asyncio.wait_for(semaphore.acquire(), wait_seconds)
+        except asyncio.TimeoutError:
+            raise ProviderSaturatedError(
+                f"Provider '{provider_name}' saturated: no concurrency slot free within {wait_seconds}s"
+            )
+    
+    async def _call_provider(
+        self,
+        provider_name: str,
+        messages: Messages,
+        answer_schema: Optional[str] = None,
+        admitted: Optional[asyncio.Event] = None,
+        bounded_wait: bool = False,
+        ticket: Optional[int] = None,
+    ) -> ParsedResponse:
+        """Send one request to a provider, keeping its limiter, router and breaker current.
+        
+        The caller must already have been admitted by the provider's circuit
+        breaker, unless the request is batched: batches are charged to the
+        rate limiter and breaker once per multi-prompt request.
+        
+        Args:
+            provider_name: Provider to call
+            messages: Chat messages, including any system prompt
+            answer_schema: JSON schema the answer must match, if any
+            admitted: Set once the request holds its concurrency slot and rate limit capacity
+            bounded_wait: Raise ProviderSaturatedError if no concurrency slot frees up in time
+            ticket: Circuit breaker ticket the request was admitted with
+            
+        Returns:
+            Parsed provider response
+        """
+        provider = self.providers[provider_name]
+        rate_limiter = self.rate_limiters.get(provider_name)
+        breaker = self.circuit_breakers.get(provider_name)
+        semaphore = self.concurrency_limits.get(provider_name)
+        generation_params = self.settings.processing.generation_params
+        batcher = self._batcher_for(provider_name, answer_schema)
+        if batcher:
+            rate_limiter = breaker = None
+        
+        estimated_tokens = estimate_tokens(messages_text(messages), generation_params.max_tokens)
+        reserved = False
+        holds_slot = False
+        call_started = self.router.start(provider_name)
+        
+        try:
+            if semaphore:
+                logger.debug(f"[DEBUG] Waiting for a concurrency slot on provider '{provider_name}'")
+                await self._acquire_slot(provider_name, semaphore, bounded_wait)
+                holds_slot = True
+            
+            # Apply rate limiting; waits until the request and token budgets allow it
+            if rate_limiter:
+                logger.debug(f"[DEBUG] Acquiring rate limit capacity for provider '{provider_name}' ({estimated_tokens} estimated tokens)")
+                reserved = await rate_limiter.acquire(estimated_tokens)
+                logger.debug(f"[DEBUG] Rate limit check passed for provider '{provider_name}'")
+            
+            logger.debug(f"[DEBUG] Calling generate_response on provider '{provider_name}'")
+            logger.debug(f"[DEBUG] Generation params: {generation_params}")
+            
+            if admitted:
+                admitted.set()
+            call_started = time.monotonic()
+            if batcher:
+                # Coalesced with concurrent requests into one multi-prompt completion
+                response = await batcher.submit(messages)
+            else:
+                # Streaming providers abort generations that are bound to fail
+                guard = None
+                if provider.config and provider.config.stream:
+                    guard = StreamGuard(expect_json=answer_schema is not None)
+                response = await provider.generate_response(
+                    messages, generation_params, guard=guard, answer_schema=answer_schema
+                )
+        except asyncio.CancelledError:
+            # Lost a hedge race or the run was stopped: says nothing about the provider
+            self.router.abandon(provider_name)
+            if breaker:
+                breaker.release(ticket)
+            if reserved:
+                rate_limiter.reconcile(estimated_tokens, 0)
+            raise
+        except ProviderSaturatedError:
+            # Never sent: says nothing about the provider's latency or health
+            self.router.abandon(provider_name)
+            if breaker:
+                breaker.release(ticket)
+            raise
+        except Exception as e:
+            latency_ms = (time.monotonic() - call_started) * 1000
+            self.router.finish(provider_name, call_started, success=False)
+            if reserved:
+                # A failed request did not use its estimated completion tokens
+                rate_limiter.reconcile(estimated_tokens, 0)
+            
+            self._record_failure(provider_name, e, latency_ms, breaker, rate_limiter, ticket)
+            raise
+        finally:
+            if holds_slot:
+                semaphore.release()
+        
+        latency_ms = (time.monotonic() - call_started) * 1000
+        self.router.finish(provider_name, call_started, success=True)
+        if breaker:
+            breaker.record(True, latency_ms, ticket=ticket)
+        if reserved:
+            rate_limiter.reconcile(estimated_tokens, response.tokens_used)
+        if rate_limiter:
+            rate_limiter.update_from_response(response.metadata.get("rate_limit_headers"))
+        return response
+    
+    def _batcher_for(self, provider_name: str, answer_schema: Optional[str] = None) -> Optional[PromptBatcher]:
+        """Batcher a request goes through, or None if it is sent on its own.
+        
+        The completions endpoint has no structured output, so questions with an
+        answer schema always take the normal path.
+        """
+        if answer_schema is not None:
+            return None
+        return self.prompt_batchers.get(provider_name)
+    
+    async def _send_batch(self, provider_name: str, prompts: List[Messages]) -> List[ParsedResponse]:
+        """Send one multi-prompt completion, charging the rate limiter and breaker once for it.
+        
+        Args:
+            provider_name: Provider to call
+            prompts: Chat messages of every request in the batch
+            
+        Returns:
+            One parsed response per prompt, in order
+        """
+        provider = self.providers[provider_name]
+        rate_limiter = self.rate_limiters.get(provider_name)
+        breaker = self.circuit_breakers.get(provider_name)
+        generation_params = self.settings.processing.generation_params
+        
+        ticket = breaker.allow_request() if breaker else None
+        if breaker and not ticket:
+            raise ProviderError(f"Provider '{provider_name}' circuit breaker {breaker.state.value}; batch not sent")
+        estimated_tokens = sum(estimate_tokens(messages_text(prompt), generation_params.max_tokens) for prompt in prompts)
+        reserved = False
+        started = time.monotonic()
+        try:
+            if rate_limiter:
+                reserved = await rate_limiter.acquire(estimated_tokens)
+            started = time.monotonic()
+            responses = await provider.generate_batch(prompts, generation_params)
+        except asyncio.CancelledError:
+            if breaker:
+                breaker.release(ticket)
+            if reserved:
+                rate_limiter.reconcile(estimated_tokens, 0)
+            raise
+        except Exception as e:
+            if reserved:
+                rate_limiter.reconcile(estimated_tokens, 0)
+            self._record_failure(
+                provider_name, e, (time.monotonic() - started) * 1000, breaker, rate_limiter, ticket
+            )
+            raise
+        
+        if breaker:
+            breaker.record(True, (time.monotonic() - started) * 1000, ticket=ticket)
+        if reserved:
+            tokens = [response.tokens_used for response in responses]
+            rate_limiter.reconcile(estimated_tokens, None if None in tokens else sum(tokens))
+        if rate_limiter and responses:
+            rate_limiter.update_from_response(responses[0].metadata.get("rate_limit_headers"))
+        return responses
+    
+    def _record_failure(
+        self,
+        provider_name: str,
+        error: Exception,
+        latency_ms: float,
+        breaker: Optional[CircuitBreaker],
+        rate_limiter: Optional[RateLimiter],
+        ticket: Optional[int] = None,
+    ) -> None:
+        """Update a provider's rate limiter and circuit breaker after a failed request."""
+        error_type = self._classify_error(error)
+        if error_type == "rate_limit" and rate_limiter:
+            retry_after = rate_limiter.on_rate_limited(getattr(error, "headers", None))
+            logger.debug(f"[DEBUG] Provider '{provider_name}' rate limited, limits scaled to {rate_limiter.scale:.2f}, retry after {retry_after}")
+        if error_type in ("rate_limit", "stream_aborted"):
+            if breaker:
+                # Throttling and bad generations say nothing about provider health
+                breaker.release(ticket)
+        elif breaker:
+            breaker.record(False, latency_ms, ticket=ticket)
+            logger.debug(f"[DEBUG] Provider '{provider_name}' circuit breaker: {breaker.get_stats()}")
+    
+    def _hedge_delay(self, provider_name: str) -> Optional[float]:
+        """Seconds after which a request to the provider is hedged, or None to never hedge."""
+        processing = self.settings.processing
+        if not processing.hedge_requests:
+            return None
+        latency_ms = self.router.percentile_ms(
+            provider_name, processing.hedge_percentile, processing.hedge_min_samples
+        )
+        return latency_ms / 1000 if latency_ms is not None else None
+    
+    def _pick_hedge_provider(
+        self, primary: str, candidates: List[str], answer_schema: Optional[str] = None
+    ) -> Optional[Tuple[str, Optional[int]]]:
+        """Choose where to send a hedge, or None if the budget or breakers forbid it.
+        
+        Args:
+            primary: Provider the original request went to
+            candidates: Providers allowed for this request by the failover strategy
+            answer_schema: JSON schema the answer must match, if any
+            
+        Returns:
+            Tuple of (provider name, circuit breaker ticket it was admitted with), or None
+        """
+        if self.hedges_sent + 1 > self.settings.processing.hedge_budget * self.hedge_eligible_requests:
+            return None
+        
+        others = [
+            name for name in candidates
+            if name != primary
+            and not self._is_saturated(name)
+            and self._batcher_for(name, answer_schema) is None
+            and (name not in self.circuit_breakers or self.circuit_breakers[name].state == BreakerState.CLOSED)
+        ]
+        choice = self.router.choose(others) or primary
+        if self._is_saturated(choice) or self._batcher_for(choice, answer_schema):
+            # The hedge would only queue behind the request it is meant to overtake
+            return None
+        breaker = self.circuit_breakers.get(choice)
+        ticket = breaker.allow_request() if breaker else None
+        if breaker and not ticket:
+            return None
+        return choice, ticket
+    
+    async def _generate_with_hedging(
+        self,
+        provider_name: str,
+        messages: Messages,
+        candidates: List[str],
+        answer_schema: Optional[str] = None,
+        bounded_wait: bool = False,
+        ticket: Optional[int] = None,
+    ) -> Tuple[str, ParsedResponse]:
+        """Call a provider, hedging with a duplicate request if it runs long.
+        
+        When hedging is enabled and the call has not finished by the provider's
+        latency percentile, a second request goes to another candidate (or the
+        same provider). The percentile covers only the provider call, so the
+        delay starts once the request has its concurrency slot and rate limit
+        capacity; time spent queued is never hedged. The first successful
+        response wins and the other request is cancelled.
+        
+        Args:
+            provider_name: Provider admitted for this attempt
+            messages: Chat messages, including any system prompt
+            candidates: Providers allowed for this request by the failover strategy
+            answer_schema: JSON schema the answer must match, if any
+            bounded_wait: Give up on a saturated provider so the caller can fail over
+            ticket: Circuit breaker ticket the primary request was admitted with
+            
+        Returns:
+            Tuple of (name of the provider that answered, response)
+        """
+        # Batched requests wait for their batch to fill, so their latency is not comparable
+        delay = None if self._batcher_for(provider_name, answer_schema) else self._hedge_delay(provider_name)
+        if self.settings.processing.hedge_requests:
+            self.hedge_eligible_requests += 1
+        if delay is None:
+            try:
+                return provider_name, await self._call_provider(
+                    provider_name, messages, answer_schema, bounded_wait=bounded_wait, ticket=ticket
+                )
+            finally:
+                self._release_ticket(provider_name, ticket)
+        
+        admitted = asyncio.Event()
+        tickets = [(provider_name, ticket)]
+        primary = asyncio.create_task(
+            self._call_provider(provider_name, messages, answer_schema, admitted, bounded_wait, ticket)
+        )
+        tasks = {primary: provider_name}
+        admission = asyncio.create_task(admitted.wait())
+        try:
+            await asyncio.wait({primary, admission}, return_when=asyncio.FIRST_COMPLETED)
+            admission.cancel()
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                hedge_target = self._pick_hedge_provider(provider_name, candidates, answer_schema)
+                if hedge_target:
+                    hedge_name, hedge_ticket = hedge_target
+                    logger.debug(f"[DEBUG] Hedging request to '{provider_name}' after {delay:.2f}s with '{hedge_name}'")
+                    self.hedges_sent += 1
+                    tickets.append((hedge_name, hedge_ticket))
+                    hedge = asyncio.create_task(
+                        self._call_provider(hedge_name, messages, answer_schema, ticket=hedge_ticket)
+                    )
+                    tasks[hedge] = hedge_name
+            
+            pending = set(tasks)
+            errors = []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedges_won += 1
+                        return tasks[task], task.result()
+                    errors.append(task.exception())
+            raise errors[0]
+        finally:
+            admission.cancel()
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(admission, *tasks, return_exceptions=True)
+            # A task cancelled before it started never gave back its probe slot
+            for name, name_ticket in tickets:
+                self._release_ticket(name, name_ticket)
+    
+    def _release_ticket(self, provider_name: str, ticket: Optional[int]) -> None:
+        """Give back a breaker ticket; does nothing if its outcome was already recorded."""
+        breaker = self.circuit_breakers.get(provider_name)
+        if breaker:
+            breaker.release(ticket)
+    
     async def generate_response_with_failover(
+        self,
+        prompt: str,
+        preferred_provider: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        failover_strategy: Optional[str] = None,
+        answer_schema: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> WorkerResult:
+        """Generate response with configurable failover.
+        
+        Identical requests that are in flight at the same time share one
+        provider call; every caller gets its own copy of the result.
+        
+        Args:
+            prompt: Input prompt for the LLM
+            preferred_provider: Preferred provider to use first
+            system_prompt: Optional system prompt
+            failover_strategy: Override failover strategy for this request
+            answer_schema: JSON schema the answer must match; lets streaming abort early
+            use_cache: Look the request up in the response cache (retries pass False)
+            
+        Returns:
+            WorkerResult with response or error details
+        """
+        request = (prompt, preferred_provider, system_prompt, failover_strategy, answer_schema, use_cache)
+        if not self.settings.processing.deduplicate_requests:
+            return await self._generate_response(*request)
+        
+        key = hashlib.sha256(json.dumps(request).encode("utf-8")).hexdigest()
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight(task=asyncio.create_task(self._generate_response(*request)))
+            self._flights[key] = flight
+            
+            def land(_task: asyncio.Task) -> None:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            
+            flight.task.add_done_callback(land)
+        else:
+            self.deduplicated_requests += 1
+            logger.debug(f"[DEBUG] Joining identical in-flight request {key[:12]}")
+        
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            # Stop the shared call only once nobody is waiting for it
+            flight.waiters -= 1
+            if flight.waiters == 0:
+                flight.task.cancel()
+            raise
+        flight.waiters -= 1
+        return dataclasses.replace(result, deduplicated=not leader)
+    
+    async def _generate_response(
         self, 
         prompt: str, 
         preferred_provider: Optional[str] = None,
         system_prompt: Optional[str] = None,
-        failover_strategy: Optional[str] = None
+        failover_strategy: Optional[str] = None,
+        answer_schema: Optional[str] = None,
+        use_cache: bool = True,
     ) -> WorkerResult:
-        """Generate response with configurable failover.
+        """Generate one response, failing over between providers as the strategy allows.
         
         Args:
             prompt: Input prompt for the LLM
             preferred_provider: Preferred provider to use first
             system_prompt: Optional system prompt
             failover_strategy: Override failover strategy for this request
+            answer_schema: JSON schema the answer must match; lets streaming abort early
+            use_cache: Look the request up in the response cache; a fresh answer is stored either way
             
         Returns:
             WorkerResult with response or error details
@@ -234,8 +932,12 @@ class LLMProviderManager:
         logger.debug(f"[DEBUG] Preferred provider: {preferred_provider}")
         logger.debug(f"[DEBUG] Available providers: {list(self.providers.keys())}")
         
+        # The system prompt goes in its own message so providers can cache it
+        messages = build_messages(prompt, system_prompt)
+        prefix = prefix_key(messages) if self.settings.processing.prefix_affinity else None
+        
         # Determine providers to try based on strategy
-        providers_to_try = self._get_providers_for_strategy(strategy, preferred_provider)
+        providers_to_try = self._get_providers_for_strategy(strategy, preferred_provider, prefix)
         
         if not providers_to_try:
             logger.error(f"[ERROR] No providers available for strategy '{strategy}' with preferred provider '{preferred_provider}'")
@@ -248,59 +950,89 @@ class LLMProviderManager:
                 error_type="configuration_error"
             )
         
+        # Providers with free concurrency slots go before saturated ones
+        providers_to_try = sorted(providers_to_try, key=self._is_saturated)
+        
         logger.debug(f"[DEBUG] Provider try order: {providers_to_try}")
         
+        cacheable = self._is_cacheable()
+        if cacheable and use_cache:
+            cached = await self._cached_response(providers_to_try, messages, answer_schema)
+            if cached:
+                cached_by, response = cached
+                logger.debug(f"[DEBUG] Serving response for provider {cached_by} from cache")
+                return WorkerResult(
+                    question_id=0,  # Will be set by caller
+                    provider_name=cached_by,
+                    model_name=response.model or self.providers.model_name(cached_by),
+                    success=True,
+                    response_text=response.content,
+                    thinking=response.thinking,
+                    tokens_used=response.tokens_used,
+                    from_cache=True,
+                )
+        
         last_error = None
         last_error_type = None
+        last_retry_after = None
+        circuit_retry_after = None
         
         for i, provider_name in enumerate(providers_to_try):
-            provider = self.providers[provider_name]
-            rate_limiter = self.rate_limiters.get(provider_name)
+            provider = self.providers.get(provider_name)
+            if provider is None:
+                last_error = f"Provider '{provider_name}' could not be initialized"
+                last_error_type = "configuration_error"
+                continue
+            breaker = self.circuit_breakers.get(provider_name)
+            # Batched requests are admitted by the breaker once per multi-prompt request
+            batched = self._batcher_for(provider_name, answer_schema) is not None
+            
+            ticket = breaker.allow_request() if breaker and not batched else None
+            if breaker and (breaker.is_open() if batched else not ticket):
+                wait = breaker.retry_after()
+                circuit_retry_after = wait if circuit_retry_after is None else min(circuit_retry_after, wait)
+                logger.warning(f"[WARNING] Skipping provider '{provider_name}': circuit breaker {breaker.state.value}")
+                continue
             
             logger.debug(f"[DEBUG] Attempting provider {i+1}/{len(providers_to_try)}: {provider_name}")
             logger.debug(f"[DEBUG] Provider model: {provider.model_name}")
             
             try:
-                # Apply rate limiting
-                if rate_limiter:
-                    logger.debug(f"[DEBUG] Checking rate limits for provider '{provider_name}'")
-                    await rate_limiter.acquire()
-                    logger.debug(f"[DEBUG] Rate limit check passed for provider '{provider_name}'")
-                
-                # Combine system prompt with user prompt if provided
-                full_prompt = prompt
-                if system_prompt:
-                    full_prompt = f"{system_prompt}\n\n{prompt}"
-                    logger.debug(f"[DEBUG] Combined prompt with system prompt")
-                
-                # Generate response
-                logger.debug(f"[DEBUG] Calling generate_response on provider '{provider_name}'")
-                logger.debug(f"[DEBUG] Generation params: {self.settings.processing.generation_params}")
-                
-                response = await provider.generate_response(
-                    full_prompt, 
-                    self.settings.processing.generation_params
+                # Waiting for a slot is bounded only while another provider can take over
+                answered_by, response = await self._generate_with_hedging(
+                    provider_name,
+                    messages,
+                    providers_to_try,
+                    answer_schema,
+                    self._can_fail_over_from(strategy, i, providers_to_try),
+                    ticket,
                 )
+                provider = self.providers[answered_by]
+                if cacheable:
+                    await self._store_in_cache(answered_by, messages, response, answer_schema)
                 
-                logger.info(f"Successfully generated response using provider: {provider_name} (model: {response.model or provider.model_name})")
+                logger.info(f"Successfully generated response using provider: {answered_by} (model: {response.model or provider.model_name})")
                 logger.debug(f"[DEBUG] Response content (first 200 chars): {response.content[:200] if response.content else 'None'}")
                 logger.debug(f"[DEBUG] Response tokens: {response.tokens_used}")
                 logger.debug(f"[DEBUG] Response metadata: {response.metadata}")
                 
                 return WorkerResult(
                     question_id=0,  # Will be set by caller
-                    provider_name=provider_name,
+                    provider_name=answered_by,
                     model_name=response.model or provider.model_name,
                     success=True,
                     response_text=response.content,
                     thinking=response.thinking,
                     tokens_used=response.tokens_used,
+                    cached_tokens=response.metadata.get("cached_tokens"),
                     processing_time_ms=response.metadata.get("processing_time_ms"),
                 )
                 
             except Exception as e:
                 last_error = str(e)
                 last_error_type = self._classify_error(e)
+                if last_error_type == "rate_limit":
+                    last_retry_after = parse_retry_after(getattr(e, "headers", None))
                 
                 logger.error(f"[ERROR] Provider {provider_name} failed (attempt {i+1}/{len(providers_to_try)})")
                 logger.error(f"[ERROR] Exception type: {type(e).__name__}")
@@ -316,6 +1048,18 @@ class LLMProviderManager:
                     logger.info(f"[INFO] Failover not allowed for strategy '{strategy}' with error type '{last_error_type}'")
                     break
         
+        if last_error is None and circuit_retry_after is not None:
+            logger.error(f"[ERROR] All providers skipped: circuit breakers open for {providers_to_try}")
+            return WorkerResult(
+                question_id=0,
+                provider_name=preferred_provider or "unknown",
+                model_name="unknown",
+                success=False,
+                error_message="All providers are unavailable (circuit breaker open)",
+                error_type="circuit_open",
+                retry_after_seconds=circuit_retry_after,
+            )
+        
         # All providers failed or failover was stopped
         logger.error(f"[DEBUG] All {len(providers_to_try)} providers failed or failover stopped")
         logger.error(f"[DEBUG] Providers attempted: {providers_to_try}")
@@ -329,7 +1073,8 @@ class LLMProviderManager:
             model_name="unknown",
             success=False,
             error_message=last_error or "All providers failed",
-            error_type=last_error_type or "provider_error"
+            error_type=last_error_type or "provider_error",
+            retry_after_seconds=last_retry_after if last_error_type == "rate_limit" else None,
         )
     
     def add_provider(self, name: str, config: ProviderConfig) -> bool:
@@ -343,15 +1088,16 @@ class LLMProviderManager:
             True if provider was added successfully
         """
         try:
-            provider_class = self.provider_classes.get(config.type)
-            if not provider_class:
+            if config.type not in self.registry:
                 return False
             
-            provider = provider_class(config)
-            self.providers[name] = provider
+            self.providers[name] = self._create_provider(name, config)
             
             rate_limiter = RateLimiter(config.rate_limit, name)
             self.rate_limiters[name] = rate_limiter
+            self.circuit_breakers[name] = self._create_circuit_breaker()
+            if config.max_concurrency:
+                self.concurrency_limits[name] = asyncio.Semaphore(config.max_concurrency)
             
             return True
             
@@ -371,20 +1117,57 @@ class LLMProviderManager:
             del self.providers[name]
         if name in self.rate_limiters:
             del self.rate_limiters[name]
+        self.circuit_breakers.pop(name, None)
+        self.concurrency_limits.pop(name, None)
+        self.prompt_batchers.pop(name, None)
+        self.router.remove(name)
         return name in self.providers
     
     def get_provider_stats(self) -> Dict[str, Dict]:
         """Get statistics for all providers."""
         stats = {}
-        for name, provider in self.providers.items():
+        for name in self.providers:
+            config = self.providers.config(name)
             rate_limiter = self.rate_limiters.get(name)
             stats[name] = {
-                "type": provider.provider_name,
-                "model": provider.model_name,
+                "type": config.type if config else "unknown",
+                "model": self.providers.model_name(name),
+                "loaded": self.providers.is_loaded(name),
                 "rate_limiter": {
                     "active": rate_limiter is not None,
                     "requests_per_minute": rate_limiter.config.requests_per_minute if rate_limiter else None,
                     "requests_per_hour": rate_limiter.config.requests_per_hour if rate_limiter else None,
-                } if rate_limiter else None
+                    "tokens_per_minute": rate_limiter.config.tokens_per_minute,
+                    **rate_limiter.get_stats(),
+                } if rate_limiter else None,
+                "max_concurrency": config.max_concurrency if config else None,
+                "routing": self.router.get_stats(name),
+                "circuit_breaker": self.circuit_breakers[name].get_stats() if name in self.circuit_breakers else None,
+                "batching": self.prompt_batchers[name].get_stats() if name in self.prompt_batchers else None,
             }
-        return stats
\ No newline at end of file
+        return stats
+    
+    def get_deduplication_stats(self) -> Dict[str, int]:
+        """Get counts of requests that shared an identical in-flight call."""
+        return {
+            "deduplicated_requests": self.deduplicated_requests,
+            "in_flight": len(self._flights),
+        }
+    
+    def get_cache_stats(self) -> Optional[Dict]:
+        """Get response cache metrics, or None if the cache is disabled."""
+        return self.response_cache.get_stats() if self.response_cache else None
+    
+    def get_hedge_stats(self) -> Dict[str, int]:
+        """Get counts of hedged requests."""
+        return {
+            "eligible_requests": self.hedge_eligible_requests,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+        }
+    
+    async def close(self) -> None:
+        """Close the shared HTTP connections of all providers and the response cache."""
+        await self.http_pool.aclose()
+        if self.response_cache:
+            self.response_cache.close()
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""Coalescing of concurrent requests into multi-prompt completions."""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from llm_distiller.llm.base import Messages, ParsedResponse, ProviderError
+
+logger = logging.getLogger(__name__)
+
+
+class PromptBatcher:
+    """Collects prompts submitted within a short window and sends them as one request.
+
+    A batch is sent as soon as it holds ``max_batch_size`` prompts, or
+    ``max_wait_ms`` after its first prompt arrived. Every caller gets the
+    response for its own prompt; if the request fails, all callers in the
+    batch get the error. Every caller is answered, even when the request is
+    cancelled or returns too few responses.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[Messages]], Awaitable[List[ParsedResponse]]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+    ):
+        """Initialize the batcher.
+
+        Args:
+            send: Sends a list of prompts and returns one response per prompt, in order
+            max_batch_size: Prompts per request
+            max_wait_ms: Longest time a prompt waits for the batch to fill
+        """
+        self.send = send
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batches_sent = 0
+        self.prompts_sent = 0
+        self._pending: List[Tuple[Messages, "asyncio.Future[ParsedResponse]"]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sending: Set["asyncio.Task[None]"] = set()
+
+    async def submit(self, messages: Messages) -> ParsedResponse:
+        """Add a prompt to the next batch and wait for its response.
+
+        Args:
+            messages: Chat messages of the request
+
+        Returns:
+            Parsed response for this prompt
+        """
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[ParsedResponse]" = loop.create_future()
+        self._pending.append((messages, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Send the pending prompts as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers that gave up while waiting are left out of the request
+        batch = [(messages, future) for messages, future in self._pending if not future.done()]
+        self._pending = []
+        if not batch:
+            return
+        task = asyncio.create_task(self._send(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: List[Tuple[Messages, "asyncio.Future[ParsedResponse]"]]) -> None:
+        """Send a batch and hand each caller its response or the error."""
+        self.batches_sent += 1
+        self.prompts_sent += len(batch)
+        logger.debug(f"[DEBUG] Sending batch of {len(batch)} prompts")
+        error: Optional[BaseException] = None
+        try:
+            responses = await self.send([messages for messages, _ in batch])
+            for (_, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
+            if len(responses) < len(batch):
+                error = ProviderError(f"Batched request returned {len(responses)} responses for {len(batch)} prompts")
+        except Exception as e:
+            error = e
+        finally:
+            # No caller may be left waiting on a future nobody will resolve
+            for _, future in batch:
+                if future.done():
+                    continue
+                if error is None:
+                    # The send was cancelled
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get batching metrics."""
+        return {
+            "batches_sent": self.batches_sent,
+            "prompts_sent": self.prompts_sent,
+            "average_batch_size": self.prompts_sent / self.batches_sent if self.batches_sent else 0.0,
+            "pending": len(self._pending),
+        }
@@ -23,6 +23,9 @@ class ProcessingStats:
     failed_responses: int = 0
     invalid_responses: int = 0
     total_tokens_used: int = 0
+    total_cached_tokens: int = 0
+    cache_hits: int = 0
+    deduplicated_responses: int = 0
     total_cost_cents: int = 0
     processing_time_seconds: float = 0.0
     start_time: Optional[datetime] = None
@@ -102,6 +105,10 @@ class WorkerResult:
     error_message: Optional[str] = None
     error_type: Optional[str] = None
     tokens_used: Optional[int] = None
+    cached_tokens: Optional[int] = None  # prompt tokens served from the provider's prefix cache
     cost_cents: Optional[int] = None
     processing_time_ms: Optional[int] = None
-    validation_errors: Optional[List[str]] = None
\ No newline at end of file
+    validation_errors: Optional[List[str]] = None
+    retry_after_seconds: Optional[float] = None
+    from_cache: bool = False  # served from the response cache without calling a provider
+    deduplicated: bool = False  # copied from an identical request that was in flight at the same time
\ No newline at end of file
@@ -7,42 +7,100 @@ from .models import ProcessingStatus, QuestionTask
 
 
 class QuestionQueue:
-    """Thread-safe queue for managing question processing tasks."""
+    """Thread-safe queue for managing question processing tasks.
+
+    With ``maxsize`` set, producers adding new tasks wait while that many
+    tasks are pending. With ``evict_finished`` set, completed tasks and tasks
+    that ran out of retries are dropped and only counted (failed ids are
+    kept), so memory stays flat regardless of how many tasks pass through.
+
+    Completion is tracked with a counter of outstanding tasks: a task is
+    outstanding from the moment it is added until it completes or fails with
+    no retries left. ``join()`` waits for that counter to reach zero, and
+    ``shutdown()`` wakes idle workers with sentinels instead of timeouts.
+    """
     
-    def __init__(self):
-        """Initialize the question queue."""
-        self._queue: asyncio.Queue[QuestionTask] = asyncio.Queue()
+    def __init__(self, maxsize: int = 0, evict_finished: bool = False):
+        """Initialize the question queue.
+        
+        Args:
+            maxsize: Maximum number of pending tasks before producers wait (0 = unbounded)
+            evict_finished: Drop finished tasks and keep only counters and failed ids
+        """
+        self.maxsize = maxsize
+        self.evict_finished = evict_finished
+        # Unbounded so retries never block; the bound is enforced on new tasks only
+        self._queue: asyncio.Queue[Optional[QuestionTask]] = asyncio.Queue()
         self._processing: Set[int] = set()  # question_ids currently being processed
         self._completed: Set[int] = set()   # question_ids completed
         self._failed: Set[int] = set()      # question_ids failed
         self._tasks: dict[int, QuestionTask] = {}  # All tasks by ID
+        self._completed_count = 0  # completed tasks evicted from _tasks
+        self._evicted_count = 0    # all tasks evicted from _tasks
+        self._outstanding = 0  # tasks not yet completed or out of retries
+        self._space_available = asyncio.Event()
+        self._space_available.set()
+        self._all_done = asyncio.Event()
+        self._all_done.set()
         self._lock = asyncio.Lock()
     
     async def add_task(self, task: QuestionTask) -> None:
-        """Add a task to the queue."""
+        """Add a task to the queue, waiting while the queue is full."""
+        if task.status == ProcessingStatus.PENDING:
+            await self._wait_for_space()
         async with self._lock:
             self._tasks[task.question_id] = task
             if task.status == ProcessingStatus.PENDING:
-                await self._queue.put(task)
+                self._outstanding += 1
+                self._all_done.clear()
+                self._queue.put_nowait(task)
     
     async def add_tasks(self, tasks: List[QuestionTask]) -> None:
-        """Add multiple tasks to the queue."""
-        async with self._lock:
-            for task in tasks:
-                self._tasks[task.question_id] = task
-                if task.status == ProcessingStatus.PENDING:
-                    await self._queue.put(task)
+        """Add multiple tasks to the queue, waiting while the queue is full."""
+        for task in tasks:
+            await self.add_task(task)
+    
+    async def _wait_for_space(self) -> None:
+        """Wait until the number of pending tasks is below ``maxsize``."""
+        while self.maxsize and self._queue.qsize() >= self.maxsize:
+            self._space_available.clear()
+            await self._space_available.wait()
     
     async def get_next_task(self) -> Optional[QuestionTask]:
-        """Get the next task to process."""
-        try:
-            task = await asyncio.wait_for(self._queue.get(), timeout=1.0)
-            async with self._lock:
-                task.status = ProcessingStatus.PROCESSING
-                self._processing.add(task.question_id)
-            return task
-        except asyncio.TimeoutError:
+        """Wait for the next task to process.
+        
+        Returns:
+            The next task, or None once the queue has been shut down
+        """
+        task = await self._queue.get()
+        if task is None:
             return None
+        
+        self._space_available.set()
+        async with self._lock:
+            task.status = ProcessingStatus.PROCESSING
+            self._processing.add(task.question_id)
+        return task
+    
+    async def join(self) -> None:
+        """Wait until every added task has completed or run out of retries."""
+        await self._all_done.wait()
+    
+    async def shutdown(self, workers: int) -> None:
+        """Wake idle workers so they can exit.
+        
+        Args:
+            workers: Number of workers waiting in ``get_next_task``
+        """
+        for _ in range(workers):
+            self._queue.put_nowait(None)
+    
+    def _finish(self) -> None:
+        """Count a task as finished; call with the lock held."""
+        self._outstanding -= 1
+        if self._outstanding <= 0:
+            self._outstanding = 0
+            self._all_done.set()
     
     async def mark_completed(self, question_id: int, success: bool = True) -> None:
         """Mark a task as completed or failed."""
@@ -54,10 +112,33 @@ class QuestionQueue:
                 task = self._tasks[question_id]
                 if success:
                     task.status = ProcessingStatus.COMPLETED
-                    self._completed.add(question_id)
+                    self._finish()
+                    if self.evict_finished:
+                        del self._tasks[question_id]
+                        self._completed_count += 1
+                        self._evicted_count += 1
+                    else:
+                        self._completed.add(question_id)
                 else:
                     task.status = ProcessingStatus.FAILED
                     self._failed.add(question_id)
+                    if task.retry_count >= task.max_retries:
+                        # Out of retries: this failure is final
+                        self._finish()
+                        if self.evict_finished:
+                            # Keep only the id
+                            del self._tasks[question_id]
+                            self._evicted_count += 1
+    
+    async def requeue(self, question_id: int) -> None:
+        """Put a task that was never sent to a provider back, without using a retry."""
+        async with self._lock:
+            self._processing.discard(question_id)
+            task = self._tasks.get(question_id)
+            if task is None:
+                return
+            task.status = ProcessingStatus.PENDING
+            self._queue.put_nowait(task)
     
     async def retry_task(self, question_id: int) -> bool:
         """Retry a failed task if retries are available."""
@@ -75,7 +156,7 @@ class QuestionQueue:
                 self._failed.discard(question_id)
                 
                 # Re-add to queue
-                await self._queue.put(task)
+                self._queue.put_nowait(task)
                 return True
             return False
     
@@ -90,9 +171,9 @@ class QuestionQueue:
             return {
                 "pending": self._queue.qsize(),
                 "processing": len(self._processing),
-                "completed": len(self._completed),
+                "completed": len(self._completed) + self._completed_count,
                 "failed": len(self._failed),
-                "total": len(self._tasks)
+                "total": len(self._tasks) + self._evicted_count
             }
     
     async def is_empty(self) -> bool:
@@ -115,7 +196,8 @@ class QuestionQueue:
                 temp_queue = asyncio.Queue()
                 while not self._queue.empty():
                     task = self._queue.get_nowait()
-                    pending_tasks.append(task)
+                    if task is not None:
+                        pending_tasks.append(task)
                     await temp_queue.put(task)
                 
                 # Put items back in original queue
@@ -140,4 +222,9 @@ class QuestionQueue:
             self._processing.clear()
             self._completed.clear()
             self._failed.clear()
-            self._tasks.clear()
\ No newline at end of file
+            self._tasks.clear()
+            self._completed_count = 0
+            self._evicted_count = 0
+            self._outstanding = 0
+            self._space_available.set()
+            self._all_done.set()
\ No newline at end of file
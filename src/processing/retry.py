@@ -0,0 +1,125 @@
+"""Delayed retry scheduling for failed question tasks."""
+
+import asyncio
+import heapq
+import logging
+import random
+from typing import List, Optional, Tuple
+
+from .queue import QuestionQueue
+
+logger = logging.getLogger(__name__)
+
+
+class RetryScheduler:
+    """Re-queues failed tasks once their backoff delay has passed.
+
+    Pending retries live in a heap keyed by the time they become eligible, and
+    a single timer task sleeps until the earliest one is due.
+    """
+
+    # Failures caused by the response content, not the provider: retry at once.
+    # Aborted streams are left out: at low temperature the same prompt tends to
+    # loop or derail the same way again, so they back off like other failures.
+    IMMEDIATE_ERROR_TYPES = ("schema_validation",)
+    # Failures that come with a known time at which the provider is usable again
+    WAIT_ERROR_TYPES = ("rate_limit", "circuit_open")
+
+    def __init__(
+        self,
+        queue: QuestionQueue,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        """Initialize the retry scheduler.
+
+        Args:
+            queue: Queue that failed tasks are re-added to
+            base_delay: Delay in seconds before the first exponential retry
+            max_delay: Upper bound in seconds for exponential retry delays
+        """
+        self.queue = queue
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._heap: List[Tuple[float, int, int]] = []  # (eligible_at, seq, question_id)
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._timer_task: Optional[asyncio.Task] = None
+
+    def compute_delay(
+        self,
+        error_type: Optional[str],
+        retry_count: int,
+        retry_after: Optional[float] = None,
+    ) -> float:
+        """Compute how long to wait before retrying a failed task.
+
+        Args:
+            error_type: Classified error type of the failure
+            retry_count: Number of retries the task has already had
+            retry_after: Known wait in seconds for rate limits and open circuits
+
+        Returns:
+            Delay in seconds
+        """
+        if error_type in self.IMMEDIATE_ERROR_TYPES:
+            return 0.0
+
+        if error_type in self.WAIT_ERROR_TYPES and retry_after is not None:
+            return retry_after
+
+        # Exponential backoff with equal jitter
+        delay = min(self.max_delay, self.base_delay * (2 ** retry_count))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def schedule(self, question_id: int, delay: float) -> None:
+        """Schedule a failed task to be re-queued after a delay.
+
+        Args:
+            question_id: Failed task's question ID
+            delay: Seconds until the task may be retried
+        """
+        eligible_at = asyncio.get_running_loop().time() + delay
+        self._seq += 1
+        heapq.heappush(self._heap, (eligible_at, self._seq, question_id))
+        self._wakeup.set()
+
+        if self._timer_task is None:
+            self._timer_task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Re-queue tasks as they become eligible."""
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - loop.time()
+            if delay > 0:
+                try:
+                    # Wake early if a sooner retry is scheduled
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, question_id = heapq.heappop(self._heap)
+            if await self.queue.retry_task(question_id):
+                logger.info(f"[DEBUG] Retrying question {question_id}")
+            else:
+                logger.debug(f"[DEBUG] Not retrying task {question_id} - max retries reached or other reason")
+
+    async def stop(self) -> None:
+        """Stop the timer and drop retries that have not yet been queued."""
+        if self._timer_task is not None:
+            self._timer_task.cancel()
+            await asyncio.gather(self._timer_task, return_exceptions=True)
+            self._timer_task = None
+        self._heap.clear()
+
+    @property
+    def pending(self) -> int:
+        """Number of retries waiting for their delay to pass."""
+        return len(self._heap)
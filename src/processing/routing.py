@@ -0,0 +1,223 @@
+"""Latency-aware provider selection."""
+
+import hashlib
+import math
+import random
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+from llm_distiller.llm.base import Messages
+
+# Weight of the newest latency sample in the moving average
+EWMA_ALPHA = 0.3
+
+# Successful call latencies kept per provider for percentiles
+LATENCY_SAMPLES = 200
+
+# A prefix stays on its provider unless that provider is expected to finish
+# more than this many of its own request latencies after the best alternative
+AFFINITY_SLACK = 4.0
+
+# Latency assumed for a sticky provider without samples when weighing affinity
+UNSAMPLED_LATENCY_MS = 1000.0
+
+# Prompt prefixes remembered for sticky routing
+AFFINITY_ENTRIES = 10000
+
+
+def prefix_key(messages: Messages) -> Optional[str]:
+    """Key identifying the shared prompt prefix of a request.
+
+    Args:
+        messages: Chat messages of the request
+
+    Returns:
+        Hash of the system messages, or None if there are none
+    """
+    system = [message["content"] for message in messages if message["role"] == "system"]
+    if not system:
+        return None
+    return hashlib.sha1("\0".join(system).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ProviderLoad:
+    """Live load and latency figures for one provider."""
+    in_flight: int = 0
+    latency_ms: Optional[float] = None  # EWMA, None until the first request finishes
+    successes: int = 0
+    failures: int = 0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+
+class ProviderRouter:
+    """Routes requests to the provider expected to answer soonest.
+
+    The expected completion time of a provider is the time its rate limiter
+    needs before admitting a request plus one latency estimate for every
+    request already in flight and the new one. Providers without latency
+    samples are treated as free so they get probed. Selection uses two random
+    choices so concurrent requests do not all pile onto the same provider.
+
+    Requests sharing a prompt prefix stick to the provider that served the
+    prefix first, so its prefix cache stays warm. They spill over to the
+    normal choice once it is expected to finish several requests' worth of
+    latency later than the best alternative.
+    """
+
+    def __init__(self, wait_time: Optional[Callable[[str], float]] = None):
+        """Initialize the router.
+
+        Args:
+            wait_time: Returns the rate limit wait in seconds for a provider name
+        """
+        self.wait_time = wait_time
+        self.loads: Dict[str, ProviderLoad] = {}
+        self.affinity: "OrderedDict[str, str]" = OrderedDict()
+
+    def _load(self, name: str) -> ProviderLoad:
+        return self.loads.setdefault(name, ProviderLoad())
+
+    def expected_ms(self, name: str, unsampled_ms: float = 0.0) -> float:
+        """Expected milliseconds until a new request to ``name`` completes.
+
+        Args:
+            name: Provider name
+            unsampled_ms: Latency assumed while the provider has no samples
+        """
+        load = self._load(name)
+        wait_ms = self.wait_time(name) * 1000 if self.wait_time else 0.0
+        latency_ms = load.latency_ms if load.latency_ms is not None else unsampled_ms
+        return wait_ms + (load.in_flight + 1) * latency_ms
+
+    def choose(self, names: List[str]) -> Optional[str]:
+        """Pick the better of two random providers.
+
+        Args:
+            names: Candidate provider names
+
+        Returns:
+            Chosen provider name, or None if there are no candidates
+        """
+        if not names:
+            return None
+        if len(names) == 1:
+            return names[0]
+        first, second = random.sample(names, 2)
+        return first if self.expected_ms(first) <= self.expected_ms(second) else second
+
+    def order(self, names: List[str], prefix: Optional[str] = None) -> List[str]:
+        """Order providers for a request: the chosen one first, then the rest fastest first.
+
+        Args:
+            names: Candidate provider names
+            prefix: Prompt prefix key of the request (see ``prefix_key``)
+
+        Returns:
+            The same names in the order they should be tried
+        """
+        first = self._sticky(names, prefix)
+        if first is None:
+            return []
+        rest = sorted((name for name in names if name != first), key=self.expected_ms)
+        return [first] + rest
+
+    def _sticky(self, names: List[str], prefix: Optional[str]) -> Optional[str]:
+        """Choose a provider, preferring the one already serving ``prefix``."""
+        if prefix is None:
+            return self.choose(names)
+
+        sticky = self.affinity.get(prefix)
+        if sticky in names:
+            self.affinity.move_to_end(prefix)
+            # Unsampled alternatives are assumed to be as fast as the sticky provider,
+            # so they do not look free and draw the prefix away
+            per_request = self._load(sticky).latency_ms or UNSAMPLED_LATENCY_MS
+            best = min(self.expected_ms(name, per_request) for name in names)
+            if self.expected_ms(sticky, per_request) - best <= AFFINITY_SLACK * per_request:
+                return sticky
+            # Spill over without moving the prefix away from its warm cache
+            return self.choose([name for name in names if name != sticky])
+
+        chosen = self.choose(names)
+        if chosen is not None:
+            self.affinity[prefix] = chosen
+            if len(self.affinity) > AFFINITY_ENTRIES:
+                self.affinity.popitem(last=False)
+        return chosen
+
+    def start(self, name: str) -> float:
+        """Record a request being sent to ``name``.
+
+        Returns:
+            Start timestamp to pass to ``finish``
+        """
+        self._load(name).in_flight += 1
+        return time.monotonic()
+
+    def finish(self, name: str, started_at: float, success: bool) -> None:
+        """Record a finished request and update the latency average.
+
+        Args:
+            name: Provider name
+            started_at: Value returned by ``start``
+            success: Whether the request succeeded
+        """
+        load = self._load(name)
+        load.in_flight = max(0, load.in_flight - 1)
+        sample = (time.monotonic() - started_at) * 1000
+        if success:
+            load.successes += 1
+            load.samples.append(sample)
+        else:
+            load.failures += 1
+            # Fast failures must not make a provider look fast
+            sample = max(sample, 2 * (load.latency_ms or sample))
+        if load.latency_ms is None:
+            load.latency_ms = sample
+        else:
+            load.latency_ms += EWMA_ALPHA * (sample - load.latency_ms)
+
+    def abandon(self, name: str) -> None:
+        """Record a request that was cancelled before it finished."""
+        load = self._load(name)
+        load.in_flight = max(0, load.in_flight - 1)
+
+    def percentile_ms(self, name: str, percentile: float, min_samples: int = 1) -> Optional[float]:
+        """Latency below which ``percentile`` of recent successful calls finished.
+
+        Args:
+            name: Provider name
+            percentile: Fraction between 0 and 1, e.g. 0.95
+            min_samples: Samples needed before a value is returned
+
+        Returns:
+            Latency in milliseconds, or None if there are too few samples
+        """
+        samples = self._load(name).samples
+        if len(samples) < max(1, min_samples):
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, math.ceil(percentile * len(ordered)) - 1)
+        return ordered[max(0, index)]
+
+    def remove(self, name: str) -> None:
+        """Forget a provider."""
+        self.loads.pop(name, None)
+        for prefix in [prefix for prefix, sticky in self.affinity.items() if sticky == name]:
+            del self.affinity[prefix]
+
+    def get_stats(self, name: str) -> Dict[str, Optional[float]]:
+        """Get routing figures for a provider."""
+        load = self._load(name)
+        return {
+            "in_flight": load.in_flight,
+            "latency_ms": load.latency_ms,
+            "p95_ms": self.percentile_ms(name, 0.95),
+            "expected_ms": self.expected_ms(name),
+            "successes": load.successes,
+            "failures": load.failures,
+            "prefixes": sum(1 for sticky in self.affinity.values() if sticky == name),
+        }
@@ -62,95 +62,13 @@ class QuestionWorker:
                 prompt=task.question_text,
                 preferred_provider=task.provider_name,
                 system_prompt=task.system_prompt,
-                failover_strategy=task.failover_strategy
+                failover_strategy=task.failover_strategy,
+                answer_schema=task.answer_schema if self.validate_responses else None,
+                # A retry must not be served the cached answer that failed
+                use_cache=task.retry_count == 0,
             )
             
-            # Set question ID
-            result.question_id = task.question_id
-            
-            # Extract thinking from response if not already present
-            if not hasattr(result, 'thinking') or result.thinking is None:
-                from llm_distiller.llm.base import ThinkingExtractor
-
-                # Use the ThinkingExtractor utility
-                cleaned_content, thinking = ThinkingExtractor.extract_thinking(result.response_text or "")
-                result.response_text = cleaned_content
-                result.thinking = thinking
-            
-            logger.info(f"Processing question {task.question_id} with provider: {result.provider_name}")
-            logger.debug(f"[DEBUG] Provider response - Success: {result.success}, Model: {result.model_name}, Tokens: {result.tokens_used}")
-            if result.thinking:
-                logger.debug(f"[DEBUG] Extracted thinking (first 200 chars): {result.thinking[:200]}")
-            
-            if not result.success:
-                # Store as invalid response with verbose error logging
-                logger.error(f"[ERROR] Failed to process question {task.question_id} with provider {result.provider_name}")
-                logger.error(f"[ERROR] Error type: {result.error_type}")
-                logger.error(f"[ERROR] Error message: {result.error_message}")
-                logger.error(f"[ERROR] Processing time: {result.processing_time_ms}ms")
-                logger.error(f"[ERROR] Tokens used: {result.tokens_used}")
-                if result.validation_errors:
-                    logger.error(f"[ERROR] Validation errors: {result.validation_errors}")
-                logger.error(f"[DEBUG] Full task context: {task}")
-                logger.error(f"[DEBUG] Full result context: {result}")
-                
-                if self.response_batcher:
-                    await self.response_batcher.add_invalid_response(task, result)
-                else:
-                    await self._store_invalid_response(task, result)
-                return result
-            
-            # Validate response if schema validation is enabled
-            validation_errors = None
-            if self.validate_responses and task.answer_schema:
-                logger.debug(f"[DEBUG] Validating response for question {task.question_id} against schema")
-                logger.debug(f"[DEBUG] Response text (first 200 chars): {result.response_text[:200] if result.response_text else 'None'}")
-                logger.debug(f"[DEBUG] Schema: {task.answer_schema}")
-                
-                validation_errors = await self._validate_response(
-                    result.response_text, task.answer_schema
-                )
-                
-                if validation_errors:
-                    # Store as invalid response due to schema validation failure with verbose logging
-                    logger.error(f"[ERROR] Schema validation failed for question {task.question_id}")
-                    logger.error(f"[ERROR] Provider: {result.provider_name}, Model: {result.model_name}")
-                    logger.error(f"[ERROR] Validation errors: {validation_errors}")
-                    logger.error(f"[ERROR] Response text: {result.response_text}")
-                    logger.error(f"[ERROR] Schema: {task.answer_schema}")
-                    
-                    invalid_result = WorkerResult(
-                        question_id=task.question_id,
-                        provider_name=result.provider_name,
-                        model_name=result.model_name,
-                        success=False,
-                        response_text=result.response_text,
-                        thinking=getattr(result, 'thinking', None),
-                        error_message="Schema validation failed",
-                        error_type="schema_validation",
-                        validation_errors=validation_errors,
-                        tokens_used=result.tokens_used,
-                        processing_time_ms=result.processing_time_ms
-                    )
-                    if self.response_batcher:
-                        await self.response_batcher.add_invalid_response(task, invalid_result)
-                    else:
-                        await self._store_invalid_response(task, invalid_result)
-                    return invalid_result
-            
-            # Store valid response
-            if self.response_batcher:
-                await self.response_batcher.add_valid_response(task, result)
-            else:
-                await self._store_valid_response(task, result)
-            
-            # Calculate processing time
-            processing_time = int((time.time() - start_time) * 1000)
-            result.processing_time_ms = processing_time
-            
-            logger.info(f"Successfully processed question {task.question_id} with provider {result.provider_name}")
-            
-            return result
+            return await self.handle_result(task, result, start_time)
             
         except Exception as e:
             # Handle unexpected errors with verbose logging
@@ -178,6 +96,118 @@ class QuestionWorker:
                 await self._store_invalid_response(task, error_result)
             return error_result
     
+    async def handle_result(
+        self, task: QuestionTask, result: WorkerResult, start_time: Optional[float] = None
+    ) -> WorkerResult:
+        """Validate and store a generated response.
+        
+        Used for interactive calls and for results ingested from batch jobs.
+        
+        Args:
+            task: Question task the response belongs to
+            result: Generation outcome
+            start_time: When processing started (None = keep the result's processing time)
+            
+        Returns:
+            WorkerResult with the final outcome
+        """
+        # Set question ID
+        result.question_id = task.question_id
+        
+        # Extract thinking from response if not already present
+        if not hasattr(result, 'thinking') or result.thinking is None:
+            from llm_distiller.llm.base import ThinkingExtractor
+
+            # Use the ThinkingExtractor utility
+            cleaned_content, thinking = ThinkingExtractor.extract_thinking(result.response_text or "")
+            result.response_text = cleaned_content
+            result.thinking = thinking
+        
+        logger.info(f"Processing question {task.question_id} with provider: {result.provider_name}")
+        logger.debug(f"[DEBUG] Provider response - Success: {result.success}, Model: {result.model_name}, Tokens: {result.tokens_used}")
+        if result.thinking:
+            logger.debug(f"[DEBUG] Extracted thinking (first 200 chars): {result.thinking[:200]}")
+        
+        if not result.success and result.error_type == "saturated":
+            # No request was sent; the engine requeues the task
+            logger.debug(f"[DEBUG] Question {task.question_id} not sent: {result.error_message}")
+            return result
+        
+        if not result.success:
+            # Store as invalid response with verbose error logging
+            logger.error(f"[ERROR] Failed to process question {task.question_id} with provider {result.provider_name}")
+            logger.error(f"[ERROR] Error type: {result.error_type}")
+            logger.error(f"[ERROR] Error message: {result.error_message}")
+            logger.error(f"[ERROR] Processing time: {result.processing_time_ms}ms")
+            logger.error(f"[ERROR] Tokens used: {result.tokens_used}")
+            if result.validation_errors:
+                logger.error(f"[ERROR] Validation errors: {result.validation_errors}")
+            logger.error(f"[DEBUG] Full task context: {task}")
+            logger.error(f"[DEBUG] Full result context: {result}")
+            
+            if self.response_batcher:
+                await self.response_batcher.add_invalid_response(task, result)
+            else:
+                await self._store_invalid_response(task, result)
+            return result
+        
+        # Validate response if schema validation is enabled
+        validation_errors = None
+        if self.validate_responses and task.answer_schema:
+            logger.debug(f"[DEBUG] Validating response for question {task.question_id} against schema")
+            logger.debug(f"[DEBUG] Response text (first 200 chars): {result.response_text[:200] if result.response_text else 'None'}")
+            logger.debug(f"[DEBUG] Schema: {task.answer_schema}")
+            
+            validation_errors = await self._validate_response(
+                result.response_text, task.answer_schema
+            )
+            
+            if validation_errors:
+                # Store as invalid response due to schema validation failure with verbose logging
+                logger.error(f"[ERROR] Schema validation failed for question {task.question_id}")
+                logger.error(f"[ERROR] Provider: {result.provider_name}, Model: {result.model_name}")
+                logger.error(f"[ERROR] Validation errors: {validation_errors}")
+                logger.error(f"[ERROR] Response text: {result.response_text}")
+                logger.error(f"[ERROR] Schema: {task.answer_schema}")
+                
+                # Later runs must not be served the same invalid answer from the cache
+                await self.provider_manager.discard_cached_response(
+                    result.provider_name, task.question_text, task.system_prompt, task.answer_schema
+                )
+                
+                invalid_result = WorkerResult(
+                    question_id=task.question_id,
+                    provider_name=result.provider_name,
+                    model_name=result.model_name,
+                    success=False,
+                    response_text=result.response_text,
+                    thinking=getattr(result, 'thinking', None),
+                    error_message="Schema validation failed",
+                    error_type="schema_validation",
+                    validation_errors=validation_errors,
+                    tokens_used=result.tokens_used,
+                    processing_time_ms=result.processing_time_ms
+                )
+                if self.response_batcher:
+                    await self.response_batcher.add_invalid_response(task, invalid_result)
+                else:
+                    await self._store_invalid_response(task, invalid_result)
+                return invalid_result
+        
+        # Store valid response
+        if self.response_batcher:
+            await self.response_batcher.add_valid_response(task, result)
+        else:
+            await self._store_valid_response(task, result)
+        
+        # Calculate processing time
+        if start_time is not None:
+            result.processing_time_ms = int((time.time() - start_time) * 1000)
+        
+        logger.info(f"Successfully processed question {task.question_id} with provider {result.provider_name}")
+        
+        return result
+    
     async def _validate_response(
         self, 
         response_text: Optional[str], 
@@ -242,7 +272,7 @@ class QuestionWorker:
             task: Original question task
             result: Processing result
         """
-        async with self.db_manager.async_session_scope() as session:
+        def store(session) -> None:
             response = Response(
                 question_id=task.question_id,
                 provider_name=result.provider_name,
@@ -253,9 +283,10 @@ class QuestionWorker:
                 processing_time_ms=result.processing_time_ms,
                 # Cost calculation would go here if implemented
             )
-            
             session.add(response)
-            # session.commit() is handled by the context manager
+
+        # Commit is handled by the session scope
+        await self.db_manager.run_sync(store)
     
     async def _store_invalid_response(self, task: QuestionTask, result: WorkerResult) -> None:
         """Store an invalid response in the database.
@@ -264,7 +295,7 @@ class QuestionWorker:
             task: Original question task
             result: Processing result with error details
         """
-        async with self.db_manager.async_session_scope() as session:
+        def store(session) -> None:
             invalid_response = InvalidResponse(
                 question_id=task.question_id,
                 provider_name=result.provider_name,
@@ -276,9 +307,10 @@ class QuestionWorker:
                 tokens_used=result.tokens_used,
                 processing_time_ms=result.processing_time_ms,
             )
-            
             session.add(invalid_response)
-            # session.commit() is handled by context manager
+
+        # Commit is handled by the session scope
+        await self.db_manager.run_sync(store)
     
     def get_worker_stats(self) -> dict:
         """Get worker statistics.
@@ -29,7 +29,7 @@ class TestCLICommands:
 
     def test_init_command(self, runner, test_db_manager):
         """Test database initialization command."""
-        with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
             result = runner.invoke(cli, ['init'])
             
             assert result.exit_code == 0
@@ -47,14 +47,26 @@ class TestCLICommands:
             errors=[]
         )
         
-        with patch('llm_distiller.cli.main.CSVImporter', return_value=mock_importer):
-            with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.importers.CSVImporter', return_value=mock_importer):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
                 result = runner.invoke(cli, ['import', sample_csv_file, '--type', 'csv'])
                 
                 assert result.exit_code == 0
                 assert f'Importing data from {sample_csv_file}' in result.output
                 assert 'Successfully imported 3 questions' in result.output
 
+    def test_import_data_disposes_async_engine(self, runner, test_db_manager, sample_csv_file):
+        """Test that the import command closes the async connection pool before exiting."""
+        mock_importer = Mock()
+        mock_importer.import_data = AsyncMock(side_effect=RuntimeError("boom"))
+        
+        with patch('llm_distiller.importers.CSVImporter', return_value=mock_importer):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
+                with patch.object(test_db_manager, 'dispose', new=AsyncMock()) as dispose:
+                    runner.invoke(cli, ['import', sample_csv_file, '--type', 'csv'])
+                    
+                    dispose.assert_awaited_once()
+
     def test_import_data_command_with_errors(self, runner, test_db_manager, sample_csv_file):
         """Test importing CSV data with errors."""
         mock_importer = Mock()
@@ -66,8 +78,8 @@ class TestCLICommands:
             errors=['Error 1', 'Error 2']
         )
         
-        with patch('llm_distiller.cli.main.CSVImporter', return_value=mock_importer):
-            with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.importers.CSVImporter', return_value=mock_importer):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
                 result = runner.invoke(cli, ['import', sample_csv_file, '--type', 'csv'])
                 
                 assert result.exit_code == 0
@@ -77,7 +89,7 @@ class TestCLICommands:
 
     def test_import_data_unsupported_type(self, runner, test_db_manager, sample_csv_file):
         """Test importing with unsupported file type."""
-        with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
             result = runner.invoke(cli, ['import', sample_csv_file, '--type', 'xml'])
             
             assert result.exit_code == 2
@@ -85,7 +97,7 @@ class TestCLICommands:
 
     def test_import_data_nonexistent_file(self, runner, test_db_manager):
         """Test importing non-existent file."""
-        with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
             result = runner.invoke(cli, ['import', 'nonexistent.csv', '--type', 'csv'])
             
             assert result.exit_code != 0  # Should fail
@@ -97,8 +109,8 @@ class TestCLICommands:
         
         output_file = str(temp_output_dir / "test.jsonl")
         
-        with patch('llm_distiller.cli.main.DatasetExporter', return_value=mock_exporter):
-            with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.exporters.DatasetExporter', return_value=mock_exporter):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
                 result = runner.invoke(cli, ['export', '--format', 'jsonl', '--output', output_file])
                 
                 assert result.exit_code == 0
@@ -113,8 +125,8 @@ class TestCLICommands:
         
         output_file = str(temp_output_dir / "test.csv")
         
-        with patch('llm_distiller.cli.main.DatasetExporter', return_value=mock_exporter):
-            with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.exporters.DatasetExporter', return_value=mock_exporter):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
                 result = runner.invoke(cli, ['export', '--format', 'csv', '--output', output_file, '--validated-only'])
                 
                 assert result.exit_code == 0
@@ -127,8 +139,8 @@ class TestCLICommands:
         mock_exporter = Mock()
         mock_exporter.export_json.return_value = 10
         
-        with patch('llm_distiller.cli.main.DatasetExporter', return_value=mock_exporter):
-            with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.exporters.DatasetExporter', return_value=mock_exporter):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
                 result = runner.invoke(cli, ['export', '--format', 'json'])
                 
                 assert result.exit_code == 0
@@ -141,8 +153,8 @@ class TestCLICommands:
         mock_exporter = Mock()
         mock_exporter.export_jsonl.side_effect = Exception("Export failed")
         
-        with patch('llm_distiller.cli.main.DatasetExporter', return_value=mock_exporter):
-            with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.exporters.DatasetExporter', return_value=mock_exporter):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
                 result = runner.invoke(cli, ['export', '--format', 'jsonl'])
                 
                 assert result.exit_code == 0
@@ -163,7 +175,7 @@ class TestCLICommands:
         validated_query.count.return_value = 6
         mock_session.query.return_value.filter.return_value = validated_query
         
-        with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
             with patch.object(test_db_manager, 'session_scope') as mock_session_scope:
                 mock_session_scope.return_value.__enter__.return_value = mock_session
                 
@@ -185,7 +197,7 @@ class TestCLICommands:
         mock_query.count.side_effect = [5, 0, 0]  # questions, responses, invalid_responses
         mock_session.query.return_value = mock_query
         
-        with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
             with patch.object(test_db_manager, 'session_scope') as mock_session_scope:
                 mock_session_scope.return_value.__enter__.return_value = mock_session
                 
@@ -215,8 +227,8 @@ class TestCLICommands:
         
         output_file = str(temp_output_dir / "training_data.jsonl")
         
-        with patch('llm_distiller.cli.main.DatasetExporter', return_value=mock_exporter):
-            with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.exporters.DatasetExporter', return_value=mock_exporter):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
                 result = runner.invoke(cli, ['export-training', '--output', output_file])
                 
                 assert result.exit_code == 0
@@ -231,8 +243,8 @@ class TestCLICommands:
         
         output_file = str(temp_output_dir / "validated_training.jsonl")
         
-        with patch('llm_distiller.cli.main.DatasetExporter', return_value=mock_exporter):
-            with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.exporters.DatasetExporter', return_value=mock_exporter):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
                 result = runner.invoke(cli, ['export-training', '--output', output_file, '--validated-only'])
                 
                 assert result.exit_code == 0
@@ -247,8 +259,8 @@ class TestCLICommands:
         
         output_file = str(temp_output_dir / "math_training.jsonl")
         
-        with patch('llm_distiller.cli.main.DatasetExporter', return_value=mock_exporter):
-            with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.exporters.DatasetExporter', return_value=mock_exporter):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
                 result = runner.invoke(cli, ['export-training', '--output', output_file, '--category', 'math'])
                 
                 assert result.exit_code == 0
@@ -261,8 +273,8 @@ class TestCLICommands:
         mock_exporter = Mock()
         mock_exporter.export_training_jsonl.return_value = 5
         
-        with patch('llm_distiller.cli.main.DatasetExporter', return_value=mock_exporter):
-            with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.exporters.DatasetExporter', return_value=mock_exporter):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
                 result = runner.invoke(cli, ['export-training'])
                 
                 assert result.exit_code == 0
@@ -275,8 +287,8 @@ class TestCLICommands:
         mock_exporter = Mock()
         mock_exporter.export_training_jsonl.side_effect = Exception("Training export failed")
         
-        with patch('llm_distiller.cli.main.DatasetExporter', return_value=mock_exporter):
-            with patch('llm_distiller.cli.main.DatabaseManager', return_value=test_db_manager):
+        with patch('llm_distiller.exporters.DatasetExporter', return_value=mock_exporter):
+            with patch('llm_distiller.database.DatabaseManager', return_value=test_db_manager):
                 result = runner.invoke(cli, ['export-training'])
                 
                 assert result.exit_code == 0
@@ -0,0 +1,176 @@
+"""Unit tests for batch API processing."""
+
+import json
+
+import pytest
+
+from llm_distiller.config import GenerationConfig
+from llm_distiller.config.settings import Settings
+from llm_distiller.database.manager import DatabaseManager
+from llm_distiller.database.models import InvalidResponse, Question, Response
+from llm_distiller.llm.base import build_messages
+from processing.batch import PENDING_BATCHES_FILE, BatchFileWriter, LocalBatchClient, parse_batch_result
+from processing.engine import ProcessingEngine
+from processing.models import QuestionTask
+
+
+def _task(question_id: int) -> QuestionTask:
+    return QuestionTask(
+        question_id=question_id,
+        category="math",
+        question_text=f"Question {question_id}",
+        golden_answer=None,
+        answer_schema=None,
+    )
+
+
+def _completion(content: str) -> dict:
+    return {
+        "model": "test-model",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": 3,
+            "completion_tokens": 4,
+            "total_tokens": 7,
+            "prompt_tokens_details": {"cached_tokens": 2},
+        },
+    }
+
+
+class TestBatchFiles:
+    """Test batch input files and result parsing."""
+
+    def test_writer_splits_files_at_request_limit(self, tmp_path):
+        """Test that requests are spread over files of at most max_requests lines."""
+        writer = BatchFileWriter(tmp_path, model="test-model", generation_config=GenerationConfig(), max_requests=2)
+        for question_id in range(1, 6):
+            writer.add(_task(question_id), build_messages(f"Question {question_id}", "Be brief."))
+        paths = writer.close()
+
+        assert [len(path.read_text().splitlines()) for path in paths] == [2, 2, 1]
+        request = json.loads(paths[0].read_text().splitlines()[0])
+        assert request["custom_id"] == "question-1"
+        assert request["url"] == "/v1/chat/completions"
+        assert request["body"]["model"] == "test-model"
+        assert request["body"]["messages"] == [
+            {"role": "system", "content": "Be brief."},
+            {"role": "user", "content": "Question 1"},
+        ]
+
+    def test_writers_do_not_share_files(self, tmp_path):
+        """Test that two writers started in the same second write separate files."""
+        first = BatchFileWriter(tmp_path, model="test-model", generation_config=GenerationConfig())
+        second = BatchFileWriter(tmp_path, model="test-model", generation_config=GenerationConfig())
+        first.add(_task(1), build_messages("Question 1"))
+        second.add(_task(2), build_messages("Question 2"))
+
+        paths = first.close() + second.close()
+
+        assert len(set(paths)) == 2
+        assert [json.loads(path.read_text())["custom_id"] for path in paths] == ["question-1", "question-2"]
+
+    def test_parse_successful_result(self):
+        """Test that a completed request becomes a successful WorkerResult."""
+        line = json.dumps({
+            "custom_id": "question-7",
+            "response": {"status_code": 200, "body": _completion("<think>hmm</think>4")},
+            "error": None,
+        })
+        question_id, result = parse_batch_result(line, "test_provider")
+
+        assert question_id == 7
+        assert result.success
+        assert result.response_text == "4"
+        assert result.thinking == "hmm"
+        assert result.tokens_used == 7
+        assert result.cached_tokens == 2
+
+    def test_parse_failed_result(self):
+        """Test that a failed request keeps its error and status."""
+        line = json.dumps({
+            "custom_id": "question-8",
+            "response": {"status_code": 429, "body": {"error": {"message": "Too many tokens"}}},
+            "error": None,
+        })
+        question_id, result = parse_batch_result(line, "test_provider")
+
+        assert question_id == 8
+        assert not result.success
+        assert result.error_type == "rate_limit"
+        assert result.error_message == "Too many tokens"
+
+
+@pytest.fixture
+def engine(test_db_manager: DatabaseManager, test_settings: Settings, tmp_path) -> ProcessingEngine:
+    """Engine writing batch files to a temporary directory, over four questions."""
+    test_db_manager.create_tables()
+    with test_db_manager.session_scope() as session:
+        for i in range(1, 5):
+            session.add(Question(
+                id=i,
+                category="math",
+                question_text=f"Question {i}",
+                answer_schema='{"type": "object", "required": ["answer"]}' if i == 4 else None,
+            ))
+    settings = test_settings.model_copy(deep=True)
+    settings.processing.batch_directory = str(tmp_path / "input")
+    settings.processing.batch_max_requests_per_file = 3
+    return ProcessingEngine(test_db_manager, settings)
+
+
+class TestBatchProcessing:
+    """Test a full batch run against the local batch client."""
+
+    @pytest.mark.asyncio
+    async def test_results_are_validated_and_stored(self, engine: ProcessingEngine, tmp_path):
+        """Test that batch results go through validation and the response batcher."""
+        def respond(body):
+            prompt = body["messages"][-1]["content"]
+            if prompt == "Question 2":
+                raise RuntimeError("model overloaded")
+            return _completion("not json" if prompt == "Question 4" else f"Answer to {prompt}")
+
+        client = LocalBatchClient(tmp_path / "output", respond)
+        result = await engine.process_questions_batch(client=client)
+
+        assert result.errors == []
+        assert len(client.batches) == 2
+        assert result.stats.total_questions == 4
+        assert result.stats.successful_responses == 2
+        assert result.stats.failed_responses == 2
+        assert result.stats.invalid_responses == 1
+        with engine.db_manager.session_scope() as session:
+            answers = {r.question_id: r.response_text for r in session.query(Response)}
+            errors = {r.question_id: r.error_type for r in session.query(InvalidResponse)}
+        assert answers == {1: "Answer to Question 1", 3: "Answer to Question 3"}
+        assert errors == {2: "general", 4: "schema_validation"}
+
+    @pytest.mark.asyncio
+    async def test_no_questions(self, engine: ProcessingEngine, tmp_path):
+        """Test that nothing is submitted when no questions match."""
+        client = LocalBatchClient(tmp_path / "output", lambda body: _completion("4"))
+        result = await engine.process_questions_batch(category="history", client=client)
+
+        assert client.batches == {}
+        assert "No questions found to process" in result.warnings
+
+    @pytest.mark.asyncio
+    async def test_interrupted_batches_are_resumed(self, engine: ProcessingEngine, tmp_path, monkeypatch):
+        """Test that batches submitted by an interrupted run are ingested without resubmitting."""
+        client = LocalBatchClient(tmp_path / "output", lambda body: _completion('{"answer": 4}'))
+
+        async def unreachable(batch_id):
+            raise ConnectionError("batch API unreachable")
+
+        monkeypatch.setattr(client, "retrieve", unreachable)
+        await engine.process_questions_batch(client=client)
+        state = json.loads((tmp_path / "input" / PENDING_BATCHES_FILE).read_text())
+        assert sorted(q for batch in state.values() for q in batch["question_ids"]) == [1, 2, 3, 4]
+
+        monkeypatch.undo()
+        result = await engine.process_questions_batch(client=client)
+
+        assert len(client.batches) == 2
+        assert result.stats.total_questions == 4
+        assert result.stats.successful_responses == 4
+        assert json.loads((tmp_path / "input" / PENDING_BATCHES_FILE).read_text()) == {}
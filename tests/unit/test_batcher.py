@@ -0,0 +1,229 @@
+"""Unit tests for the response batcher."""
+
+import asyncio
+import threading
+
+import pytest
+
+from llm_distiller.database.manager import DatabaseManager
+from llm_distiller.database.models import InvalidResponse, Question, Response
+from processing.batcher import ResponseBatcher
+from processing.models import QuestionTask, WorkerResult
+
+
+def _task(question_id: int) -> QuestionTask:
+    return QuestionTask(
+        question_id=question_id,
+        category="math",
+        question_text="What is 2+2?",
+        golden_answer="4",
+        answer_schema=None,
+    )
+
+
+def _result(question_id: int, success: bool = True) -> WorkerResult:
+    return WorkerResult(
+        question_id=question_id,
+        provider_name="test_provider",
+        model_name="test-model",
+        success=success,
+        response_text='{"answer": 4}',
+        error_message=None if success else "Schema validation failed",
+        error_type=None if success else "schema_validation",
+        tokens_used=10,
+    )
+
+
+@pytest.fixture
+def db_manager(test_db_manager: DatabaseManager) -> DatabaseManager:
+    """In-memory database with a few questions."""
+    test_db_manager.create_tables()
+    with test_db_manager.session_scope() as session:
+        for i in range(1, 6):
+            session.add(Question(id=i, category="math", question_text=f"Question {i}"))
+    return test_db_manager
+
+
+class TestResponseBatcher:
+    """Test ResponseBatcher writes."""
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_written(self, db_manager: DatabaseManager):
+        """Test a full batch reaches the database without an explicit flush."""
+        batcher = ResponseBatcher(db_manager, batch_size=2)
+
+        await batcher.add_valid_response(_task(1), _result(1))
+        await batcher.add_valid_response(_task(2), _result(2))
+        await batcher._write_queue.join()
+
+        with db_manager.session_scope() as session:
+            assert session.query(Response).count() == 2
+        assert batcher.get_stats()["total_pending"] == 0
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_partial_batches(self, db_manager: DatabaseManager):
+        """Test close writes valid and invalid leftovers."""
+        batcher = ResponseBatcher(db_manager, batch_size=100)
+
+        await batcher.add_valid_response(_task(1), _result(1))
+        await batcher.add_invalid_response(_task(2), _result(2, success=False))
+        await batcher.close()
+
+        with db_manager.session_scope() as session:
+            assert session.query(Response).count() == 1
+            assert session.query(InvalidResponse).count() == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_run_off_the_event_loop(self, db_manager: DatabaseManager):
+        """Test batches are written on the dedicated writer thread."""
+        batcher = ResponseBatcher(db_manager, batch_size=1)
+        writer_threads = []
+
+        def record_thread(session, batch):
+            writer_threads.append(threading.current_thread().name)
+
+        await batcher._submit(record_thread, [(_task(1), _result(1))], rows=1)
+        await batcher.close()
+
+        assert writer_threads and writer_threads[0].startswith("response-writer")
+
+    @pytest.mark.asyncio
+    async def test_async_driver_writes_use_the_writer_thread(self, temp_output_dir):
+        """Test that an async-capable database is still written on the writer thread."""
+        db_manager = DatabaseManager(f"sqlite:///{temp_output_dir / 'test.db'}")
+        db_manager.create_tables()
+        assert db_manager.supports_async is True
+        batcher = ResponseBatcher(db_manager, batch_size=1)
+        writer_threads = []
+
+        def record_thread(session, batch):
+            writer_threads.append(threading.current_thread().name)
+
+        await batcher._submit(record_thread, [(_task(1), _result(1))], rows=1)
+        await batcher.close()
+        await db_manager.dispose()
+
+        assert writer_threads and writer_threads[0].startswith("response-writer")
+
+    @pytest.mark.asyncio
+    async def test_shared_in_memory_connection(self, db_manager: DatabaseManager):
+        """Test that reads on other threads and the writer can share the in-memory connection."""
+        batcher = ResponseBatcher(db_manager, batch_size=1)
+
+        def count_responses(session):
+            return session.query(Response).count()
+
+        for i in range(1, 6):
+            await batcher.add_valid_response(_task(i), _result(i))
+            await db_manager.run_sync(count_responses)
+        await batcher.close()
+
+        assert await db_manager.run_sync(count_responses) == 5
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue_applies_backpressure(self, db_manager: DatabaseManager):
+        """Test producers wait only once the writer is max_pending_batches behind."""
+        batcher = ResponseBatcher(db_manager, batch_size=1, max_pending_batches=1)
+        release = threading.Event()
+
+        def blocked_write(session, batch):
+            release.wait(timeout=5)
+
+        batch = [(_task(1), _result(1))]
+        await batcher._submit(blocked_write, batch, rows=1)  # taken by the writer
+        await asyncio.sleep(0.05)
+        await batcher._submit(blocked_write, batch, rows=1)  # fills the queue
+
+        third = asyncio.create_task(batcher._submit(blocked_write, batch, rows=1))
+        await asyncio.sleep(0.05)
+        assert not third.done()
+
+        release.set()
+        await asyncio.wait_for(third, timeout=5)
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_write_errors_surface_on_flush(self, db_manager: DatabaseManager):
+        """Test a failed write is reported by the next flush."""
+        batcher = ResponseBatcher(db_manager, batch_size=1)
+
+        def failing_write(session, batch):
+            raise RuntimeError("disk full")
+
+        await batcher._submit(failing_write, [(_task(1), _result(1))], rows=1)
+
+        with pytest.raises(RuntimeError, match="disk full"):
+            await batcher.flush_all()
+        assert batcher.get_stats()["failed_batches"] == 1
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_question_provider_is_skipped(self, db_manager: DatabaseManager):
+        """Test a second response for the same question/provider does not fail the batch."""
+        batcher = ResponseBatcher(db_manager, batch_size=100)
+
+        await batcher.add_valid_response(_task(1), _result(1))
+        await batcher.flush_all()
+        await batcher.add_valid_response(_task(1), _result(1))
+        await batcher.add_valid_response(_task(2), _result(2))
+        await batcher.close()
+
+        with db_manager.session_scope() as session:
+            stored = session.query(Response).order_by(Response.question_id).all()
+            assert [r.question_id for r in stored] == [1, 2]
+            assert all(r.created_at is not None for r in stored)
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_interval(self, db_manager: DatabaseManager):
+        """Test a partial batch is committed once it reaches the flush interval."""
+        batcher = ResponseBatcher(db_manager, batch_size=100, flush_interval_ms=50)
+
+        await batcher.add_valid_response(_task(1), _result(1))
+        await asyncio.sleep(0.2)
+        await batcher._write_queue.join()
+
+        with db_manager.session_scope() as session:
+            assert session.query(Response).count() == 1
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_pending_bytes(self, db_manager: DatabaseManager):
+        """Test a partial batch is committed once its text reaches max_bytes."""
+        batcher = ResponseBatcher(db_manager, batch_size=100, max_bytes=20)
+
+        await batcher.add_valid_response(_task(1), _result(1))
+        assert batcher.get_stats()["total_pending"] == 1
+        await batcher.add_valid_response(_task(2), _result(2))
+
+        assert batcher.get_stats()["total_pending"] == 0
+        await batcher.close()
+
+
+class TestAdaptiveBatchSize:
+    """Test batch size adaptation to commit latency."""
+
+    def test_fast_full_commit_grows_batch(self, test_db_manager: DatabaseManager):
+        """Test fast commits of full batches double the batch size up to the maximum."""
+        batcher = ResponseBatcher(test_db_manager, batch_size=100, max_batch_size=150, target_commit_ms=100)
+
+        batcher._adapt_batch_size(commit_ms=10, rows=100)
+
+        assert batcher.batch_size == 150
+
+    def test_fast_partial_commit_keeps_batch(self, test_db_manager: DatabaseManager):
+        """Test fast commits of partial batches leave the batch size alone."""
+        batcher = ResponseBatcher(test_db_manager, batch_size=100, max_batch_size=1000, target_commit_ms=100)
+
+        batcher._adapt_batch_size(commit_ms=10, rows=5)
+
+        assert batcher.batch_size == 100
+
+    def test_slow_commit_shrinks_batch(self, test_db_manager: DatabaseManager):
+        """Test slow commits halve the batch size down to the minimum."""
+        batcher = ResponseBatcher(test_db_manager, batch_size=100, min_batch_size=80, target_commit_ms=100)
+
+        batcher._adapt_batch_size(commit_ms=500, rows=100)
+
+        assert batcher.batch_size == 80
+        assert batcher.get_stats()["last_commit_ms"] == 500
@@ -0,0 +1,188 @@
+"""Unit tests for the response cache."""
+
+import pytest
+
+from llm_distiller.config import GenerationConfig, ProcessingConfig, ProviderConfig, ResponseCacheConfig, Settings
+from llm_distiller.llm.base import ParsedResponse, build_messages
+from processing import cache as cache_module
+from processing.cache import ResponseCache, cache_key
+from processing.manager import LLMProviderManager
+
+
+def _response(content: str = "4") -> ParsedResponse:
+    return ParsedResponse(content=content, tokens_used=12, model="test-model", thinking="2+2")
+
+
+class TestCacheKey:
+    """Test request hashing."""
+
+    def test_key_covers_model_messages_and_params(self):
+        """Test that every part of the request changes the key."""
+        messages = build_messages("What is 2+2?", "Be brief.")
+        key = cache_key("model-a", messages, GenerationConfig(temperature=0))
+
+        assert key == cache_key("model-a", build_messages("What is 2+2?", "Be brief."), GenerationConfig(temperature=0))
+        assert key != cache_key("model-b", messages, GenerationConfig(temperature=0))
+        assert key != cache_key("model-a", build_messages("What is 2+3?", "Be brief."), GenerationConfig(temperature=0))
+        assert key != cache_key("model-a", messages, GenerationConfig(temperature=0, max_tokens=10))
+
+    def test_key_covers_answer_schema(self):
+        """Test that the same question with another or no answer schema gets its own key."""
+        messages = build_messages("What is 2+2?")
+        key = cache_key("model-a", messages, GenerationConfig(), '{"type": "object"}')
+
+        assert key != cache_key("model-a", messages, GenerationConfig())
+        assert key != cache_key("model-a", messages, GenerationConfig(), '{"type": "array"}')
+
+
+class TestResponseCache:
+    """Test storage, expiry and eviction."""
+
+    def test_round_trip_persists(self, tmp_path):
+        """Test that a stored response survives reopening the cache."""
+        path = str(tmp_path / "cache.sqlite")
+        cache = ResponseCache(path)
+        cache.put("k", _response())
+        cache.close()
+
+        cache = ResponseCache(path)
+        cached = cache.get("k")
+        assert (cached.content, cached.thinking, cached.tokens_used) == ("4", "2+2", 12)
+        assert cache.get("other") is None
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+        assert cache.get_stats()["entries"] == 1
+        cache.close()
+
+    def test_delete_removes_entry(self, tmp_path):
+        """Test that a deleted response is no longer served."""
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+        cache.put("k", _response())
+
+        cache.delete("k")
+        cache.delete("missing")
+
+        assert cache.get("k") is None
+        assert cache.get_stats()["entries"] == 0
+        assert cache.get_stats()["size_bytes"] == 0
+        cache.close()
+
+    def test_expired_entries_miss(self, tmp_path, monkeypatch):
+        """Test that entries older than the TTL are dropped."""
+        now = [1000.0]
+        monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60)
+        cache.put("k", _response())
+
+        now[0] += 30
+        assert cache.get("k") is not None
+        now[0] += 60
+        assert cache.get("k") is None
+        assert cache.get_stats()["entries"] == 0
+        cache.close()
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path, monkeypatch):
+        """Test that exceeding the size limit removes the least recently used entries."""
+        now = [1000.0]
+        monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=30)
+        for key in ("a", "b", "c"):
+            now[0] += 1
+            cache.put(key, ParsedResponse(content="x" * 10, model="test-model"))
+        now[0] += 1
+        cache.get("a")
+
+        now[0] += 1
+        cache.put("d", ParsedResponse(content="x" * 10, model="test-model"))
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is None
+        assert cache.get("d") is not None
+        assert cache.get_stats()["evictions"] == 2
+        cache.close()
+
+
+def _manager(tmp_path, temperature: float, nondeterministic: bool = False) -> LLMProviderManager:
+    settings = Settings(
+        llm_providers={"p": ProviderConfig(type="openai", api_key="test-key", model="test-model")},
+        processing=ProcessingConfig(
+            generation_params=GenerationConfig(temperature=temperature),
+            response_cache=ResponseCacheConfig(
+                enabled=True,
+                path=str(tmp_path / "cache.sqlite"),
+                cache_nondeterministic=nondeterministic,
+            ),
+        ),
+    )
+    return LLMProviderManager(settings)
+
+
+class TestManagerCache:
+    """Test the cache in front of the provider manager."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("temperature, nondeterministic, expected_calls", [
+        (0.0, False, 1),
+        (0.7, False, 2),
+        (0.7, True, 1),
+    ])
+    async def test_repeated_requests(self, tmp_path, temperature, nondeterministic, expected_calls):
+        """Test that only cacheable requests are answered from the cache."""
+        manager = _manager(tmp_path, temperature, nondeterministic)
+        calls = []
+
+        async def generate(prompt, generation_config, guard=None, answer_schema=None):
+            calls.append(prompt)
+            return _response()
+
+        manager.providers["p"].generate_response = generate
+
+        first = await manager.generate_response_with_failover("Q", preferred_provider="p", system_prompt="S")
+        second = await manager.generate_response_with_failover("Q", preferred_provider="p", system_prompt="S")
+
+        assert len(calls) == expected_calls
+        assert second.response_text == first.response_text == "4"
+        assert second.from_cache == (expected_calls == 1)
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_retry_skips_lookup_and_refreshes_entry(self, tmp_path):
+        """Test that a retried request calls the provider and replaces the cached answer."""
+        manager = _manager(tmp_path, 0.0)
+        answers = iter(["bad", "good"])
+
+        async def generate(prompt, generation_config, guard=None, answer_schema=None):
+            return _response(next(answers))
+
+        manager.providers["p"].generate_response = generate
+
+        first = await manager.generate_response_with_failover("Q", preferred_provider="p")
+        retry = await manager.generate_response_with_failover("Q", preferred_provider="p", use_cache=False)
+        later = await manager.generate_response_with_failover("Q", preferred_provider="p")
+
+        assert (first.response_text, retry.response_text, later.response_text) == ("bad", "good", "good")
+        assert not retry.from_cache
+        assert later.from_cache
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_discarded_response_is_regenerated(self, tmp_path):
+        """Test that a response removed after failing validation is not served again."""
+        manager = _manager(tmp_path, 0.0)
+        calls = []
+
+        async def generate(prompt, generation_config, guard=None, answer_schema=None):
+            calls.append(prompt)
+            return _response()
+
+        manager.providers["p"].generate_response = generate
+        schema = '{"type": "object"}'
+
+        first = await manager.generate_response_with_failover("Q", preferred_provider="p", answer_schema=schema)
+        await manager.discard_cached_response(first.provider_name, "Q", answer_schema=schema)
+        second = await manager.generate_response_with_failover("Q", preferred_provider="p", answer_schema=schema)
+
+        assert len(calls) == 2
+        assert not second.from_cache
+        await manager.close()
@@ -0,0 +1,144 @@
+"""Unit tests for the provider circuit breaker."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from llm_distiller.config import ProcessingConfig, ProviderConfig, Settings
+from llm_distiller.llm.base import ParsedResponse
+from processing.circuit_breaker import BreakerState, CircuitBreaker
+from processing.manager import LLMProviderManager
+
+
+def _trip(breaker: CircuitBreaker, now: float = 0.0) -> None:
+    for _ in range(breaker.min_calls):
+        ticket = breaker.allow_request(now)
+        assert ticket
+        breaker.record(False, 10.0, now, ticket)
+
+
+class TestCircuitBreaker:
+    """Test state transitions."""
+
+    def test_opens_on_failure_rate(self):
+        """Test that the breaker opens once the failure rate reaches the threshold."""
+        breaker = CircuitBreaker(failure_rate_threshold=0.5, min_calls=4)
+        for success in (True, False, True):
+            breaker.record(success, 10.0, 0.0)
+        assert breaker.state == BreakerState.CLOSED
+        breaker.record(False, 10.0, 0.0)
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow_request(1.0)
+
+    def test_slow_calls_count_as_failures(self):
+        """Test the latency threshold."""
+        breaker = CircuitBreaker(min_calls=2, slow_call_ms=1000)
+        breaker.record(True, 5000.0, 0.0)
+        breaker.record(True, 5000.0, 0.0)
+        assert breaker.state == BreakerState.OPEN
+
+    def test_half_open_allows_single_probe(self):
+        """Test that only one probe is let through after the open period."""
+        breaker = CircuitBreaker(min_calls=1, open_seconds=10.0)
+        _trip(breaker)
+        assert breaker.retry_after(4.0) == pytest.approx(6.0)
+        assert not breaker.allow_request(5.0)
+        assert breaker.allow_request(10.0)
+        assert breaker.state == BreakerState.HALF_OPEN
+        assert not breaker.allow_request(10.0)
+
+    def test_successful_probe_closes(self):
+        """Test that a successful probe closes the breaker."""
+        breaker = CircuitBreaker(min_calls=1, open_seconds=10.0)
+        _trip(breaker)
+        ticket = breaker.allow_request(10.0)
+        breaker.record(True, 10.0, 10.0, ticket)
+        assert breaker.state == BreakerState.CLOSED
+        assert breaker.failure_rate == 0.0
+
+    def test_failed_probe_reopens(self):
+        """Test that a failed probe opens the breaker for another period."""
+        breaker = CircuitBreaker(min_calls=1, open_seconds=10.0)
+        _trip(breaker)
+        ticket = breaker.allow_request(10.0)
+        breaker.record(False, 10.0, 10.0, ticket)
+        assert breaker.state == BreakerState.OPEN
+        assert breaker.times_opened == 2
+        assert not breaker.allow_request(15.0)
+
+    def test_release_frees_probe_slot(self):
+        """Test that a probe without an outcome lets the next request probe."""
+        breaker = CircuitBreaker(min_calls=1, open_seconds=10.0)
+        _trip(breaker)
+        ticket = breaker.allow_request(10.0)
+        breaker.release(ticket)
+        assert breaker.allow_request(10.0)
+
+    def test_late_outcome_is_not_taken_for_the_probe(self):
+        """Test that a call admitted before the breaker opened cannot close or reopen it."""
+        breaker = CircuitBreaker(min_calls=1, open_seconds=10.0)
+        late = breaker.allow_request(0.0)
+        _trip(breaker)
+        probe = breaker.allow_request(10.0)
+
+        breaker.record(True, 10.0, 10.0, late)
+        breaker.release(late)
+        assert breaker.state == BreakerState.HALF_OPEN
+        assert not breaker.allow_request(10.0)
+
+        breaker.record(True, 10.0, 10.0, probe)
+        assert breaker.state == BreakerState.CLOSED
+        breaker.record(False, 10.0, 10.0, late)
+        assert breaker.failure_rate == 0.0
+
+
+class TestManagerCircuitBreaker:
+    """Test that the provider manager skips providers with open breakers."""
+
+    @pytest.fixture
+    def manager(self):
+        settings = Settings(
+            llm_providers={
+                "broken": ProviderConfig(type="openai", api_key="test-key"),
+                "healthy": ProviderConfig(type="openai", api_key="test-key"),
+            },
+            processing=ProcessingConfig(
+                failover_strategy="all",
+                circuit_breaker_min_calls=2,
+                circuit_breaker_open_seconds=60.0,
+            ),
+        )
+        manager = LLMProviderManager(settings)
+        manager.providers["broken"].generate_response = AsyncMock(
+            side_effect=Exception("OpenAI API error: Connection error.")
+        )
+        manager.providers["healthy"].generate_response = AsyncMock(
+            return_value=ParsedResponse(content="42", tokens_used=5, model="test-model")
+        )
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_open_provider_is_skipped(self, manager):
+        """Test that failing providers stop being tried once their breaker opens."""
+        for _ in range(4):
+            result = await manager.generate_response_with_failover(
+                "What is 6 x 7?", preferred_provider="broken"
+            )
+            assert result.success
+            assert result.provider_name == "healthy"
+        assert manager.providers["broken"].generate_response.await_count == 2
+        stats = manager.get_provider_stats()
+        assert stats["broken"]["circuit_breaker"]["state"] == "open"
+        assert stats["healthy"]["circuit_breaker"]["state"] == "closed"
+
+    @pytest.mark.asyncio
+    async def test_all_open_fails_fast_with_retry_after(self, manager):
+        """Test the result when every candidate provider is open."""
+        manager.settings.processing.failover_strategy = "none"
+        for _ in range(2):
+            await manager.generate_response_with_failover("Q", preferred_provider="broken")
+        result = await manager.generate_response_with_failover("Q", preferred_provider="broken")
+        assert not result.success
+        assert result.error_type == "circuit_open"
+        assert 0 < result.retry_after_seconds <= 60.0
+        assert manager.providers["broken"].generate_response.await_count == 2
@@ -0,0 +1,49 @@
+"""Start-up imports of the command line interface."""
+
+import subprocess
+import sys
+
+HEAVY_MODULES = ("pydantic", "sqlalchemy", "pandas", "openai", "httpx")
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+
+
+def _imported_modules(importtime_output: str) -> dict:
+    """Cumulative import time in microseconds per module from ``-X importtime`` output."""
+    modules = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestCLIStartup:
+    """Test that the CLI starts without loading its subsystems."""
+
+    def test_import_skips_heavy_modules(self):
+        """Test that importing the CLI does not load the heavy subsystems."""
+        modules = _imported_modules(_run("import llm_distiller.cli.main").stderr)
+
+        assert "llm_distiller.cli.main" in modules
+        assert not [name for name in modules if name.split(".")[0] in HEAVY_MODULES]
+
+    def test_command_help_does_not_load_settings(self):
+        """Test that --help of a command neither loads settings nor opens the database."""
+        code = (
+            "import sys\n"
+            "from llm_distiller.cli.main import cli\n"
+            "try:\n"
+            "    cli(['process', '--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print(sorted(m for m in ('pydantic', 'sqlalchemy') if m in sys.modules))\n"
+        )
+        result = _run(code)
+
+        assert "Process questions with LLM." in result.stdout
+        assert result.stdout.strip().endswith("[]")
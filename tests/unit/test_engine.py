@@ -0,0 +1,170 @@
+"""Unit tests for the processing engine."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from llm_distiller.config.settings import Settings
+from llm_distiller.database.manager import DatabaseManager
+from llm_distiller.database.models import InvalidResponse, Question, Response
+from processing.engine import ProcessingEngine
+from processing.models import WorkerResult
+
+
+@pytest.fixture
+def engine(test_db_manager: DatabaseManager, test_settings: Settings) -> ProcessingEngine:
+    """Engine over an in-memory database with ten questions, two of them answered."""
+    test_db_manager.create_tables()
+    with test_db_manager.session_scope() as session:
+        for i in range(1, 11):
+            session.add(Question(
+                id=i,
+                category="math" if i % 2 else "science",
+                question_text=f"Question {i}",
+            ))
+        for question_id in (3, 4):
+            session.add(Response(
+                question_id=question_id,
+                provider_name="test_provider",
+                model_name="test-model",
+                response_text="answer",
+            ))
+    return ProcessingEngine(test_db_manager, test_settings)
+
+
+async def _collect(pages) -> list:
+    return [[q["id"] for q in page] async for page in pages]
+
+
+class TestQuestionLoading:
+    """Test streaming question loading."""
+
+    @pytest.mark.asyncio
+    async def test_pages_skip_answered_questions(self, engine: ProcessingEngine):
+        """Test keyset pages cover all unanswered questions in id order."""
+        pages = await _collect(engine._iter_question_pages(None, None, page_size=3))
+
+        assert pages == [[1, 2, 5], [6, 7, 8], [9, 10]]
+
+    @pytest.mark.asyncio
+    async def test_pages_respect_limit(self, engine: ProcessingEngine):
+        """Test the limit caps the number of streamed questions."""
+        pages = await _collect(engine._iter_question_pages(None, 4, page_size=3))
+
+        assert pages == [[1, 2, 5], [6]]
+
+    @pytest.mark.asyncio
+    async def test_pages_filter_category(self, engine: ProcessingEngine):
+        """Test the category filter is applied to every page."""
+        pages = await _collect(engine._iter_question_pages("science", None, page_size=2))
+
+        assert pages == [[2, 6], [8, 10]]
+
+    @pytest.mark.asyncio
+    async def test_no_questions(self, engine: ProcessingEngine):
+        """Test an empty result warns without starting workers."""
+        result = await engine.process_questions(category="history")
+
+        assert result.stats.total_questions == 0
+        assert "No questions found to process" in result.warnings
+
+
+class TestProcessQuestions:
+    """Test a full processing run against a stubbed provider manager."""
+
+    @pytest.mark.asyncio
+    async def test_processes_all_streamed_questions(self, engine: ProcessingEngine):
+        """Test every unanswered question is processed and stored."""
+        async def generate(prompt, **kwargs):
+            return WorkerResult(
+                question_id=0,
+                provider_name="test_provider",
+                model_name="test-model",
+                success=True,
+                response_text="answer",
+                tokens_used=5,
+            )
+
+        engine.provider_manager.generate_response_with_failover = AsyncMock(side_effect=generate)
+
+        result = await engine.process_questions()
+
+        assert result.errors == []
+        assert result.stats.total_questions == 8
+        assert result.stats.successful_responses == 8
+        with engine.db_manager.session_scope() as session:
+            assert session.query(Response).count() == 10
+
+    @pytest.mark.asyncio
+    async def test_failed_questions_are_retried(self, engine: ProcessingEngine):
+        """Test a failed attempt is re-queued and the run waits for the retry."""
+        attempts = {}
+
+        async def generate(prompt, **kwargs):
+            attempts[prompt] = attempts.get(prompt, 0) + 1
+            failed = prompt == "Question 1" and attempts[prompt] == 1
+            return WorkerResult(
+                question_id=0,
+                provider_name="test_provider",
+                model_name="test-model",
+                success=not failed,
+                response_text="answer",
+                error_type="timeout" if failed else None,
+            )
+
+        engine.provider_manager.generate_response_with_failover = AsyncMock(side_effect=generate)
+        engine.retry_scheduler.base_delay = 0.01
+
+        result = await engine.process_questions()
+
+        assert attempts["Question 1"] == 2
+        assert result.stats.successful_responses == 8
+        with engine.db_manager.session_scope() as session:
+            assert session.query(Response).count() == 10
+
+    @pytest.mark.asyncio
+    async def test_saturated_questions_are_requeued_without_a_retry(self, engine: ProcessingEngine):
+        """Test a question that was never sent is requeued without an invalid row or a used retry."""
+        attempts = {}
+
+        async def generate(prompt, **kwargs):
+            attempts[prompt] = attempts.get(prompt, 0) + 1
+            saturated = prompt == "Question 1" and attempts[prompt] <= 3
+            return WorkerResult(
+                question_id=0,
+                provider_name="test_provider",
+                model_name="test-model" if not saturated else "unknown",
+                success=not saturated,
+                response_text=None if saturated else "answer",
+                error_type="saturated" if saturated else None,
+            )
+
+        engine.provider_manager.generate_response_with_failover = AsyncMock(side_effect=generate)
+
+        result = await engine.process_questions()
+
+        assert attempts["Question 1"] == 4
+        assert result.stats.successful_responses == 8
+        assert result.stats.failed_responses == 0
+        with engine.db_manager.session_scope() as session:
+            assert session.query(InvalidResponse).count() == 0
+            assert session.query(Response).count() == 10
+
+
+class TestPrefixGrouping:
+    """Test grouping of tasks that share a system prompt."""
+
+    def test_tasks_grouped_by_system_prompt(self, engine: ProcessingEngine):
+        """Test that tasks with the same system prompt are made adjacent."""
+        engine.settings = engine.settings.model_copy(deep=True)
+        engine.settings.processing.prefix_affinity = True
+        questions = [
+            {"id": i, "category": "math", "question_text": f"Question {i}", "golden_answer": None,
+             "answer_schema": None, "system_prompt": prompt}
+            for i, prompt in enumerate(["A", None, "B", "A", None, "B"], start=1)
+        ]
+
+        tasks = engine._make_tasks(questions, None, "default", None)
+
+        assert [task.question_id for task in tasks] == [1, 4, 2, 5, 3, 6]
+        assert [task.system_prompt for task in tasks] == ["A", "A", "default", "default", "B", "B"]
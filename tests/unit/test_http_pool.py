@@ -0,0 +1,67 @@
+"""Unit tests for shared provider HTTP clients."""
+
+import pytest
+
+from llm_distiller.config import ProcessingConfig, ProviderConfig, Settings
+from llm_distiller.llm.http_pool import HTTPClientPool
+from processing.manager import LLMProviderManager
+
+
+class TestHTTPClientPool:
+    """Test client sharing and configuration."""
+
+    @pytest.mark.asyncio
+    async def test_same_endpoint_shares_client(self):
+        """Test that providers on one base_url reuse a single client."""
+        pool = HTTPClientPool(timeout_seconds=30, connect_timeout_seconds=5)
+        first = pool.client_for("http://localhost:8000/v1/")
+        second = pool.client_for("http://localhost:8000/v1")
+        other = pool.client_for("http://gpu-box:8000/v1")
+        assert first is second
+        assert first is not other
+        await pool.aclose()
+        assert first.is_closed and other.is_closed
+
+    @pytest.mark.asyncio
+    async def test_timeouts_from_config(self):
+        """Test that connect and read timeouts are applied."""
+        pool = HTTPClientPool(timeout_seconds=30, connect_timeout_seconds=5)
+        client = pool.client_for("")
+        assert client.timeout.connect == 5
+        assert client.timeout.read == 30
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_http2_without_h2_falls_back(self):
+        """Test that HTTP/2 degrades to HTTP/1.1 when h2 is missing."""
+        try:
+            import h2  # noqa: F401
+            pytest.skip("h2 is installed")
+        except ImportError:
+            pass
+        pool = HTTPClientPool(timeout_seconds=30, connect_timeout_seconds=5)
+        assert pool.client_for("https://api.example.com/v1", http2=True) is not None
+        await pool.aclose()
+
+
+class TestManagerHTTPClients:
+    """Test that the provider manager sizes and shares HTTP clients."""
+
+    @pytest.mark.asyncio
+    async def test_providers_share_pool_sized_to_concurrency(self):
+        """Test that same-endpoint providers share one client sized to their slots."""
+        settings = Settings(
+            llm_providers={
+                "a": ProviderConfig(type="openai", api_key="k", base_url="http://gpu:8000/v1", max_concurrency=3),
+                "b": ProviderConfig(type="openai", api_key="k", base_url="http://gpu:8000/v1", max_concurrency=2),
+                "c": ProviderConfig(type="openai", api_key="k", base_url="http://other:8000/v1"),
+            },
+            processing=ProcessingConfig(batch_size=8, timeout_seconds=45),
+        )
+        manager = LLMProviderManager(settings)
+        clients = {name: provider.client._client for name, provider in manager.providers.items()}
+        assert clients["a"] is clients["b"]
+        assert clients["a"] is not clients["c"]
+        assert manager._connection_limits == {("http://gpu:8000/v1", False): 5, ("http://other:8000/v1", False): 8}
+        assert clients["c"].timeout.read == 45
+        await manager.close()
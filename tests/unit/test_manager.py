@@ -0,0 +1,346 @@
+"""Unit tests for the LLM provider manager."""
+
+import asyncio
+
+import pytest
+
+from llm_distiller.config import ProcessingConfig, ProviderConfig, Settings
+from llm_distiller.llm.base import ParsedResponse, ProviderError
+from processing.circuit_breaker import BreakerState
+from processing.manager import LLMProviderManager, ProviderSaturatedError
+
+
+class _GatedProvider:
+    """Stand-in generate_response that blocks until released."""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.active = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, prompt, generation_config, guard=None, answer_schema=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await self.release.wait()
+            return ParsedResponse(content=self.content, tokens_used=1, model="test-model")
+        finally:
+            self.active -= 1
+
+
+def _manager(strategy: str, small_concurrency: int = 1) -> LLMProviderManager:
+    settings = Settings(
+        llm_providers={
+            "small": ProviderConfig(type="openai", api_key="test-key", max_concurrency=small_concurrency),
+            "big": ProviderConfig(type="openai", api_key="test-key"),
+        },
+        processing=ProcessingConfig(failover_strategy=strategy),
+    )
+    return LLMProviderManager(settings)
+
+
+class TestConcurrencyLimits:
+    """Test per-provider max_concurrency."""
+
+    @pytest.mark.asyncio
+    async def test_saturated_provider_fails_over_to_free_one(self):
+        """Test that requests beyond a provider's slots go to a provider with room."""
+        manager = _manager("all")
+        small, big = _GatedProvider("small"), _GatedProvider("big")
+        manager.providers["small"].generate_response = small
+        manager.providers["big"].generate_response = big
+
+        first = asyncio.create_task(manager.generate_response_with_failover("Q1", preferred_provider="small"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(manager.generate_response_with_failover("Q2", preferred_provider="small"))
+        await asyncio.sleep(0)
+        small.release.set()
+        big.release.set()
+
+        results = await asyncio.gather(first, second)
+        assert [r.provider_name for r in results] == ["small", "big"]
+        assert small.peak == 1
+
+    @pytest.mark.asyncio
+    async def test_pinned_provider_waits_for_slot(self):
+        """Test that without failover requests queue on the provider's slots."""
+        manager = _manager("none", small_concurrency=2)
+        small = _GatedProvider("small")
+        manager.providers["small"].generate_response = small
+
+        tasks = [
+            asyncio.create_task(manager.generate_response_with_failover(f"Q{i}", preferred_provider="small"))
+            for i in range(5)
+        ]
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert small.active == 2
+        small.release.set()
+
+        results = await asyncio.gather(*tasks)
+        assert all(r.success for r in results)
+        assert small.peak == 2
+        assert manager.get_provider_stats()["small"]["max_concurrency"] == 2
+
+
+class TestConcurrencyWait:
+    """Test the bounded wait for a concurrency slot."""
+
+    @pytest.mark.asyncio
+    async def test_slot_wait_times_out(self):
+        """Test that a provider without a free slot in time raises a saturation error."""
+        manager = _manager("none")
+        manager.settings.processing.concurrency_wait_seconds = 0.01
+        await manager.concurrency_limits["small"].acquire()
+
+        with pytest.raises(ProviderSaturatedError):
+            await manager._call_provider("small", [{"role": "user", "content": "Q"}], bounded_wait=True)
+        assert manager.router.get_stats("small")["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_saturated_provider_fails_over(self, monkeypatch):
+        """Test that a request queued on a full provider moves on to the next one."""
+        manager = _manager("rate_limit_only")
+        manager.settings.processing.concurrency_wait_seconds = 0.01
+        big = _GatedProvider("big")
+        big.release.set()
+        manager.providers["big"].generate_response = big
+        await manager.concurrency_limits["small"].acquire()
+        # The provider filled up after the try order was decided
+        monkeypatch.setattr(manager, "_is_saturated", lambda name: False)
+
+        result = await manager.generate_response_with_failover("Q", preferred_provider="small")
+
+        assert result.success
+        assert result.provider_name == "big"
+
+    @pytest.mark.asyncio
+    async def test_only_candidate_waits_for_a_slot(self):
+        """Test that without a provider to fail over to, requests queue instead of failing."""
+        manager = _manager("none", small_concurrency=2)
+        manager.settings.processing.concurrency_wait_seconds = 0.01
+        small = _DelayedProvider("ok", 0.05)
+        manager.providers["small"].generate_response = small
+
+        results = await asyncio.gather(*(
+            manager.generate_response_with_failover(f"Q{i}", preferred_provider="small") for i in range(6)
+        ))
+
+        assert all(result.success for result in results)
+        assert small.calls == 6
+
+
+class _DelayedProvider:
+    """Stand-in generate_response that answers after a fixed delay."""
+
+    def __init__(self, content: str, delay: float):
+        self.content = content
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self, prompt, generation_config, guard=None, answer_schema=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return ParsedResponse(content=self.content, tokens_used=1, model="test-model")
+
+
+def _hedging_manager(budget: float = 1.0) -> LLMProviderManager:
+    settings = Settings(
+        llm_providers={
+            "slow": ProviderConfig(type="openai", api_key="test-key"),
+            "fast": ProviderConfig(type="openai", api_key="test-key"),
+        },
+        processing=ProcessingConfig(
+            failover_strategy="all",
+            hedge_requests=True,
+            hedge_budget=budget,
+            hedge_min_samples=5,
+        ),
+    )
+    manager = LLMProviderManager(settings)
+    # Observed p95 of 10ms for the slow provider
+    manager.router._load("slow").samples.extend([10.0] * 100)
+    return manager
+
+
+class TestHedgedRequests:
+    """Test hedging of requests that run past the latency percentile."""
+
+    @pytest.mark.asyncio
+    async def test_straggler_is_hedged_and_loser_cancelled(self):
+        """Test that the hedge answers and the original request is cancelled."""
+        manager = _hedging_manager()
+        slow, fast = _DelayedProvider("slow", 5.0), _DelayedProvider("fast", 0.0)
+        manager.providers["slow"].generate_response = slow
+        manager.providers["fast"].generate_response = fast
+
+        result = await manager.generate_response_with_failover("Q", preferred_provider="slow")
+
+        assert result.success
+        assert result.provider_name == "fast"
+        assert slow.cancelled == 1
+        assert manager.get_hedge_stats() == {"eligible_requests": 1, "hedges_sent": 1, "hedges_won": 1}
+        assert manager.router.loads["slow"].in_flight == 0
+        assert manager.router.loads["slow"].failures == 0
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self):
+        """Test that requests finishing before the percentile are left alone."""
+        manager = _hedging_manager()
+        slow, fast = _DelayedProvider("slow", 0.0), _DelayedProvider("fast", 0.0)
+        manager.providers["slow"].generate_response = slow
+        manager.providers["fast"].generate_response = fast
+
+        result = await manager.generate_response_with_failover("Q", preferred_provider="slow")
+
+        assert result.provider_name == "slow"
+        assert fast.calls == 0
+        assert manager.hedges_sent == 0
+
+    @pytest.mark.asyncio
+    async def test_budget_limits_hedges(self):
+        """Test that no more than the budgeted fraction of requests is hedged."""
+        manager = _hedging_manager(budget=0.5)
+        slow, fast = _DelayedProvider("slow", 0.05), _DelayedProvider("fast", 0.0)
+        manager.providers["slow"].generate_response = slow
+        manager.providers["fast"].generate_response = fast
+
+        for _ in range(4):
+            await manager.generate_response_with_failover("Q", preferred_provider="slow")
+
+        assert manager.hedges_sent == 2
+        assert fast.calls == 2
+
+
+    @pytest.mark.asyncio
+    async def test_time_queued_for_a_slot_is_not_hedged(self):
+        """Test that the hedge delay starts only once the request holds its slot."""
+        manager = _hedging_manager()
+        manager.concurrency_limits["slow"] = asyncio.Semaphore(1)
+        slow, fast = _DelayedProvider("slow", 0.0), _DelayedProvider("fast", 0.0)
+        manager.providers["slow"].generate_response = slow
+        manager.providers["fast"].generate_response = fast
+        await manager.concurrency_limits["slow"].acquire()
+        # Queued far longer than the 10ms p95, then answers at once
+        asyncio.get_running_loop().call_later(0.1, manager.concurrency_limits["slow"].release)
+
+        answered_by, _ = await manager._generate_with_hedging("slow", [{"role": "user", "content": "Q"}], ["slow", "fast"])
+
+        assert answered_by == "slow"
+        assert fast.calls == 0
+        assert manager.hedges_sent == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_hedging_gives_back_the_probe(self):
+        """Test that a probe that never reached the provider does not keep its breaker half-open."""
+        manager = _hedging_manager()
+        breaker = manager.circuit_breakers["slow"]
+        breaker._open(0.0)
+        ticket = breaker.allow_request(breaker.open_seconds)
+
+        async def never_sent(*args, **kwargs):
+            raise RuntimeError("failed before the breaker saw the request")
+
+        manager._call_provider = never_sent
+        with pytest.raises(RuntimeError):
+            await manager._generate_with_hedging(
+                "slow", [{"role": "user", "content": "Q"}], ["slow", "fast"], ticket=ticket
+            )
+
+        assert breaker.state == BreakerState.HALF_OPEN
+        assert breaker.allow_request(breaker.open_seconds)
+
+
+class TestMessages:
+    """Test the messages sent to providers."""
+
+    @pytest.mark.asyncio
+    async def test_system_prompt_sent_as_system_message(self):
+        """Test that the system prompt is a separate, unchanged message."""
+        manager = _manager("none")
+        sent = []
+
+        async def generate(prompt, generation_config, guard=None, answer_schema=None):
+            sent.append(prompt)
+            return ParsedResponse(content="4", tokens_used=12, model="test-model", metadata={"cached_tokens": 8})
+
+        manager.providers["big"].generate_response = generate
+
+        result = await manager.generate_response_with_failover(
+            "What is 2+2?", preferred_provider="big", system_prompt="You are a calculator."
+        )
+
+        assert sent == [[
+            {"role": "system", "content": "You are a calculator."},
+            {"role": "user", "content": "What is 2+2?"},
+        ]]
+        assert result.cached_tokens == 8
+
+
+class TestSingleFlight:
+    """Test sharing of identical in-flight requests."""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_call(self):
+        """Test that concurrent identical requests make one provider call and get separate results."""
+        manager = _manager("none", small_concurrency=5)
+        manager.settings.processing.deduplicate_requests = True
+        small = _GatedProvider("small")
+        manager.providers["small"].generate_response = small
+
+        tasks = [
+            asyncio.create_task(manager.generate_response_with_failover("Q", preferred_provider="small"))
+            for _ in range(3)
+        ]
+        other = asyncio.create_task(manager.generate_response_with_failover("Other", preferred_provider="small"))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert small.active == 2
+        small.release.set()
+
+        results = await asyncio.gather(*tasks)
+        await other
+        assert [r.deduplicated for r in results] == [False, True, True]
+        assert len({id(r) for r in results}) == 3
+        assert all(r.response_text == "small" for r in results)
+        assert manager.get_deduplication_stats() == {"deduplicated_requests": 2, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        """Test that the call keeps running while another request still waits for it."""
+        manager = _manager("none")
+        manager.settings.processing.deduplicate_requests = True
+        small = _GatedProvider("small")
+        manager.providers["small"].generate_response = small
+
+        first = asyncio.create_task(manager.generate_response_with_failover("Q", preferred_provider="small"))
+        second = asyncio.create_task(manager.generate_response_with_failover("Q", preferred_provider="small"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        small.release.set()
+
+        result = await second
+        assert first.cancelled()
+        assert result.success
+
+
+class TestErrorClassification:
+    """Test classification of provider errors."""
+
+    @pytest.mark.parametrize("error, expected", [
+        (ProviderError("Error code: 429", status_code=429), "rate_limit"),
+        (ProviderError("quota exhausted", status_code=429), "rate_limit"),
+        (ProviderError("Error code: 401", status_code=401), "auth"),
+        (ProviderError("Rate limit exceeded"), "rate_limit"),
+        (ProviderError("Bad request", status_code=400), "general"),
+    ])
+    def test_status_code_takes_precedence(self, error, expected):
+        """Test that the HTTP status is used before the message text."""
+        assert _manager("none")._classify_error(error) == expected
@@ -0,0 +1,263 @@
+"""Unit tests for multi-prompt batched completions."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from llm_distiller.config import BatchingConfig, GenerationConfig, ProcessingConfig, ProviderConfig, Settings
+from llm_distiller.llm.base import BaseLLMProvider, ParsedResponse, ProviderError, build_messages
+from llm_distiller.llm.openai_provider import OpenAIProvider
+from llm_distiller.llm.registry import ProviderRegistry
+from llm_distiller.utils.rate_limiter import estimate_tokens
+from processing.manager import LLMProviderManager
+from processing.microbatch import PromptBatcher
+
+
+class _RecordingSend:
+    """Stand-in send function that answers each prompt with its own user message."""
+
+    def __init__(self, error: Exception = None, drop: int = 0):
+        self.batches = []
+        self.error = error
+        self.drop = drop
+
+    async def __call__(self, prompts, generation_config=None):
+        self.batches.append(prompts)
+        if self.error:
+            raise self.error
+        answered = prompts[:len(prompts) - self.drop]
+        return [ParsedResponse(content=prompt[-1]["content"], model="test-model") for prompt in answered]
+
+
+class TestPromptBatcher:
+    """Test coalescing of concurrent prompts."""
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_immediately(self):
+        """Test that a batch is sent as soon as it reaches max_batch_size."""
+        send = _RecordingSend()
+        batcher = PromptBatcher(send, max_batch_size=3, max_wait_ms=10000)
+
+        results = await asyncio.gather(*(batcher.submit(build_messages(f"Q{i}")) for i in range(6)))
+
+        assert [r.content for r in results] == [f"Q{i}" for i in range(6)]
+        assert [len(batch) for batch in send.batches] == [3, 3]
+        assert batcher.get_stats()["average_batch_size"] == 3
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_is_sent_after_wait(self):
+        """Test that an unfilled batch is sent once max_wait_ms has passed."""
+        send = _RecordingSend()
+        batcher = PromptBatcher(send, max_batch_size=8, max_wait_ms=1)
+
+        results = await asyncio.gather(batcher.submit(build_messages("A")), batcher.submit(build_messages("B")))
+
+        assert [r.content for r in results] == ["A", "B"]
+        assert [len(batch) for batch in send.batches] == [2]
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_caller(self):
+        """Test that a failed request fails every prompt in the batch."""
+        batcher = PromptBatcher(_RecordingSend(error=ProviderError("overloaded")), max_batch_size=2)
+
+        results = await asyncio.gather(
+            batcher.submit(build_messages("A")), batcher.submit(build_messages("B")), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ProviderError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_missing_responses_fail_remaining_callers(self):
+        """Test that prompts without a response get an error instead of waiting forever."""
+        batcher = PromptBatcher(_RecordingSend(drop=1), max_batch_size=2)
+
+        results = await asyncio.gather(
+            batcher.submit(build_messages("A")), batcher.submit(build_messages("B")), return_exceptions=True
+        )
+
+        assert results[0].content == "A"
+        assert isinstance(results[1], ProviderError)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_send_releases_callers(self):
+        """Test that cancelling an in-flight batch cancels every caller waiting on it."""
+        started = asyncio.Event()
+
+        async def send(prompts):
+            started.set()
+            await asyncio.sleep(10)
+
+        batcher = PromptBatcher(send, max_batch_size=2)
+        callers = [asyncio.create_task(batcher.submit(build_messages(q))) for q in ("A", "B")]
+        await started.wait()
+        for task in list(batcher._sending):
+            task.cancel()
+
+        results = await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), timeout=1)
+
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_is_left_out(self):
+        """Test that a prompt whose caller gave up is not sent."""
+        send = _RecordingSend()
+        batcher = PromptBatcher(send, max_batch_size=8, max_wait_ms=1)
+
+        abandoned = asyncio.create_task(batcher.submit(build_messages("A")))
+        kept = asyncio.create_task(batcher.submit(build_messages("B")))
+        await asyncio.sleep(0)
+        abandoned.cancel()
+
+        assert (await kept).content == "B"
+        assert [[prompt[-1]["content"] for prompt in batch] for batch in send.batches] == [["B"]]
+
+
+def _batching_provider(choices, total_tokens=10, template=None) -> OpenAIProvider:
+    config = ProviderConfig(
+        type="openai",
+        api_key="test-key",
+        batching=BatchingConfig(enabled=True, prompt_template=template),
+    )
+    provider = OpenAIProvider(config)
+    response = SimpleNamespace(
+        model="test-model",
+        choices=[SimpleNamespace(index=i, text=text, finish_reason="stop") for i, text in choices],
+        usage=SimpleNamespace(total_tokens=total_tokens),
+    )
+    raw_response = SimpleNamespace(headers={}, parse=lambda: response)
+    provider.client.completions.with_raw_response.create = AsyncMock(return_value=raw_response)
+    return provider
+
+
+class TestOpenAIGenerateBatch:
+    """Test multi-prompt requests to the completions endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_choices_are_matched_to_prompts(self):
+        """Test that out-of-order choices are returned in prompt order with split usage."""
+        provider = _batching_provider([(1, "<think>hm</think>B"), (0, "A"), (2, "C")])
+        prompts = [build_messages("a", "Be brief."), build_messages("b"), build_messages("c")]
+
+        responses = await provider.generate_batch(prompts, GenerationConfig())
+
+        assert [r.content for r in responses] == ["A", "B", "C"]
+        assert responses[1].thinking == "hm"
+        assert [r.tokens_used for r in responses] == [4, 3, 3]
+        assert responses[0].metadata["batch_size"] == 3
+        kwargs = provider.client.completions.with_raw_response.create.await_args.kwargs
+        assert kwargs["prompt"] == ["Be brief.\n\na", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_prompt_template(self):
+        """Test that prompts are rendered with the configured template."""
+        provider = _batching_provider([(0, "A")], template="<s>{system_prompt}</s> Q: {prompt} A:")
+
+        await provider.generate_batch([build_messages("a", "Sys")], GenerationConfig())
+
+        kwargs = provider.client.completions.with_raw_response.create.await_args.kwargs
+        assert kwargs["prompt"] == ["<s>Sys</s> Q: a A:"]
+
+    @pytest.mark.asyncio
+    async def test_missing_choices_fail(self):
+        """Test that a response without a choice per prompt is rejected."""
+        provider = _batching_provider([(0, "A")])
+
+        with pytest.raises(ProviderError, match="1 choices for 2 prompts"):
+            await provider.generate_batch([build_messages("a"), build_messages("b")], GenerationConfig())
+
+
+class TestManagerBatching:
+    """Test batching of manager requests."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_completion(self):
+        """Test that concurrent questions to a batching provider go out as one request."""
+        settings = Settings(
+            llm_providers={"p": ProviderConfig(
+                type="openai",
+                api_key="test-key",
+                batching=BatchingConfig(enabled=True, max_batch_size=3, max_wait_ms=1000),
+            )},
+            processing=ProcessingConfig(failover_strategy="none"),
+        )
+        manager = LLMProviderManager(settings)
+        manager.get_provider("p")  # providers and their batchers are created on first use
+        send = _RecordingSend()
+        manager.prompt_batchers["p"].send = send
+
+        results = await asyncio.gather(*(
+            manager.generate_response_with_failover(f"Q{i}", preferred_provider="p") for i in range(3)
+        ))
+
+        assert [r.response_text for r in results] == ["Q0", "Q1", "Q2"]
+        assert all(r.success for r in results)
+        assert len(send.batches) == 1
+        assert manager.get_provider_stats()["p"]["batching"]["prompts_sent"] == 3
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_batch_is_charged_once(self):
+        """Test that a batch takes one rate limit slot and one breaker outcome for all its prompts."""
+        settings = Settings(
+            llm_providers={"p": ProviderConfig(
+                type="openai",
+                api_key="test-key",
+                batching=BatchingConfig(enabled=True, max_batch_size=3, max_wait_ms=1000),
+            )},
+            processing=ProcessingConfig(failover_strategy="none"),
+        )
+        manager = LLMProviderManager(settings)
+        provider = manager.get_provider("p")
+        provider.generate_batch = _RecordingSend()
+        acquire = AsyncMock(return_value=False)
+        manager.rate_limiters["p"].acquire = acquire
+
+        results = await asyncio.gather(*(
+            manager.generate_response_with_failover(f"Q{i}", preferred_provider="p") for i in range(3)
+        ))
+
+        assert all(r.success for r in results)
+        max_tokens = settings.processing.generation_params.max_tokens
+        assert acquire.await_count == 1
+        assert acquire.await_args.args[0] == sum(estimate_tokens(f"Q{i}", max_tokens) for i in range(3))
+        assert manager.circuit_breakers["p"].get_stats()["window_calls"] == 1
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_questions_with_a_schema_are_not_batched(self):
+        """Test that structured output requests take the normal chat path."""
+        settings = Settings(
+            llm_providers={"p": ProviderConfig(
+                type="openai",
+                api_key="test-key",
+                structured_output="json_schema",
+                batching=BatchingConfig(enabled=True),
+            )},
+            processing=ProcessingConfig(failover_strategy="none"),
+        )
+        manager = LLMProviderManager(settings)
+        provider = manager.get_provider("p")
+        provider.generate_batch = _RecordingSend()
+        provider.generate_response = AsyncMock(return_value=ParsedResponse(content="{}", model="test-model"))
+
+        result = await manager.generate_response_with_failover("Q", preferred_provider="p", answer_schema="{}")
+
+        assert result.success
+        assert provider.generate_batch.batches == []
+        assert provider.generate_response.await_args.kwargs["answer_schema"] == "{}"
+        await manager.close()
+
+    def test_provider_without_batch_support_is_rejected(self):
+        """Test that batching on a provider type without generate_batch fails at setup."""
+        class _SingleProvider(OpenAIProvider):
+            generate_batch = BaseLLMProvider.generate_batch
+
+        settings = Settings(llm_providers={"p": ProviderConfig(
+            type="single", api_key="test-key", batching=BatchingConfig(enabled=True),
+        )})
+
+        manager = LLMProviderManager(settings, ProviderRegistry(builtins={"single": _SingleProvider}))
+
+        assert "p" not in manager.providers
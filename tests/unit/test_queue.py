@@ -0,0 +1,149 @@
+"""Unit tests for the question queue."""
+
+import asyncio
+
+import pytest
+
+from processing.models import QuestionTask
+from processing.queue import QuestionQueue
+
+
+def _task(question_id: int, max_retries: int = 3) -> QuestionTask:
+    return QuestionTask(
+        question_id=question_id,
+        category="math",
+        question_text=f"Question {question_id}",
+        golden_answer=None,
+        answer_schema=None,
+        max_retries=max_retries,
+    )
+
+
+class TestBoundedQueue:
+    """Test bounded queue backpressure."""
+
+    @pytest.mark.asyncio
+    async def test_producer_waits_when_full(self):
+        """Test adding blocks at maxsize and resumes once a task is taken."""
+        queue = QuestionQueue(maxsize=2)
+        await queue.add_tasks([_task(1), _task(2)])
+
+        producer = asyncio.create_task(queue.add_task(_task(3)))
+        await asyncio.sleep(0.01)
+        assert not producer.done()
+
+        await queue.get_next_task()
+        await asyncio.wait_for(producer, timeout=1)
+        assert (await queue.get_stats())["pending"] == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_bypass_bound(self):
+        """Test a retry is re-queued even when the queue is full."""
+        queue = QuestionQueue(maxsize=1)
+        await queue.add_task(_task(1))
+        task = await queue.get_next_task()
+        await queue.mark_completed(task.question_id, success=False)
+        await queue.add_task(_task(2))
+
+        assert await asyncio.wait_for(queue.retry_task(1), timeout=1) is True
+        assert (await queue.get_stats())["pending"] == 2
+
+
+    @pytest.mark.asyncio
+    async def test_requeue_keeps_retry_count(self):
+        """Test a requeued task goes back in line without using a retry."""
+        queue = QuestionQueue()
+        await queue.add_task(_task(1))
+        task = await queue.get_next_task()
+
+        await queue.requeue(task.question_id)
+
+        assert (await queue.get_next_task()).retry_count == 0
+        assert (await queue.get_stats())["processing"] == 1
+
+class TestEviction:
+    """Test eviction of finished tasks."""
+
+    @pytest.mark.asyncio
+    async def test_completed_tasks_are_counted_not_kept(self):
+        """Test completed tasks leave only counters behind."""
+        queue = QuestionQueue(evict_finished=True)
+        await queue.add_tasks([_task(1), _task(2)])
+        for _ in range(2):
+            task = await queue.get_next_task()
+            await queue.mark_completed(task.question_id, success=True)
+
+        stats = await queue.get_stats()
+        assert stats["completed"] == 2
+        assert stats["total"] == 2
+        assert await queue.get_task(1) is None
+
+    @pytest.mark.asyncio
+    async def test_exhausted_failures_keep_only_ids(self):
+        """Test tasks out of retries are dropped but still counted as failed."""
+        queue = QuestionQueue(evict_finished=True)
+        await queue.add_task(_task(1, max_retries=0))
+        task = await queue.get_next_task()
+        await queue.mark_completed(task.question_id, success=False)
+
+        assert await queue.retry_task(1) is False
+
+        stats = await queue.get_stats()
+        assert stats["failed"] == 1
+        assert stats["total"] == 1
+        assert await queue.get_failed_tasks() == []
+
+    @pytest.mark.asyncio
+    async def test_tasks_kept_without_eviction(self):
+        """Test the default queue keeps completed tasks."""
+        queue = QuestionQueue()
+        await queue.add_task(_task(1))
+        task = await queue.get_next_task()
+        await queue.mark_completed(task.question_id, success=True)
+
+        assert (await queue.get_task(1)) is task
+        assert (await queue.get_stats())["completed"] == 1
+
+
+class TestCompletionSignalling:
+    """Test event-driven completion and shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_join_waits_for_retries(self):
+        """Test join only returns once failed tasks are retried to completion."""
+        queue = QuestionQueue()
+        await queue.add_task(_task(1, max_retries=1))
+
+        joined = asyncio.create_task(queue.join())
+        task = await queue.get_next_task()
+        await queue.mark_completed(task.question_id, success=False)
+        await queue.retry_task(task.question_id)
+        await asyncio.sleep(0.01)
+        assert not joined.done()
+
+        task = await queue.get_next_task()
+        await queue.mark_completed(task.question_id, success=True)
+        await asyncio.wait_for(joined, timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_join_returns_after_final_failure(self):
+        """Test a failure without retries left counts as finished."""
+        queue = QuestionQueue()
+        await queue.add_task(_task(1, max_retries=0))
+
+        task = await queue.get_next_task()
+        await queue.mark_completed(task.question_id, success=False)
+
+        await asyncio.wait_for(queue.join(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_shutdown_wakes_idle_workers(self):
+        """Test blocked workers receive None after shutdown."""
+        queue = QuestionQueue()
+        waiters = [asyncio.create_task(queue.get_next_task()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert not any(w.done() for w in waiters)
+
+        await queue.shutdown(3)
+
+        assert await asyncio.wait_for(asyncio.gather(*waiters), timeout=1) == [None, None, None]
@@ -0,0 +1,158 @@
+"""Unit tests for the token-bucket rate limiter."""
+
+import pytest
+
+from llm_distiller.config import RateLimitConfig
+from llm_distiller.utils.rate_limiter import (
+    RateLimiter,
+    TokenBucket,
+    estimate_tokens,
+    parse_retry_after,
+)
+
+
+def _limiter(**limits) -> RateLimiter:
+    return RateLimiter(RateLimitConfig(**limits), "test")
+
+
+class TestTokenBucket:
+    """Test token bucket refill and accounting."""
+
+    def test_refills_over_time(self):
+        """Test that a drained bucket refills at capacity / period."""
+        bucket = TokenBucket(60, 60)
+        bucket.consume(60)
+        start = bucket.updated_at
+        assert bucket.time_until(1, start) == pytest.approx(1.0)
+        assert bucket.time_until(1, start + 1.0) == 0.0
+
+    def test_adjust_never_exceeds_capacity(self):
+        """Test that refunds are capped at capacity."""
+        bucket = TokenBucket(10, 60)
+        bucket.adjust(100)
+        assert bucket.tokens == 10
+
+    def test_requests_larger_than_capacity_are_capped(self):
+        """Test that an oversized request waits for a full bucket, not forever."""
+        bucket = TokenBucket(10, 60)
+        assert bucket.time_until(1000, bucket.updated_at) == 0.0
+
+
+class TestRateLimiter:
+    """Test request and token budgets."""
+
+    def test_estimate_tokens_includes_completion_budget(self):
+        """Test that the estimate covers the prompt and max_tokens."""
+        assert estimate_tokens("x" * 400, 100) == 201
+
+    @pytest.mark.asyncio
+    async def test_acquire_within_budget_does_not_wait(self):
+        """Test that requests under the limits are admitted immediately."""
+        limiter = _limiter(requests_per_minute=60, tokens_per_minute=1000)
+        assert await limiter.acquire(100, timeout=0)
+        assert limiter.calculate_wait_time(100) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_request_budget_exhausted(self):
+        """Test that acquire gives up when the request bucket is empty."""
+        limiter = _limiter(requests_per_minute=2)
+        assert await limiter.acquire(timeout=0)
+        assert await limiter.acquire(timeout=0)
+        assert not await limiter.acquire(timeout=0)
+        assert limiter.calculate_wait_time() == pytest.approx(30.0, rel=0.01)
+
+    @pytest.mark.asyncio
+    async def test_token_budget_exhausted(self):
+        """Test that acquire waits on the token bucket, not just requests."""
+        limiter = _limiter(requests_per_minute=1000, tokens_per_minute=1000)
+        assert await limiter.acquire(900, timeout=0)
+        assert not await limiter.acquire(200, timeout=0)
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_refill(self):
+        """Test that acquire sleeps until capacity is available."""
+        limiter = _limiter(requests_per_minute=6000)
+        limiter.minute_requests.consume(6000)
+        assert await limiter.acquire(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_reconcile_refunds_overestimate(self):
+        """Test that unused estimated tokens are returned to the bucket."""
+        limiter = _limiter(tokens_per_minute=1000)
+        await limiter.acquire(900)
+        limiter.reconcile(900, 100)
+        assert await limiter.acquire(500, timeout=0)
+
+    @pytest.mark.asyncio
+    async def test_reconcile_charges_underestimate(self):
+        """Test that usage above the estimate is charged as debt."""
+        limiter = _limiter(tokens_per_minute=1000)
+        await limiter.acquire(100)
+        limiter.reconcile(100, 1000)
+        assert not await limiter.acquire(1, timeout=0)
+
+
+class TestAdaptiveLimits:
+    """Test limits driven by provider headers and 429 responses."""
+
+    def test_parse_retry_after(self):
+        """Test that retry-after-ms takes precedence over retry-after."""
+        assert parse_retry_after({"retry-after": "2"}) == 2.0
+        assert parse_retry_after({"retry-after": "2", "retry-after-ms": "500"}) == 0.5
+        assert parse_retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) is None
+        assert parse_retry_after(None) is None
+
+    def test_headers_replace_configured_limits(self):
+        """Test that reported limits resize the per-minute buckets."""
+        limiter = _limiter(adaptive=True, requests_per_minute=60, tokens_per_minute=1000)
+        limiter.update_from_response({
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-limit-tokens": "90000",
+        })
+        stats = limiter.get_stats()
+        assert stats["effective_requests_per_minute"] == 500
+        assert stats["effective_tokens_per_minute"] == 90000
+
+    def test_remaining_caps_available_capacity(self):
+        """Test that the remaining headers only ever lower the balance."""
+        limiter = _limiter(adaptive=True, requests_per_minute=60, tokens_per_minute=1000)
+        limiter.update_from_response({
+            "x-ratelimit-remaining-requests": "3",
+            "x-ratelimit-remaining-tokens": "5000",
+        })
+        stats = limiter.get_stats()
+        assert stats["available_requests_minute"] == pytest.approx(3, abs=0.01)
+        assert stats["available_tokens_minute"] == pytest.approx(1000)
+
+    def test_rate_limited_halves_limits_and_blocks(self):
+        """Test multiplicative decrease and the retry-after pause."""
+        limiter = _limiter(adaptive=True, requests_per_minute=100, tokens_per_minute=10000)
+        retry_after = limiter.on_rate_limited({"retry-after": "5"})
+        assert retry_after == 5.0
+        assert limiter.minute_requests.capacity == 50
+        assert limiter.minute_tokens.capacity == 5000
+        assert limiter.calculate_wait_time() == pytest.approx(5.0, abs=0.1)
+
+    def test_success_recovers_limits_up_to_ceiling(self):
+        """Test additive increase stops at the configured limits."""
+        limiter = _limiter(adaptive=True, requests_per_minute=100)
+        limiter.on_rate_limited()
+        limiter.update_from_response({})
+        assert limiter.minute_requests.capacity == pytest.approx(51)
+        for _ in range(200):
+            limiter.update_from_response({})
+        assert limiter.minute_requests.capacity == 100
+
+    def test_adaptive_max_scale_allows_growth(self):
+        """Test that limits may grow past the configuration when allowed."""
+        limiter = _limiter(adaptive=True, requests_per_minute=10, adaptive_max_scale=2.0)
+        for _ in range(100):
+            limiter.update_from_response({})
+        assert limiter.minute_requests.capacity == 20
+
+    def test_disabled_adaptive_keeps_configured_limits(self):
+        """Test that limiters are not adaptive by default and ignore headers and 429s."""
+        limiter = _limiter(requests_per_minute=60)
+        limiter.update_from_response({"x-ratelimit-limit-requests": "500"})
+        assert limiter.on_rate_limited({"retry-after": "3"}) == 3.0
+        assert limiter.minute_requests.capacity == 60
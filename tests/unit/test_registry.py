@@ -0,0 +1,96 @@
+"""Unit tests for the provider registry and lazy provider creation."""
+
+import subprocess
+import sys
+
+import pytest
+
+from llm_distiller.config import ProviderConfig, Settings
+from llm_distiller.llm.base import ParsedResponse
+from llm_distiller.llm.openai_provider import OpenAIProvider
+from llm_distiller.llm.registry import ProviderRegistry
+from processing.manager import LLMProviderManager
+
+
+class _EchoProvider:
+    """Provider stand-in that counts how often it is created."""
+
+    created = 0
+
+    def __init__(self, config, http_client=None):
+        type(self).created += 1
+        self.config = config
+        self.model_name = config.model
+
+    async def generate_response(self, prompt, generation_config, guard=None, answer_schema=None):
+        return ParsedResponse(content="echo", model=self.model_name)
+
+
+class TestProviderRegistry:
+    """Test lookup of provider implementations."""
+
+    def test_reference_is_imported_on_first_lookup(self):
+        """Test that a module:Class reference resolves to the class."""
+        registry = ProviderRegistry(builtins={"openai": "llm_distiller.llm.openai_provider:OpenAIProvider"})
+
+        assert "openai" in registry
+        assert registry.get("openai") is OpenAIProvider
+
+    def test_unknown_type(self):
+        """Test that an unregistered type is rejected."""
+        registry = ProviderRegistry(builtins={}, group="llm_distiller.tests.none")
+
+        assert "missing" not in registry
+        with pytest.raises(ValueError, match="Unknown provider type: missing"):
+            registry.get("missing")
+
+    def test_provider_sdk_is_not_imported_with_the_manager(self):
+        """Test that importing the processing engine does not load the openai SDK."""
+        code = "import sys, processing.engine; print('openai' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+        assert output.strip() == "False"
+
+
+class TestLazyProviders:
+    """Test that providers are created on first use."""
+
+    def _manager(self) -> LLMProviderManager:
+        _EchoProvider.created = 0
+        registry = ProviderRegistry(builtins={"echo": _EchoProvider})
+        settings = Settings(llm_providers={
+            "a": ProviderConfig(type="echo", model="model-a"),
+            "b": ProviderConfig(type="echo", model="model-b"),
+            "broken": ProviderConfig(type="unknown"),
+        })
+        return LLMProviderManager(settings, registry=registry)
+
+    @pytest.mark.asyncio
+    async def test_only_the_pinned_provider_is_created(self):
+        """Test that a pinned run instantiates only the provider it uses."""
+        manager = self._manager()
+
+        assert manager.get_available_providers() == ["a", "b"]
+        assert _EchoProvider.created == 0
+
+        result = await manager.generate_response_with_failover("Q", preferred_provider="b", failover_strategy="none")
+
+        assert result.response_text == "echo"
+        assert _EchoProvider.created == 1
+        stats = manager.get_provider_stats()
+        assert (stats["a"]["loaded"], stats["a"]["model"]) == (False, "model-a")
+        assert stats["b"]["loaded"] is True
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_initialization_falls_over(self):
+        """Test that a provider failing on first use is dropped and the next one is tried."""
+        manager = self._manager()
+        manager.providers.declare("a", ProviderConfig(type="missing"))
+
+        result = await manager.generate_response_with_failover("Q", preferred_provider="a", failover_strategy="all")
+
+        assert result.success
+        assert result.provider_name == "b"
+        assert "a" not in manager.providers
+        await manager.close()
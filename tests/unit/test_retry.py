@@ -0,0 +1,95 @@
+"""Unit tests for the retry scheduler."""
+
+import asyncio
+
+import pytest
+
+from processing.models import QuestionTask
+from processing.queue import QuestionQueue
+from processing.retry import RetryScheduler
+
+
+async def _failed_queue(*question_ids: int) -> QuestionQueue:
+    queue = QuestionQueue()
+    for question_id in question_ids:
+        await queue.add_task(QuestionTask(
+            question_id=question_id,
+            category="math",
+            question_text=f"Question {question_id}",
+            golden_answer=None,
+            answer_schema=None,
+        ))
+    for _ in question_ids:
+        task = await queue.get_next_task()
+        await queue.mark_completed(task.question_id, success=False)
+    return queue
+
+
+class TestComputeDelay:
+    """Test per-error-type backoff delays."""
+
+    def test_rate_limit_uses_retry_after(self):
+        """Test rate limits wait for the provider's retry-after period."""
+        scheduler = RetryScheduler(QuestionQueue())
+
+        assert scheduler.compute_delay("rate_limit", 0, retry_after=30) == 30
+
+    def test_circuit_open_waits_for_probe(self):
+        """Test open circuits wait until the breaker lets a probe through."""
+        scheduler = RetryScheduler(QuestionQueue())
+
+        assert scheduler.compute_delay("circuit_open", 0, retry_after=12.5) == 12.5
+
+    def test_schema_validation_retries_immediately(self):
+        """Test content failures are retried without delay."""
+        scheduler = RetryScheduler(QuestionQueue())
+
+        assert scheduler.compute_delay("schema_validation", 2) == 0.0
+
+    def test_stream_aborted_backs_off(self):
+        """Test aborted streams are not retried at once, since they tend to abort again."""
+        scheduler = RetryScheduler(QuestionQueue(), base_delay=1.0, max_delay=60.0)
+
+        assert 2.0 <= scheduler.compute_delay("stream_aborted", 2) <= 4.0
+
+    def test_timeout_backs_off_exponentially_with_jitter(self):
+        """Test timeouts back off exponentially within the jitter range."""
+        scheduler = RetryScheduler(QuestionQueue(), base_delay=1.0, max_delay=60.0)
+
+        for retry_count, full_delay in ((0, 1.0), (2, 4.0), (10, 60.0)):
+            delay = scheduler.compute_delay("timeout", retry_count)
+            assert full_delay / 2 <= delay <= full_delay
+
+
+class TestScheduling:
+    """Test delayed re-queueing."""
+
+    @pytest.mark.asyncio
+    async def test_task_requeued_after_delay(self):
+        """Test a task is only re-queued once its delay has passed."""
+        queue = await _failed_queue(1)
+        scheduler = RetryScheduler(queue)
+
+        scheduler.schedule(1, 0.05)
+        await asyncio.sleep(0.01)
+        assert (await queue.get_stats())["pending"] == 0
+
+        task = await asyncio.wait_for(queue.get_next_task(), timeout=1)
+        assert task.question_id == 1
+        assert task.retry_count == 1
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_earlier_retry_wakes_timer(self):
+        """Test a sooner retry scheduled later is re-queued first."""
+        queue = await _failed_queue(1, 2)
+        scheduler = RetryScheduler(queue)
+
+        scheduler.schedule(1, 10)
+        scheduler.schedule(2, 0.01)
+
+        task = await asyncio.wait_for(queue.get_next_task(), timeout=1)
+        assert task.question_id == 2
+        assert scheduler.pending == 1
+        await scheduler.stop()
+        assert scheduler.pending == 0
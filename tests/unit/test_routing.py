@@ -0,0 +1,149 @@
+"""Unit tests for latency-aware provider routing."""
+
+import pytest
+
+from llm_distiller.config import ProviderConfig, Settings
+from processing.manager import LLMProviderManager
+from llm_distiller.llm.base import build_messages
+from processing.routing import ProviderRouter, prefix_key
+
+
+def _router_with_latencies(**latencies: float) -> ProviderRouter:
+    router = ProviderRouter()
+    for name, latency_ms in latencies.items():
+        router._load(name).latency_ms = latency_ms
+    return router
+
+
+class TestProviderRouter:
+    """Test expected completion times and selection."""
+
+    def test_expected_time_grows_with_in_flight(self):
+        """Test that every in-flight request adds one latency estimate."""
+        router = _router_with_latencies(slow=100.0)
+        assert router.expected_ms("slow") == 100.0
+        router.start("slow")
+        router.start("slow")
+        assert router.expected_ms("slow") == 300.0
+
+    def test_expected_time_includes_rate_limit_wait(self):
+        """Test that a throttled provider looks slower."""
+        router = ProviderRouter(wait_time=lambda name: 2.0 if name == "limited" else 0.0)
+        assert router.expected_ms("limited") == 2000.0
+        assert router.expected_ms("free") == 0.0
+
+    def test_choose_prefers_faster_provider(self):
+        """Test that two-choice selection never picks the slower of two."""
+        router = _router_with_latencies(fast=100.0, slow=5000.0)
+        assert all(router.choose(["fast", "slow"]) == "fast" for _ in range(20))
+
+    def test_load_spreads_across_providers(self):
+        """Test that in-flight load shifts traffic to the slower provider."""
+        router = _router_with_latencies(fast=100.0, slow=500.0)
+        picks = []
+        for _ in range(6):
+            name = router.choose(["fast", "slow"])
+            router.start(name)
+            picks.append(name)
+        assert picks.count("fast") == 5
+        assert picks.count("slow") == 1
+
+    def test_order_puts_remaining_providers_fastest_first(self):
+        """Test the failover order after the chosen provider."""
+        router = _router_with_latencies(a=100.0, b=300.0, c=200.0)
+        order = router.order(["a", "b", "c"])
+        assert sorted(order) == ["a", "b", "c"]
+        assert order[1:] == sorted(order[1:], key=router.expected_ms)
+
+    def test_finish_updates_latency_average(self):
+        """Test the EWMA update and in-flight bookkeeping."""
+        router = _router_with_latencies(p=100.0)
+        started_at = router.start("p")
+        router.finish("p", started_at - 0.2, success=True)
+        load = router.loads["p"]
+        assert load.in_flight == 0
+        assert load.successes == 1
+        assert load.latency_ms == pytest.approx(130.0, abs=5.0)
+
+    def test_fast_failures_are_penalized(self):
+        """Test that failing fast does not make a provider attractive."""
+        router = _router_with_latencies(p=100.0)
+        router.finish("p", router.start("p"), success=False)
+        assert router.loads["p"].latency_ms == pytest.approx(130.0)
+        assert router.loads["p"].failures == 1
+
+
+class TestPrefixAffinity:
+    """Test sticky routing of requests sharing a prompt prefix."""
+
+    def test_prefix_key_depends_only_on_system_prompt(self):
+        """Test that questions with one system prompt share a key."""
+        first = prefix_key(build_messages("Question 1", "Be brief."))
+        assert first == prefix_key(build_messages("Question 2", "Be brief."))
+        assert first != prefix_key(build_messages("Question 1", "Be thorough."))
+        assert prefix_key(build_messages("Question 1")) is None
+
+    def test_prefix_sticks_to_first_provider(self):
+        """Test that a prefix keeps going to the provider that served it first."""
+        router = _router_with_latencies(a=100.0, b=100.0, c=100.0)
+        first = router.order(["a", "b", "c"], prefix="p")[0]
+        assert all(router.order(["a", "b", "c"], prefix="p")[0] == first for _ in range(20))
+        assert router.get_stats(first)["prefixes"] == 1
+
+    def test_prefix_sticks_under_moderate_load(self):
+        """Test that a few extra in-flight requests do not break affinity."""
+        router = _router_with_latencies(a=100.0, b=100.0)
+        router.affinity["p"] = "a"
+        for _ in range(4):
+            router.start("a")
+        router.start("b")
+        assert router.order(["a", "b"], prefix="p")[0] == "a"
+
+    def test_overloaded_provider_spills_over(self):
+        """Test that a much slower sticky provider is bypassed but keeps the prefix."""
+        router = _router_with_latencies(a=100.0, b=100.0)
+        router.affinity["p"] = "a"
+        for _ in range(5):
+            router.start("a")
+        assert router.order(["a", "b"], prefix="p")[0] == "b"
+        assert router.affinity["p"] == "a"
+
+    def test_unsampled_provider_does_not_draw_prefix_away(self):
+        """Test that a provider without latency samples does not look free to sticky routing."""
+        router = _router_with_latencies(a=100.0)
+        router.affinity["p"] = "a"
+        router.start("a")
+        assert router.order(["a", "b"], prefix="p")[0] == "a"
+
+    def test_removed_provider_loses_its_prefixes(self):
+        """Test that prefixes of a removed provider are reassigned."""
+        router = _router_with_latencies(a=100.0, b=100.0)
+        router.affinity["p"] = "a"
+        router.remove("a")
+        assert router.order(["b"], prefix="p") == ["b"]
+        assert router.affinity["p"] == "b"
+
+
+class TestManagerRouting:
+    """Test that the provider manager routes through the router."""
+
+    @pytest.fixture
+    def manager(self):
+        settings = Settings(llm_providers={
+            "slow": ProviderConfig(type="openai", api_key="test-key"),
+            "fast": ProviderConfig(type="openai", api_key="test-key"),
+        })
+        manager = LLMProviderManager(settings)
+        manager.router._load("slow").latency_ms = 5000.0
+        manager.router._load("fast").latency_ms = 100.0
+        return manager
+
+    def test_unpinned_requests_go_to_fastest_provider(self, manager):
+        """Test that failover order without a preferred provider is latency-based."""
+        assert manager._get_providers_for_strategy("all", None) == ["fast", "slow"]
+        assert manager.get_provider() is manager.providers["fast"]
+
+    def test_pinned_provider_stays_first(self, manager):
+        """Test that a preferred provider is still tried first."""
+        assert manager._get_providers_for_strategy("all", "slow") == ["slow", "fast"]
+        assert manager._get_providers_for_strategy("none", "slow") == ["slow"]
@@ -152,6 +152,11 @@ class TestProviderConfig:
         config = ProviderConfig(type="openai", api_key="")
         assert config.get_api_key() == ""
 
+    def test_batching_rejects_streaming(self):
+        """Test that batching cannot be combined with streaming."""
+        with pytest.raises(ValueError, match="batching cannot be combined with stream"):
+            ProviderConfig(type="openai", stream=True, batching={"enabled": True})
+
 
 class TestProcessingConfig:
     """Test ProcessingConfig."""
@@ -0,0 +1,192 @@
+"""Unit tests for streamed responses and early abort."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from llm_distiller.config import GenerationConfig, ProviderConfig
+from llm_distiller.llm.base import ProviderError, ThinkingExtractor, build_messages
+from llm_distiller.llm.openai_provider import OpenAIProvider
+from llm_distiller.llm.streaming import (
+    IncrementalThinkingExtractor,
+    JSONPrefixChecker,
+    RepetitionDetector,
+    StreamGuard,
+)
+
+
+def _feed_all(checker, chunks):
+    for chunk in chunks:
+        reason = checker.feed(chunk)
+        if reason:
+            return reason
+    return None
+
+
+class TestIncrementalThinkingExtractor:
+    """Test splitting streamed text into answer and thinking."""
+
+    def test_tags_split_across_chunks(self):
+        """Test that tags broken over chunk boundaries are still recognised."""
+        extractor = IncrementalThinkingExtractor()
+        released = [extractor.feed(chunk) for chunk in ["<th", "ink>let me ", "see</thi", "nk>{\"a\": 1}"]]
+        assert "".join(released) == '{"a": 1}'
+        assert extractor.thinking == "let me see"
+
+    def test_answer_released_before_thinking_closes(self):
+        """Test that answer text outside tags is released immediately."""
+        extractor = IncrementalThinkingExtractor()
+        assert extractor.feed("Answer: 4 <") == "Answer: 4 "
+        assert extractor.feed("b>") == "<b>"
+
+    @pytest.mark.parametrize("text", [
+        "<think>plan</think>  The answer is 4.",
+        "<REASON>why</REASON>{\"x\": 1}",
+        "No thinking here.",
+        "<think>unterminated",
+    ])
+    def test_finish_matches_batch_extraction(self, text):
+        """Test that streamed and non-streamed extraction agree."""
+        extractor = IncrementalThinkingExtractor()
+        for index in range(0, len(text), 3):
+            extractor.feed(text[index:index + 3])
+        assert extractor.finish() == ThinkingExtractor.extract_thinking(text)
+
+
+class TestJSONPrefixChecker:
+    """Test detection of answers that cannot become JSON."""
+
+    def test_valid_json_prefix_passes(self):
+        """Test that a well-formed JSON prefix is accepted."""
+        assert _feed_all(JSONPrefixChecker(), ['{"answer": "a } b', ' \\" ]", "n": [1, 2.5e3, true, null]']) is None
+
+    def test_prose_before_json_fails(self):
+        """Test that a chatty preamble is rejected."""
+        assert "unexpected character" in _feed_all(JSONPrefixChecker(), ["Sure! ", '{"a": 1}'])
+
+    def test_text_after_json_fails(self):
+        """Test that trailing text after the value is rejected."""
+        assert "after the JSON value" in _feed_all(JSONPrefixChecker(), ['{"a": 1}', "\n", "Hope this helps"])
+
+    def test_mismatched_brackets_fail(self):
+        """Test that closing the wrong bracket is rejected."""
+        assert "unbalanced" in _feed_all(JSONPrefixChecker(), ['{"a": [1, 2}'])
+
+
+class TestRepetitionDetector:
+    """Test detection of runaway repetition."""
+
+    def test_repeated_span_is_detected(self):
+        """Test that a looping generation is flagged."""
+        detector = RepetitionDetector(window=200, max_period=20, check_every=16)
+        assert "repetition" in _feed_all(detector, ["I think that "] + ["the the "] * 100)
+
+    def test_normal_text_passes(self):
+        """Test that ordinary prose is not flagged."""
+        detector = RepetitionDetector(window=200, max_period=20, check_every=16)
+        text = " ".join(f"Step {i}: multiply {i} by {i * 3} to get {i * i * 3}." for i in range(40))
+        assert _feed_all(detector, [text[i:i + 10] for i in range(0, len(text), 10)]) is None
+
+
+class TestStreamGuard:
+    """Test the abort decisions of the stream guard."""
+
+    def test_repetition_in_thinking_is_allowed(self):
+        """Test that reasoning which repeats itself does not abort the stream."""
+        guard = StreamGuard(repetition=RepetitionDetector(window=200, max_period=20, check_every=16))
+        assert _feed_all(guard, ["<think>"] + ["check again. "] * 100 + ["</think>", "42"]) is None
+
+    def test_repetition_in_answer_aborts(self):
+        """Test that a looping answer aborts the stream."""
+        guard = StreamGuard(repetition=RepetitionDetector(window=200, max_period=20, check_every=16))
+        assert "repetition" in _feed_all(guard, ["<think>ok</think>"] + ["the the "] * 100)
+
+    def test_thinking_checked_when_enabled(self):
+        """Test that check_thinking extends the repetition check to reasoning."""
+        guard = StreamGuard(
+            repetition=RepetitionDetector(window=200, max_period=20, check_every=16), check_thinking=True
+        )
+        assert "repetition" in _feed_all(guard, ["<think>"] + ["check again. "] * 100)
+
+
+def _chunk(content=None, finish_reason=None, usage=None, reasoning=None):
+    choices = []
+    if content is not None or finish_reason is not None:
+        delta = SimpleNamespace(content=content, reasoning=reasoning)
+        choices = [SimpleNamespace(delta=delta, finish_reason=finish_reason)]
+    return SimpleNamespace(model="test-model", choices=choices, usage=usage)
+
+
+class _FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sent = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.sent >= len(self.chunks):
+            raise StopAsyncIteration
+        self.sent += 1
+        return self.chunks[self.sent - 1]
+
+    async def close(self):
+        self.closed = True
+
+
+def _streaming_provider(stream: _FakeStream) -> OpenAIProvider:
+    provider = OpenAIProvider(ProviderConfig(type="openai", api_key="test-key", stream=True))
+    raw_response = SimpleNamespace(headers={"x-ratelimit-remaining-requests": "9"}, parse=lambda: stream)
+    provider.client.chat.completions.with_raw_response.create = AsyncMock(return_value=raw_response)
+    return provider
+
+
+class TestOpenAIStreaming:
+    """Test the streaming path of OpenAIProvider."""
+
+    @pytest.mark.asyncio
+    async def test_stream_is_assembled(self):
+        """Test that streamed chunks produce the same response as a full completion."""
+        usage = SimpleNamespace(
+            total_tokens=30,
+            prompt_tokens=10,
+            completion_tokens=20,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=8),
+        )
+        stream = _FakeStream([
+            _chunk("<think>two plus"),
+            _chunk(" two</think>"),
+            _chunk('{"answer": 4}'),
+            _chunk(finish_reason="stop"),
+            _chunk(usage=usage),
+        ])
+        provider = _streaming_provider(stream)
+
+        messages = build_messages("2+2?", "Answer in JSON.")
+        response = await provider.generate_response(messages, GenerationConfig(), guard=StreamGuard(expect_json=True))
+
+        assert response.content == '{"answer": 4}'
+        assert response.thinking == "two plus two"
+        assert response.tokens_used == 30
+        assert response.metadata["cached_tokens"] == 8
+        assert response.metadata["finish_reason"] == "stop"
+        assert response.metadata["rate_limit_headers"] == {"x-ratelimit-remaining-requests": "9"}
+        assert stream.closed
+        kwargs = provider.client.chat.completions.with_raw_response.create.await_args.kwargs
+        assert kwargs["stream"] is True
+        assert kwargs["messages"] == messages
+
+    @pytest.mark.asyncio
+    async def test_invalid_json_aborts_stream(self):
+        """Test that a doomed JSON answer stops the stream early."""
+        stream = _FakeStream([_chunk("Sure, here"), _chunk(" is the JSON:"), _chunk("{}")] + [_chunk("x")] * 50)
+        provider = _streaming_provider(stream)
+
+        with pytest.raises(ProviderError, match="Stream aborted"):
+            await provider.generate_response("Q", GenerationConfig(), guard=StreamGuard(expect_json=True))
+
+        assert stream.sent == 1
+        assert stream.closed
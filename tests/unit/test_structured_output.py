@@ -0,0 +1,102 @@
+"""Unit tests for structured output of questions with an answer schema."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from llm_distiller.config import GenerationConfig, ProcessingConfig, ProviderConfig, Settings
+from llm_distiller.llm.base import ParsedResponse, build_messages, build_response_format
+from llm_distiller.llm.openai_provider import OpenAIProvider
+from processing.batch import build_batch_request
+from processing.manager import LLMProviderManager
+from processing.models import QuestionTask
+
+SCHEMA = '{"type": "object", "required": ["answer"]}'
+
+
+class TestBuildResponseFormat:
+    """Test conversion of answer schemas to response formats."""
+
+    def test_json_schema(self):
+        """Test that the question's schema is embedded in json_schema mode."""
+        response_format = build_response_format(SCHEMA, "json_schema")
+
+        assert response_format["type"] == "json_schema"
+        assert response_format["json_schema"]["schema"] == json.loads(SCHEMA)
+        assert response_format["json_schema"]["strict"] is False
+
+    @pytest.mark.parametrize("schema, mode, expected", [
+        (SCHEMA, "json_object", {"type": "json_object"}),
+        ("not a schema", "json_schema", {"type": "json_object"}),
+        (SCHEMA, None, None),
+        (None, "json_schema", None),
+    ])
+    def test_fallbacks(self, schema, mode, expected):
+        """Test json_object mode, unparseable schemas and unsupported providers."""
+        assert build_response_format(schema, mode) == expected
+
+
+def _provider(structured_output) -> OpenAIProvider:
+    provider = OpenAIProvider(ProviderConfig(type="openai", api_key="test-key", structured_output=structured_output))
+    message = SimpleNamespace(content='{"answer": 4}', reasoning=None)
+    response = SimpleNamespace(
+        model="test-model",
+        choices=[SimpleNamespace(message=message, finish_reason="stop")],
+        usage=None,
+    )
+    raw_response = SimpleNamespace(headers={}, parse=lambda: response)
+    provider.client.chat.completions.with_raw_response.create = AsyncMock(return_value=raw_response)
+    return provider
+
+
+class TestOpenAIResponseFormat:
+    """Test that OpenAIProvider sends response_format only when supported."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("structured_output, schema, expected_type", [
+        ("json_schema", SCHEMA, "json_schema"),
+        ("json_object", SCHEMA, "json_object"),
+        (None, SCHEMA, None),
+        ("json_schema", None, None),
+    ])
+    async def test_response_format_sent(self, structured_output, schema, expected_type):
+        """Test the response_format parameter for each capability and schema."""
+        provider = _provider(structured_output)
+
+        response = await provider.generate_response(build_messages("2+2?"), GenerationConfig(), answer_schema=schema)
+
+        assert response.content == '{"answer": 4}'
+        kwargs = provider.client.chat.completions.with_raw_response.create.await_args.kwargs
+        assert kwargs.get("response_format", {}).get("type") == expected_type
+
+
+class TestSchemaPropagation:
+    """Test that the answer schema reaches the provider request."""
+
+    @pytest.mark.asyncio
+    async def test_manager_passes_schema(self):
+        """Test that the manager hands the question's schema to the provider."""
+        settings = Settings(
+            llm_providers={"p": ProviderConfig(type="openai", api_key="test-key", structured_output="json_schema")},
+            processing=ProcessingConfig(failover_strategy="none"),
+        )
+        manager = LLMProviderManager(settings)
+        generate = AsyncMock(return_value=ParsedResponse(content='{"answer": 4}', model="test-model"))
+        manager.providers["p"].generate_response = generate
+
+        await manager.generate_response_with_failover("2+2?", preferred_provider="p", answer_schema=SCHEMA)
+
+        assert generate.await_args.kwargs["answer_schema"] == SCHEMA
+        await manager.close()
+
+    def test_batch_request_includes_response_format(self):
+        """Test that batch input lines carry the response format."""
+        task = QuestionTask(
+            question_id=1, category="math", question_text="2+2?", golden_answer=None, answer_schema=SCHEMA
+        )
+
+        request = build_batch_request(task, build_messages("2+2?"), "test-model", GenerationConfig(), "json_schema")
+
+        assert request["body"]["response_format"]["type"] == "json_schema"